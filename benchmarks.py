@@ -0,0 +1,860 @@
+# benchmarks.py - Performans ve Eşzamanlılık Kontrolleri
+"""
+⏱️ Sigorta Sistemi Performans Kontrolleri
+Model/ChromaDB gerektirmeyen, komut satırından çalışan ölçüm senaryoları
+(doğruluk ve eşzamanlılık kontrolleri, sahte bileşenler ve referans uygulamalar: tests/)
+    python benchmarks.py
+"""
+import random
+import time
+from typing import Dict, List
+import numpy as np
+from tests.yardimcilar import (
+    BellekKoleksiyonu, KelimeEncoder, SayanEncoder, dogrusal_kategori_tespiti, eski_soru_genisletme,
+    eski_sonuc_isleme, metin_taramasi_bonusu, yerel_config
+)
+
+def sorgu_embedding_lru_olcumu(tekrar: int = 5) -> Dict:
+    """🧠 Tekrarlanan örnek sorularda sorgu embedding LRU'sunun önlediği encode sayısı"""
+    from config import SAMPLE_QUESTIONS
+    from query_engine import SigortaQueryEngine
+
+    config = yerel_config()
+    encoder = SayanEncoder()
+    motor = SigortaQueryEngine(encoder, None, config)
+
+    # Öneri tıklamaları: aynı sorular farklı yazım/boşluklarla tekrar gelir
+    sorular = [s for s in SAMPLE_QUESTIONS for _ in range(tekrar)]
+    sorular += [f"  {s.upper()}  " for s in SAMPLE_QUESTIONS]
+    for soru in sorular:
+        motor.sorgu_hazirla(soru)
+
+    return {
+        'soru_sayisi': len(sorular),
+        'encode_sayisi': encoder.encode_sayisi,
+        **motor.get_embedding_lru_stats()
+    }
+
+def _soru_varyantlari(soru: str) -> List[str]:
+    """✍️ Kullanıcıların aynı soruyu yazdığı tipik biçimler"""
+    from text_normalizer import diakritik_katla
+    return [
+        soru,
+        soru.upper(),
+        soru.rstrip('?').strip(),
+        f"  {soru}  ".replace(' ', '  '),
+        f"Acaba {soru[0].lower()}{soru[1:]}",
+        diakritik_katla(soru.lower()),
+        soru.replace('?', ' ?').replace("'", '’'),
+        soru.replace('a', 'â', 1) if 'ka' in soru else soru.title()
+    ]
+
+def cache_anahtari_hit_olcumu(log_boyutu: int = 300, tohum: int = 42) -> Dict:
+    """🔑 Tekrar oynatılan soru kaydında eski ve Türkçe normalize cache anahtarının hit oranı"""
+    import hashlib
+    from config import SAMPLE_QUESTIONS
+    from text_normalizer import cache_anahtari_metni
+
+    rastgele = random.Random(tohum)
+    havuz = [v for soru in SAMPLE_QUESTIONS for v in _soru_varyantlari(soru)]
+    log = [rastgele.choice(havuz) for _ in range(log_boyutu)]
+
+    anahtarlayicilar = {
+        'eski': lambda s: hashlib.md5(s.lower().strip().encode()).hexdigest(),
+        'turkce': lambda s: hashlib.md5(cache_anahtari_metni(s).encode()).hexdigest(),
+        'turkce_diakritik': lambda s: hashlib.md5(cache_anahtari_metni(s, diakritik=True).encode()).hexdigest()
+    }
+
+    sonuc = {'log_boyutu': log_boyutu, 'farkli_soru': len(SAMPLE_QUESTIONS)}
+    for ad, anahtarla in anahtarlayicilar.items():
+        gorulen = set()
+        hit = 0
+        baslangic = time.perf_counter()
+        for soru in log:
+            anahtar = anahtarla(soru)
+            if anahtar in gorulen:
+                hit += 1
+            gorulen.add(anahtar)
+        sonuc[ad] = {
+            'hit_rate': round(hit / log_boyutu * 100, 1),
+            'farkli_anahtar': len(gorulen),
+            'us_per_soru': (time.perf_counter() - baslangic) / log_boyutu * 1e6
+        }
+    return sonuc
+
+def kategori_tespiti_olcumu(ek_esanlam_sayilari=(0, 1000, 5000), tekrar: int = 20) -> List[Dict]:
+    """🔎 Eşanlamlı sayısı arttıkça doğrusal tarama ve Aho-Corasick otomatı (sonuçlar aynı olmalı)"""
+    import copy
+    from config import SAMPLE_QUESTIONS
+    from keyword_matcher import SigortaKeywordMatcher
+    from text_normalizer import soru_normalize
+
+    config = yerel_config()
+    sorular = [soru_normalize(s) for s in SAMPLE_QUESTIONS]
+    olcumler = []
+
+    for ek_sayi in ek_esanlam_sayilari:
+        categories = copy.deepcopy(config['categories'])
+        kategori_adlari = list(categories)
+        for i in range(ek_sayi):
+            categories[kategori_adlari[i % len(kategori_adlari)]]['keywords'].append(f"esanlam{i}x")
+
+        eslestirici = SigortaKeywordMatcher(categories, config['exact_matches'])
+
+        baslangic = time.perf_counter()
+        for _ in range(tekrar):
+            dogrusal = [dogrusal_kategori_tespiti(s, categories, config['exact_matches']) for s in sorular]
+        dogrusal_sure = time.perf_counter() - baslangic
+
+        baslangic = time.perf_counter()
+        for _ in range(tekrar):
+            otomat = [eslestirici.kategori_tespit_et(eslestirici.eslesmeler(s)) for s in sorular]
+        otomat_sure = time.perf_counter() - baslangic
+
+        sorgu_sayisi = tekrar * len(sorular)
+        olcumler.append({
+            'desen_sayisi': len(eslestirici.otomat.desenler),
+            'dogrusal_us': dogrusal_sure / sorgu_sayisi * 1e6,
+            'otomat_us': otomat_sure / sorgu_sayisi * 1e6,
+            'ayni_sonuc': dogrusal == otomat
+        })
+    return olcumler
+
+def keyword_bonusu_karsilastirmasi(json_file: str = 'sigorta_bilgi_bankasi.json') -> Dict:
+    """🧮 Yükleme anı bit maskesi bonusu ile metin taraması bonusu birebir aynı mı"""
+    import json
+    from config import SAMPLE_QUESTIONS
+    from data_processor import SigortaDataProcessor
+    from query_engine import SigortaQueryEngine
+
+    config = yerel_config()
+    motor = SigortaQueryEngine(None, None, config)
+    isleyici = SigortaDataProcessor(config)
+    with open(json_file, 'r', encoding='utf-8') as f:
+        kayitlar = [isleyici._veri_hazirla(item) for item in json.load(f)]
+
+    # Örnek sorular + her kategorinin bonus anahtar kelimelerinden üretilmiş sorular
+    sorular = list(SAMPLE_QUESTIONS)
+    for kategori_config in config['categories'].values():
+        keywords = kategori_config['keywords'][:10]
+        sorular += [' '.join(keywords[i:i + 3]) for i in range(0, len(keywords), 2)]
+
+    farkli = 0
+    karsilastirma = 0
+    tarama_sure = maske_sure = 0.0
+    for soru in sorular:
+        temiz = motor._soru_temizle(soru)
+        eslesmeler = motor.keyword_matcher.eslesmeler(temiz)
+        kategori = motor.keyword_matcher.kategori_tespit_et(eslesmeler)
+
+        baslangic = time.perf_counter()
+        eski = [
+            metin_taramasi_bonusu(temiz, k['icerik'], kategori, config['categories'],
+                                   config['search']['keyword_bonus_max'])
+            for k in kayitlar
+        ]
+        tarama_sure += time.perf_counter() - baslangic
+
+        baslangic = time.perf_counter()
+        soru_maskesi = motor.keyword_matcher.soru_maskesi(eslesmeler, kategori) if kategori else 0
+        if soru_maskesi:
+            yeni = motor._keyword_bonuslari(
+                np.arange(len(kayitlar)), [k['icerik'] for k in kayitlar],
+                [k['metadata'] for k in kayitlar], temiz, kategori, eslesmeler, soru_maskesi
+            ).tolist()
+        else:
+            yeni = [0] * len(kayitlar)
+        maske_sure += time.perf_counter() - baslangic
+
+        karsilastirma += len(kayitlar)
+        farkli += sum(1 for a, b in zip(eski, yeni) if a != b)
+
+    return {
+        'karsilastirma': karsilastirma,
+        'farkli': farkli,
+        'tarama_us': tarama_sure / karsilastirma * 1e6,
+        'maske_us': maske_sure / karsilastirma * 1e6
+    }
+
+def sonuc_isleme_olcumu(aday_sayilari=(25, 200, 1000), final_sayilari=(1, 5),
+                        tekrar: int = 30, json_file: str = 'sigorta_bilgi_bankasi.json') -> List[Dict]:
+    """⚙️ Vektörel skorlama + argpartition top-k ile eski dict tabanlı işleme (çıktı aynı olmalı)"""
+    import json
+    from config import SAMPLE_QUESTIONS
+    from data_processor import SigortaDataProcessor
+    from query_engine import SigortaQueryEngine
+
+    config = yerel_config()
+    isleyici = SigortaDataProcessor(config)
+    with open(json_file, 'r', encoding='utf-8') as f:
+        kayitlar = [isleyici._veri_hazirla(item) for item in json.load(f)]
+    # Kısa içerikler min_content_length filtresini de çalıştırsın
+    kayitlar += [{'icerik': 'Kasko deprem.', 'metadata': {'kategori': 'kasko'}}]
+
+    rastgele = random.Random(7)
+    olcumler = []
+    for final_sayisi in final_sayilari:
+        config['search']['final_results'] = final_sayisi
+        motor = SigortaQueryEngine(None, None, config)
+        for aday_sayisi in aday_sayilari:
+            secimler = [rastgele.choice(kayitlar) for _ in range(aday_sayisi)]
+            arama_sonuclari = {
+                'documents': [[k['icerik'] for k in secimler]],
+                'metadatas': [[k['metadata'] for k in secimler]],
+                # İki basamağa yuvarlanmış mesafeler - eşit skorlar sıralamayı zorlar
+                'distances': [sorted(round(rastgele.uniform(0.05, 0.6), 2) for _ in secimler)]
+            }
+
+            ayni = True
+            eski_sure = yeni_sure = 0.0
+            for soru in SAMPLE_QUESTIONS:
+                temiz = motor._soru_temizle(soru)
+                kategori = motor._kategori_tespit_et(temiz)
+
+                baslangic = time.perf_counter()
+                for _ in range(tekrar):
+                    eski = eski_sonuc_isleme(motor, arama_sonuclari, temiz, kategori)
+                eski_sure += time.perf_counter() - baslangic
+
+                baslangic = time.perf_counter()
+                for _ in range(tekrar):
+                    yeni = motor._sonuclari_isle(arama_sonuclari, temiz, kategori)
+                yeni_sure += time.perf_counter() - baslangic
+
+                ayni = ayni and eski == yeni
+
+            sorgu_sayisi = tekrar * len(SAMPLE_QUESTIONS)
+            olcumler.append({
+                'aday_sayisi': aday_sayisi,
+                'final_sayisi': final_sayisi,
+                'eski_us': eski_sure / sorgu_sayisi * 1e6,
+                'yeni_us': yeni_sure / sorgu_sayisi * 1e6,
+                'ayni_sonuc': ayni
+            })
+    return olcumler
+
+def iki_asamali_arama_olcumu(belge_sayisi: int = 500, belge_uzunlugu: int = 3000,
+                             json_file: str = 'sigorta_bilgi_bankasi.json') -> Dict:
+    """📄 Tek ve iki aşamalı aramada taşınan belge yükü (çıktılar aynı olmalı)"""
+    import json
+    from config import SAMPLE_QUESTIONS
+    from data_processor import SigortaDataProcessor
+    from query_engine import SigortaQueryEngine
+
+    config = yerel_config()
+    config['search']['similarity_threshold'] = 0.0  # Rastgele vektörlerle de aday kalsın
+    isleyici = SigortaDataProcessor(config)
+    with open(json_file, 'r', encoding='utf-8') as f:
+        kaynak = json.load(f)
+
+    # Uzun belgeler: bilgi bankası içerikleri tekrarlanarak uzatılır
+    kayitlar = []
+    for i in range(belge_sayisi):
+        item = dict(kaynak[i % len(kaynak)])
+        item['id'] = f"{item['id']}_{i}"
+        tekrar_sayisi = belge_uzunlugu // max(1, len(item['icerik'])) + 1
+        item['icerik'] = ' '.join([item['icerik']] * tekrar_sayisi)[:belge_uzunlugu]
+        kayitlar.append(isleyici._veri_hazirla(item))
+
+    encoder = SayanEncoder(64)
+    koleksiyon = BellekKoleksiyonu(
+        [k['id'] for k in kayitlar],
+        encoder.encode([k['icerik'] for k in kayitlar]),
+        [k['icerik'] for k in kayitlar],
+        [k['metadata'] for k in kayitlar]
+    )
+    motor = SigortaQueryEngine(encoder, koleksiyon, config)
+
+    sonuc = {'belge_sayisi': belge_sayisi, 'belge_uzunlugu': belge_uzunlugu}
+    ciktilar = {}
+    for iki_asamali in (False, True):
+        config['search']['two_phase_retrieval'] = iki_asamali
+        koleksiyon.tasinan_karakter = 0
+        baslangic = time.perf_counter()
+        ciktilar[iki_asamali] = [motor.arama_yap(soru, hata_firlat=True) for soru in SAMPLE_QUESTIONS]
+        sure = time.perf_counter() - baslangic
+        sonuc['iki_asamali' if iki_asamali else 'tek_asamali'] = {
+            'karakter_per_sorgu': koleksiyon.tasinan_karakter / len(SAMPLE_QUESTIONS),
+            'ms_per_sorgu': sure / len(SAMPLE_QUESTIONS) * 1000
+        }
+    sonuc['ayni_sonuc'] = ciktilar[False] == ciktilar[True] and any(ciktilar[True])
+    return sonuc
+
+def kategori_filtresi_olcumu(belge_sayisi: int = 2000,
+                             json_file: str = 'sigorta_bilgi_bankasi.json') -> Dict:
+    """🎯 Kategori filtreli arama: aday uzayı daralması, isabet / global aramaya dönüş oranı"""
+    import json
+    from config import SAMPLE_QUESTIONS
+    from data_processor import SigortaDataProcessor
+    from query_engine import SigortaQueryEngine
+
+    config = yerel_config()
+    config['search']['similarity_threshold'] = 0.0
+    config['search']['category_filter'] = True
+    isleyici = SigortaDataProcessor(config)
+    with open(json_file, 'r', encoding='utf-8') as f:
+        kaynak = json.load(f)
+
+    kayitlar = []
+    for i in range(belge_sayisi):
+        item = dict(kaynak[i % len(kaynak)])
+        item['id'] = f"{item['id']}_{i}"
+        kayitlar.append(isleyici._veri_hazirla(item))
+
+    encoder = SayanEncoder(64)
+    koleksiyon = BellekKoleksiyonu(
+        [k['id'] for k in kayitlar],
+        encoder.encode([k['icerik'] for k in kayitlar]),
+        [k['icerik'] for k in kayitlar],
+        [k['metadata'] for k in kayitlar]
+    )
+    motor = SigortaQueryEngine(encoder, koleksiyon, config)
+
+    kategori_sayilari: Dict[str, int] = {}
+    for kayit in kayitlar:
+        kategori = kayit['metadata'].get('kategori')
+        kategori_sayilari[kategori] = kategori_sayilari.get(kategori, 0) + 1
+
+    aday_uzayi = []
+    kategori_disi = 0
+    for soru in SAMPLE_QUESTIONS:
+        sorgu = motor.sorgu_hazirla(soru)
+        kategori = motor._filtre_kategorisi(sorgu)
+        onceki_hit = motor.arama_sayaclari.topla()['kategori_filtre_hit']
+        sonuclar = motor.arama_yap(soru, hata_firlat=True, hazir_sorgu=sorgu)
+        if kategori and kategori_sayilari.get(kategori):
+            aday_uzayi.append(kategori_sayilari[kategori])
+        # Global aramaya dönüşte kategori dışı sonuç beklenir; sadece filtre isabetleri kontrol edilir
+        if motor.arama_sayaclari.topla()['kategori_filtre_hit'] > onceki_hit:
+            kategori_disi += sum(1 for sonuc in sonuclar if sonuc.get('kategori') != kategori)
+
+    return {
+        'belge_sayisi': belge_sayisi,
+        'ortalama_aday': sum(aday_uzayi) / len(aday_uzayi) if aday_uzayi else float(belge_sayisi),
+        'kategori_disi_sonuc': kategori_disi,
+        'stats': motor.get_arama_stats()['kategori_filtresi']
+    }
+
+def toplu_soru_yanit_olcumu(soru_sayisi: int = 600, belge_sayisi: int = 500,
+                            json_file: str = 'sigorta_bilgi_bankasi.json') -> Dict:
+    """📦 soru_yanit döngüsü ve soru_yanit_toplu: encode / vektör sorgusu sayısı, süre, sonuç eşitliği"""
+    import json
+    from config import SAMPLE_QUESTIONS
+    from data_processor import SigortaDataProcessor
+    from model_core import SigortaModelCore
+    from query_engine import SigortaQueryEngine
+
+    config = yerel_config()
+    config['search']['similarity_threshold'] = 0.0
+    isleyici = SigortaDataProcessor(config)
+    with open(json_file, 'r', encoding='utf-8') as f:
+        kaynak = json.load(f)
+    kayitlar = []
+    for i in range(belge_sayisi):
+        item = dict(kaynak[i % len(kaynak)])
+        item['id'] = f"{item['id']}_{i}"
+        kayitlar.append(isleyici._veri_hazirla(item))
+    belge_vektorleri = SayanEncoder(64).encode([k['icerik'] for k in kayitlar])
+
+    # Geçmiş müşteri soruları: örnek soruların numaralı varyantları, bir kısmı tekrar
+    farkli = max(1, soru_sayisi // 2)
+    sorular = [f"{SAMPLE_QUESTIONS[i % farkli % len(SAMPLE_QUESTIONS)]} {i % farkli}" for i in range(soru_sayisi)]
+
+    olcum = {'soru_sayisi': soru_sayisi}
+    ciktilar = {}
+    for mod in ('tek', 'toplu'):
+        encoder = SayanEncoder(64)
+        koleksiyon = BellekKoleksiyonu(
+            [k['id'] for k in kayitlar], belge_vektorleri,
+            [k['icerik'] for k in kayitlar], [k['metadata'] for k in kayitlar]
+        )
+        core = SigortaModelCore()
+        core.config = config
+        core.query_engine = SigortaQueryEngine(encoder, koleksiyon, config)
+        core.is_ready = True
+
+        baslangic = time.perf_counter()
+        if mod == 'tek':
+            ciktilar[mod] = [core.soru_yanit(soru) for soru in sorular]
+        else:
+            ciktilar[mod] = [cikti['sonuclar'] for cikti in core.soru_yanit_toplu(sorular)]
+        olcum[mod] = {
+            'sure_s': time.perf_counter() - baslangic,
+            'encode_cagrisi': encoder.encode_cagrisi,
+            'vektor_sorgusu': koleksiyon.sorgu_cagrisi,
+            'belge_istegi': koleksiyon.get_cagrisi
+        }
+    olcum['ayni_sonuc'] = ciktilar['tek'] == ciktilar['toplu'] and any(ciktilar['toplu'])
+    return olcum
+
+def soru_genisletme_olcumu(encode_gecikmesi: float = 0.02,
+                           json_file: str = 'sigorta_bilgi_bankasi.json') -> Dict:
+    """🔀 Eski iki soru_yanit çağrısı ve motor içi tek geçişli varyant araması: çağrı sayıları, süre, en iyi cevap
+
+    'eski': ui_main'deki eski genişletmeyle ikinci soru_yanit. 'soru_basina': motorun kendi
+    varyantıyla ikinci soru_yanit - tek geçişli birleştirmenin soru başına yolla eşdeğerliği.
+    `farkli`: eskiyle farklı çıkan (soru, eski, tek geçiş) kazanları.
+    """
+    import json
+    from config import SAMPLE_QUESTIONS
+    from data_processor import SigortaDataProcessor
+    from model_core import SigortaModelCore
+    from query_engine import SigortaQueryEngine
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        kaynak = json.load(f)
+
+    olcum = {'soru_sayisi': len(SAMPLE_QUESTIONS)}
+    en_iyi = {}
+    genisletme_config = yerel_config()
+    genisletme_config['search']['multi_search'] = genisletme_config['search']['question_expansion'] = True
+    varyant_motoru = SigortaQueryEngine(None, None, genisletme_config)
+    for mod in ('eski', 'soru_basina', 'tek_gecis'):
+        config = yerel_config()
+        config['search']['similarity_threshold'] = 0.0
+        config['search']['multi_search'] = config['search']['question_expansion'] = (mod == 'tek_gecis')
+        isleyici = SigortaDataProcessor(config)
+        kayitlar = [isleyici._veri_hazirla(item) for item in kaynak]
+        encoder = KelimeEncoder(gecikme=encode_gecikmesi)
+        koleksiyon = BellekKoleksiyonu(
+            [k['id'] for k in kayitlar], KelimeEncoder().encode([k['icerik'] for k in kayitlar]),
+            [k['icerik'] for k in kayitlar], [k['metadata'] for k in kayitlar]
+        )
+        core = SigortaModelCore()
+        core.config = config
+        core.query_engine = SigortaQueryEngine(encoder, koleksiyon, config)
+        core.is_ready = True
+
+        baslangic = time.perf_counter()
+        en_iyi[mod] = []
+        for soru in SAMPLE_QUESTIONS:
+            adaylar = core.soru_yanit(soru)[:1]
+            if mod == 'eski':
+                genisletilmis = eski_soru_genisletme(soru)
+                if genisletilmis != soru:
+                    adaylar += core.soru_yanit(genisletilmis)[:1]
+            elif mod == 'soru_basina':
+                for varyant in varyant_motoru._soru_varyantlari(varyant_motoru._soru_temizle(soru)):
+                    adaylar += core.soru_yanit(varyant)[:1]
+            en_iyi[mod].append(
+                max(adaylar, key=lambda x: x.get('skor', 0))['metadata']['id'] if adaylar else None
+            )
+        olcum[mod] = {
+            'sure_ms': (time.perf_counter() - baslangic) / len(SAMPLE_QUESTIONS) * 1000,
+            'encode_cagrisi': encoder.encode_cagrisi,
+            'vektor_sorgusu': koleksiyon.sorgu_cagrisi
+        }
+    olcum['ayni_en_iyi'] = sum(a == b for a, b in zip(en_iyi['eski'], en_iyi['tek_gecis']))
+    olcum['ayni_en_iyi_soru_basina'] = sum(a == b for a, b in zip(en_iyi['soru_basina'], en_iyi['tek_gecis']))
+    olcum['farkli'] = [
+        (soru, eski, tek) for soru, eski, tek in zip(SAMPLE_QUESTIONS, en_iyi['eski'], en_iyi['tek_gecis'])
+        if eski != tek
+    ]
+    return olcum
+
+def zaman_butcesi_olcumu(butceler=(None, 2.0, 0.03, 0.021), encode_gecikmesi: float = 0.02,
+                         json_file: str = 'sigorta_bilgi_bankasi.json') -> List[Dict]:
+    """⏱️ Bütçe başına yanıt süresi, bozulmuş yanıt, atlanan/aşan aşama sayıları ve bütçesizle aynı en iyi cevap"""
+    import json
+    from config import SAMPLE_QUESTIONS
+    from data_processor import SigortaDataProcessor
+    from model_core import SigortaModelCore
+    from query_engine import SigortaQueryEngine
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        kaynak = json.load(f)
+
+    olcumler = []
+    referans = None
+    for saniye in butceler:
+        config = yerel_config()
+        config['search']['similarity_threshold'] = 0.0
+        config['search']['deadline_aware'] = saniye is not None
+        isleyici = SigortaDataProcessor(config)
+        kayitlar = [isleyici._veri_hazirla(item) for item in kaynak]
+        koleksiyon = BellekKoleksiyonu(
+            [k['id'] for k in kayitlar], KelimeEncoder().encode([k['icerik'] for k in kayitlar]),
+            [k['icerik'] for k in kayitlar], [k['metadata'] for k in kayitlar]
+        )
+        core = SigortaModelCore()
+        core.config = config
+        core.query_engine = SigortaQueryEngine(KelimeEncoder(gecikme=encode_gecikmesi), koleksiyon, config)
+        core.is_ready = True
+
+        baslangic = time.perf_counter()
+        en_iyi = []
+        for soru in SAMPLE_QUESTIONS:
+            sonuclar = core.soru_yanit(soru, zaman_butcesi=saniye)
+            en_iyi.append(sonuclar[0]['metadata']['id'] if sonuclar else None)
+        if referans is None:
+            referans = en_iyi
+        stats = core.query_engine.get_butce_stats()
+        olcumler.append({
+            'butce': saniye,
+            'sure_ms': (time.perf_counter() - baslangic) / len(SAMPLE_QUESTIONS) * 1000,
+            'bozulmus': stats['bozulmus_yanit'],
+            'atlanan': stats['atlanan'],
+            'asim': stats['asim'],
+            'ayni_en_iyi': sum(a == b for a, b in zip(referans, en_iyi)),
+            'soru_sayisi': len(SAMPLE_QUESTIONS)
+        })
+    return olcumler
+
+def uyarlanir_k_olcumu(kayit_sayisi: int = 20000, tur: int = 3, esik: float = 0.3,
+                       json_file: str = 'sigorta_bilgi_bankasi.json') -> Dict:
+    """📈 Sabit max_search_results ve uyarlanır k: istenen aday, genişletme turu, süre ve sonuç eşitliği"""
+    import json
+    from config import SAMPLE_QUESTIONS
+    from data_processor import SigortaDataProcessor
+    from query_engine import SigortaQueryEngine
+    from vector_store import NumpyVectorStore
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        kaynak = json.load(f)
+    isleyici = SigortaDataProcessor(yerel_config())
+    kayitlar = []
+    for i in range(kayit_sayisi):
+        item = dict(kaynak[i % len(kaynak)])
+        item['id'] = f"{item['id']}_{i}"
+        kayitlar.append(isleyici._veri_hazirla(item))
+    # Kopyalar küçük gürültüyle ayrışır - büyük indekste yakın komşu yoğunluğu
+    vektorler = KelimeEncoder().encode([k['icerik'] for k in kayitlar])
+    vektorler /= np.linalg.norm(vektorler, axis=1, keepdims=True)
+    vektorler += np.random.default_rng(7).standard_normal(vektorler.shape).astype(np.float32) * 0.05
+    depo = NumpyVectorStore()
+    depo.add([k['id'] for k in kayitlar], vektorler, [k['icerik'] for k in kayitlar],
+             [k['metadata'] for k in kayitlar])
+
+    olcum = {'kayit_sayisi': kayit_sayisi, 'soru_sayisi': len(SAMPLE_QUESTIONS) * tur}
+    ciktilar = {}
+    for mod in ('sabit', 'uyarlanir'):
+        config = yerel_config()
+        config['search']['adaptive_k'] = (mod == 'uyarlanir')
+        config['search']['similarity_threshold'] = esik
+        motor = SigortaQueryEngine(KelimeEncoder(), depo, config)
+        sorgular = motor.sorgu_hazirla_toplu(SAMPLE_QUESTIONS)
+
+        baslangic = time.perf_counter()
+        ciktilar[mod] = [
+            [(sonuc['metadata']['id'], round(sonuc['skor'], 6)) for sonuc in motor.arama_yap(soru, hazir_sorgu=sorgu)]
+            for _ in range(tur) for soru, sorgu in zip(SAMPLE_QUESTIONS, sorgular)
+        ]
+        olcum[mod] = {'sure_ms': (time.perf_counter() - baslangic) / olcum['soru_sayisi'] * 1000}
+        if mod == 'uyarlanir':
+            olcum[mod].update(motor.get_uyarlanir_k_stats())
+    olcum['cevapli'] = sum(1 for sonuclar in ciktilar['sabit'] if sonuclar)
+    olcum['ayni_sonuc'] = ciktilar['sabit'] == ciktilar['uyarlanir']
+    return olcum
+
+def async_soru_yanit_olcumu(soru_sayisi: int = 120, encode_gecikmesi: float = 0.02,
+                            json_file: str = 'sigorta_bilgi_bankasi.json') -> Dict:
+    """⚡ Event loop içinde senkron soru_yanit ve soru_yanit_async: süre, loop gecikmesi, cache hit yolu"""
+    import asyncio
+    import json
+    from config import SAMPLE_QUESTIONS
+    from data_processor import SigortaDataProcessor
+    from model_core import SigortaModelCore
+    from query_engine import SigortaQueryEngine
+
+    with open(json_file, 'r', encoding='utf-8') as f:
+        kaynak = json.load(f)
+    sorular = [f"{SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)]} {i}" for i in range(soru_sayisi)]
+
+    def core_olustur():
+        config = yerel_config()
+        config['search']['similarity_threshold'] = 0.0
+        # Kuyrukta bekleme bütçeyi tüketip yanıtları bozabilir - eşitlik karşılaştırması bütçesiz
+        config['search']['deadline_aware'] = False
+        isleyici = SigortaDataProcessor(config)
+        kayitlar = [isleyici._veri_hazirla(item) for item in kaynak]
+        koleksiyon = BellekKoleksiyonu(
+            [k['id'] for k in kayitlar], KelimeEncoder().encode([k['icerik'] for k in kayitlar]),
+            [k['icerik'] for k in kayitlar], [k['metadata'] for k in kayitlar]
+        )
+        encoder = KelimeEncoder(gecikme=encode_gecikmesi)
+        core = SigortaModelCore()
+        core.config = config
+        core.query_engine = SigortaQueryEngine(encoder, koleksiyon, config)
+        core.is_ready = True
+        return core, encoder
+
+    async def olc(calistir):
+        # Loop'un her 1 ms'lik uykudan ne kadar geç uyandığı - bloklanmanın ölçüsü
+        gecikmeler = []
+        bitti = False
+
+        async def nabiz():
+            while not bitti:
+                once = time.perf_counter()
+                await asyncio.sleep(0.001)
+                gecikmeler.append(time.perf_counter() - once - 0.001)
+
+        nabiz_gorevi = asyncio.ensure_future(nabiz())
+        await asyncio.sleep(0)  # Nabız ilk uykusuna girsin
+        baslangic = time.perf_counter()
+        sonuc = await calistir()
+        sure = time.perf_counter() - baslangic
+        bitti = True
+        await nabiz_gorevi
+        return sonuc, {'sure_s': sure, 'max_loop_gecikmesi_ms': max(gecikmeler, default=0.0) * 1000}
+
+    async def senkron(core):
+        return [core.soru_yanit(soru) for soru in sorular]
+
+    async def eszamanli(core):
+        ciktilar = await asyncio.gather(*(core.soru_yanit_async(soru) for soru in sorular))
+        return [cikti['sonuclar'] for cikti in ciktilar]
+
+    def en_iyi(tum_sonuclar):
+        return [sonuclar[0]['metadata']['id'] if sonuclar else None for sonuclar in tum_sonuclar]
+
+    olcum = {'soru_sayisi': soru_sayisi}
+    core, _ = core_olustur()
+    senkron_sonuc, olcum['senkron'] = asyncio.run(olc(lambda: senkron(core)))
+
+    async def async_olcumleri():
+        core, encoder = core_olustur()
+        ilk = await olc(lambda: eszamanli(core))
+        # İkinci tur tamamen cache hit - executor'a gidilmez, encode yapılmaz
+        encode_oncesi = encoder.encode_cagrisi
+        ikinci = await olc(lambda: eszamanli(core))
+        core.query_engine.executorlari_kapat()
+        return ilk, ikinci, encoder.encode_cagrisi - encode_oncesi
+
+    (async_sonuc, olcum['async']), (_, olcum['cache_turu']), olcum['cache_turu_encode'] = asyncio.run(
+        async_olcumleri()
+    )
+    olcum['ayni_sonuc'] = en_iyi(senkron_sonuc) == en_iyi(async_sonuc)
+    return olcum
+
+def vektor_deposu_olcumu(kayit_sayilari=(1000, 10000, 25000), boyut: int = 384,
+                         sorgu_sayisi: int = 50, n_results: int = 25) -> List[Dict]:
+    """🗄️ ChromaDB (HNSW) ve NumPy tam arama: ekleme/sorgu süresi ve NumPy'ye göre recall"""
+    import uuid
+    from vector_store import ChromaVectorStore, NumpyVectorStore
+
+    try:
+        import chromadb
+        from chromadb.config import Settings
+        chroma_client = chromadb.Client(Settings(anonymized_telemetry=False, allow_reset=True))
+    except ImportError:
+        chroma_client = None  # Sadece NumPy ölçülür
+
+    rastgele = np.random.default_rng(11)
+    olcumler = []
+    for kayit_sayisi in kayit_sayilari:
+        vektorler = rastgele.standard_normal((kayit_sayisi, boyut)).astype(np.float32)
+        idler = [f"belge_{i}" for i in range(kayit_sayisi)]
+        metadatas = [{'kategori': 'kasko'} for _ in range(kayit_sayisi)]
+        belgeler = [''] * kayit_sayisi
+        # Sorgular mevcut belgelerin gürültülü kopyaları - gerçekçi yakın komşular
+        sorgular = vektorler[rastgele.integers(0, kayit_sayisi, sorgu_sayisi)]
+        sorgular = sorgular + 0.3 * rastgele.standard_normal(sorgular.shape).astype(np.float32)
+
+        depolar = {'numpy': NumpyVectorStore()}
+        if chroma_client is not None:
+            depolar['chroma'] = ChromaVectorStore(chroma_client.create_collection(
+                name=f"benchmark_{uuid.uuid4().hex[:8]}", metadata={"hnsw:space": "cosine"}
+            ))
+
+        olcum = {'kayit_sayisi': kayit_sayisi}
+        sonuclar = {}
+        for ad, depo in depolar.items():
+            baslangic = time.perf_counter()
+            for i in range(0, kayit_sayisi, 5000):  # ChromaDB toplu ekleme sınırının altında
+                depo.add(idler[i:i + 5000], vektorler[i:i + 5000], belgeler[i:i + 5000], metadatas[i:i + 5000])
+            ekleme = time.perf_counter() - baslangic
+
+            baslangic = time.perf_counter()
+            sonuclar[ad] = [
+                depo.query(sorgu.reshape(1, -1), n_results=n_results, include=['metadatas', 'distances'])['ids'][0]
+                for sorgu in sorgular
+            ]
+            sorgu_suresi = time.perf_counter() - baslangic
+            olcum[ad] = {'ekleme_s': ekleme, 'sorgu_ms': sorgu_suresi / sorgu_sayisi * 1000}
+
+        if 'chroma' in sonuclar:
+            # NumPy tam arama referans: HNSW'nin bulduğu gerçek komşu oranı
+            ortak = sum(len(set(a) & set(b)) for a, b in zip(sonuclar['chroma'], sonuclar['numpy']))
+            olcum['chroma']['recall'] = ortak / (n_results * sorgu_sayisi)
+            chroma_client.delete_collection(depolar['chroma'].collection.name)
+        olcumler.append(olcum)
+    return olcumler
+
+def shard_olcumu(kayit_sayisi: int = 30000, boyut: int = 384, sorgu_sayisi: int = 50,
+                 n_results: int = 25) -> Dict:
+    """🧩 Tek NumPy deposu ve kategori shard'ları: sorgu süresi, sonuç eşitliği, kategori silme süresi"""
+    from config import CATEGORIES
+    from vector_store import NumpyVectorStore, ShardedVectorStore
+
+    rastgele = np.random.default_rng(13)
+    kategoriler = list(CATEGORIES)
+    vektorler = rastgele.standard_normal((kayit_sayisi, boyut)).astype(np.float32)
+    idler = [f"belge_{i}" for i in range(kayit_sayisi)]
+    metadatas = [{'kategori': kategoriler[i % len(kategoriler)]} for i in range(kayit_sayisi)]
+    belgeler = [''] * kayit_sayisi
+    sorgular = rastgele.standard_normal((sorgu_sayisi, boyut)).astype(np.float32)
+
+    depolar = {
+        'tek': NumpyVectorStore(),
+        'shard': ShardedVectorStore({kategori: NumpyVectorStore() for kategori in kategoriler})
+    }
+    sonuc = {'kayit_sayisi': kayit_sayisi, 'shard_sayisi': len(kategoriler)}
+    ciktilar = {}
+    for ad, depo in depolar.items():
+        depo.add(idler, vektorler, belgeler, metadatas)
+        baslangic = time.perf_counter()
+        ciktilar[ad] = [
+            depo.query(sorgu.reshape(1, -1), n_results=n_results, include=['metadatas', 'distances'])['ids'][0]
+            for sorgu in sorgular
+        ]
+        sonuc[f'{ad}_sorgu_ms'] = (time.perf_counter() - baslangic) / sorgu_sayisi * 1000
+
+        # Kategori filtreli sorgu: tek depoda maske, shard'da sadece ilgili shard
+        baslangic = time.perf_counter()
+        for sorgu in sorgular:
+            depo.query(sorgu.reshape(1, -1), n_results=n_results, include=['metadatas', 'distances'],
+                       where={'kategori': 'kasko'})
+        sonuc[f'{ad}_filtreli_ms'] = (time.perf_counter() - baslangic) / sorgu_sayisi * 1000
+
+    # Kategori silme: filtreli get + id ile delete / shard'ı toptan düşürme
+    baslangic = time.perf_counter()
+    silinecek = depolar['tek'].get(where={'kategori': 'kasko'}, include=[])['ids']
+    depolar['tek'].delete(ids=silinecek)
+    sonuc['tek_silme_ms'] = (time.perf_counter() - baslangic) * 1000
+    baslangic = time.perf_counter()
+    depolar['shard'].shard_dusur('kasko')
+    sonuc['shard_silme_ms'] = (time.perf_counter() - baslangic) * 1000
+
+    sonuc['ayni_sonuc'] = ciktilar['tek'] == ciktilar['shard']
+    sonuc['ayni_sayi'] = depolar['tek'].count() == depolar['shard'].count()
+    return sonuc
+
+if __name__ == "__main__":
+    print("⏱️ Sigorta Sistemi - Performans Kontrolleri")
+
+    lru = sorgu_embedding_lru_olcumu()
+    print(
+        f"🧠 Sorgu embedding LRU: {lru['soru_sayisi']} soru, {lru['encode_sayisi']} encode, "
+        f"hit %{lru['hit_rate']}, {lru['size']} kayıt / {lru['bytes']} byte"
+    )
+
+    anahtar = cache_anahtari_hit_olcumu()
+    for ad in ('eski', 'turkce', 'turkce_diakritik'):
+        print(
+            f"🔑 Cache anahtarı ({ad}): hit %{anahtar[ad]['hit_rate']}, "
+            f"{anahtar[ad]['farkli_anahtar']} anahtar / {anahtar['farkli_soru']} soru, "
+            f"{anahtar[ad]['us_per_soru']:.1f} µs/soru"
+        )
+
+    for olcum in kategori_tespiti_olcumu():
+        print(
+            f"🔎 Kategori tespiti ({olcum['desen_sayisi']} desen): doğrusal {olcum['dogrusal_us']:.1f} µs, "
+            f"otomat {olcum['otomat_us']:.1f} µs - {'✅ aynı sonuç' if olcum['ayni_sonuc'] else '❌ FARKLI'}"
+        )
+
+    bonus = keyword_bonusu_karsilastirmasi()
+    durum = '✅ birebir aynı' if bonus['farkli'] == 0 else f"❌ {bonus['farkli']} FARKLI"
+    print(
+        f"🧮 Keyword bonusu: {bonus['karsilastirma']} aday, metin taraması {bonus['tarama_us']:.2f} µs, "
+        f"bit maskesi {bonus['maske_us']:.2f} µs - {durum}"
+    )
+
+    for olcum in sonuc_isleme_olcumu():
+        print(
+            f"⚙️ Sonuç işleme ({olcum['aday_sayisi']} aday, top-{olcum['final_sayisi']}): "
+            f"eski {olcum['eski_us']:.0f} µs, vektörel {olcum['yeni_us']:.0f} µs - "
+            f"{'✅ aynı çıktı' if olcum['ayni_sonuc'] else '❌ FARKLI'}"
+        )
+
+    iki_asama = iki_asamali_arama_olcumu()
+    tek, iki = iki_asama['tek_asamali'], iki_asama['iki_asamali']
+    print(
+        f"📄 İki aşamalı arama ({iki_asama['belge_sayisi']} belge × {iki_asama['belge_uzunlugu']} karakter): "
+        f"sorgu başına {tek['karakter_per_sorgu']:.0f} -> {iki['karakter_per_sorgu']:.0f} karakter "
+        f"(%{(1 - iki['karakter_per_sorgu'] / tek['karakter_per_sorgu']) * 100:.0f} azalma) - "
+        f"{'✅ aynı sonuç' if iki_asama['ayni_sonuc'] else '❌ FARKLI'}"
+    )
+
+    filtre = kategori_filtresi_olcumu()
+    filtre_stats = filtre['stats']
+    print(
+        f"🎯 Kategori filtresi ({filtre['belge_sayisi']} belge): filtreli sorguda aday uzayı "
+        f"{filtre['belge_sayisi']} -> {filtre['ortalama_aday']:.0f}, "
+        f"{filtre_stats['sorgu']} filtreli sorgu, isabet %{filtre_stats['hit_rate']}, "
+        f"global aramaya dönüş {filtre_stats['geri_donus']} - "
+        f"{'✅ kategori dışı sonuç yok' if filtre['kategori_disi_sonuc'] == 0 else '⚠️ kategori dışı sonuç var'}"
+    )
+
+    for olcum in vektor_deposu_olcumu():
+        satir = f"🗄️ Vektör deposu ({olcum['kayit_sayisi']} kayıt): numpy {olcum['numpy']['sorgu_ms']:.2f} ms/sorgu"
+        if 'chroma' in olcum:
+            satir += (
+                f", chroma {olcum['chroma']['sorgu_ms']:.2f} ms/sorgu "
+                f"(recall %{olcum['chroma']['recall'] * 100:.0f}); ekleme numpy "
+                f"{olcum['numpy']['ekleme_s']:.2f}s / chroma {olcum['chroma']['ekleme_s']:.2f}s"
+            )
+        print(satir)
+
+    toplu = toplu_soru_yanit_olcumu()
+    tek, tp = toplu['tek'], toplu['toplu']
+    print(
+        f"📦 Toplu soru-yanıt ({toplu['soru_sayisi']} soru): encode çağrısı {tek['encode_cagrisi']} -> "
+        f"{tp['encode_cagrisi']}, vektör sorgusu {tek['vektor_sorgusu']} -> {tp['vektor_sorgusu']}, "
+        f"belge isteği {tek['belge_istegi']} -> {tp['belge_istegi']}, "
+        f"{tek['sure_s']:.2f}s -> {tp['sure_s']:.2f}s - "
+        f"{'✅ aynı sonuç' if toplu['ayni_sonuc'] else '❌ FARKLI'}"
+    )
+
+    genisletme = soru_genisletme_olcumu()
+    eski, tek = genisletme['eski'], genisletme['tek_gecis']
+    print(
+        f"🔀 Soru genişletme ({genisletme['soru_sayisi']} soru, encode çağrısı 20 ms): "
+        f"encode çağrısı {eski['encode_cagrisi']} -> {tek['encode_cagrisi']}, "
+        f"vektör sorgusu {eski['vektor_sorgusu']} -> {tek['vektor_sorgusu']}, "
+        f"{eski['sure_ms']:.1f} -> {tek['sure_ms']:.1f} ms/soru, aynı en iyi cevap "
+        f"{genisletme['ayni_en_iyi']}/{genisletme['soru_sayisi']} (aynı varyantla soru başına yol: "
+        f"{genisletme['ayni_en_iyi_soru_basina']}/{genisletme['soru_sayisi']})"
+    )
+    for soru, eski_id, tek_id in genisletme['farkli']:
+        print(f"   ↳ {soru!r}: eski {eski_id}, tek geçiş {tek_id}")
+
+    for olcum in zaman_butcesi_olcumu():
+        atlanan = ', '.join(f"{a} {n}" for a, n in olcum['atlanan'].items() if n) or 'yok'
+        asim = ', '.join(f"{a} {n}" for a, n in olcum['asim'].items() if n) or 'yok'
+        butce = 'yok' if olcum['butce'] is None else f"{olcum['butce'] * 1000:.0f} ms"
+        print(
+            f"⏱️ Zaman bütçesi ({butce}): "
+            f"{olcum['sure_ms']:.1f} ms/soru, bozulmuş {olcum['bozulmus']}/{olcum['soru_sayisi']}, "
+            f"atlanan: {atlanan}, aşım: {asim}, bütçesizle aynı en iyi cevap "
+            f"{olcum['ayni_en_iyi']}/{olcum['soru_sayisi']}"
+        )
+
+    for esik in (0.3, 0.0):
+        uyarlanir = uyarlanir_k_olcumu(esik=esik)
+        sabit, uy = uyarlanir['sabit'], uyarlanir['uyarlanir']
+        print(
+            f"📈 Uyarlanır k ({uyarlanir['kayit_sayisi']} kayıt, eşik {esik}, "
+            f"{uyarlanir['cevapli']}/{uyarlanir['soru_sayisi']} cevaplı): soru başına istenen aday "
+            f"{uy['max_k']} -> {uy['ortalama_istenen_aday']}, genişletilen {uy['genisletilen_sorgu']}/{uy['sorgu']} "
+            f"({uy['genisletme_turu']} tur), {sabit['sure_ms']:.2f} -> {uy['sure_ms']:.2f} ms/soru - "
+            f"{'✅ aynı sonuç' if uyarlanir['ayni_sonuc'] else '❌ FARKLI'}"
+        )
+
+    shard = shard_olcumu()
+    print(
+        f"🧩 Kategori shard'ları ({shard['kayit_sayisi']} kayıt, {shard['shard_sayisi']} shard): "
+        f"sorgu tek {shard['tek_sorgu_ms']:.2f} ms / shard {shard['shard_sorgu_ms']:.2f} ms, "
+        f"filtreli tek {shard['tek_filtreli_ms']:.2f} ms / shard {shard['shard_filtreli_ms']:.2f} ms, "
+        f"kategori silme {shard['tek_silme_ms']:.1f} ms -> {shard['shard_silme_ms']:.1f} ms - "
+        f"{'✅ aynı sonuç' if shard['ayni_sonuc'] and shard['ayni_sayi'] else '❌ FARKLI'}"
+    )
+
+    asenkron = async_soru_yanit_olcumu()
+    print(
+        f"⚡ Async soru-yanıt ({asenkron['soru_sayisi']} eşzamanlı soru, encode 20 ms): "
+        f"senkron {asenkron['senkron']['sure_s']:.2f}s -> async {asenkron['async']['sure_s']:.2f}s, "
+        f"en uzun loop bloklanması {asenkron['senkron']['max_loop_gecikmesi_ms']:.1f} -> "
+        f"{asenkron['async']['max_loop_gecikmesi_ms']:.1f} ms; cache turu {asenkron['cache_turu']['sure_s'] * 1000:.1f} ms, "
+        f"{asenkron['cache_turu_encode']} encode - {'✅ aynı sonuç' if asenkron['ayni_sonuc'] else '❌ FARKLI'}"
+    )
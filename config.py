@@ -10,9 +10,27 @@ MODEL_CONFIG = {
     'model_name': 'sentence-transformers/distiluse-base-multilingual-cased',
     'collection_name': 'sigorta_v2_optimized',
     'cache_size': 100,
+    'cache_shards': 16,            # Kilit-şeritli cache parça sayısı
+    'cache_ttl_seconds': 3600,     # Sonuç cache kayıt ömrü (None: süresiz)
+    'cache_max_bytes': 16 * 1024 * 1024,  # Sonuç cache bayt bütçesi (None: sınırsız)
+    'cache_backend': 'memory',     # 'memory' veya 'sqlite' (süreçler arası paylaşılan)
+    'negative_cache_size': 200,    # Cevapsız sorular için ayrı cache
+    'negative_cache_ttl_seconds': 300,
+    'semantic_cache': False,       # Benzer (paraphrase) sorular için ikinci kademe cache - eşik ölçülene kadar kapalı
+    'semantic_cache_size': 500,
+    'semantic_cache_max_distance': 0.08,  # Kosinüs mesafesi eşiği (gerçek modelde doğrulanmadı)
+    'query_embedding_cache_size': 256,    # Sorgu embedding LRU'su (temizlenmiş soru başına)
+    'cache_key_diacritic_folding': True,  # Cache anahtarında ş->s, ı->i (Türkçe klavyesiz yazım)
     'max_tokens': 512,
     'distance_metric': 'cosine',
-    'batch_size': 10
+    'batch_size': 10,
+    'persistent_storage': True,    # Vektörler diskte saklanır, yeniden başlatmada tekrar embedding yok
+    'vector_store_backend': 'chroma',  # 'chroma' veya 'numpy' (süreç içi tam arama, ~100k belgeye kadar)
+    'vector_store_sharding': False,    # Kategori başına ayrı shard (büyük, dengeli kategorilerde açın)
+    'hnsw_search_ef': 100,         # Chroma HNSW arama havuzu (en az max_search_results - uyarlanır k için)
+    'async_encode_workers': 2,     # Async API: encode (CPU) thread sayısı
+    'async_arama_workers': 8,      # Async API: vektör deposu sorgusu thread sayısı
+    'embedding_cache': True        # Disk tabanlı embedding önbelleği (yalnızca veri yükleme; sorgular bellek içi LRU)
 }
 
 # 🎨 ARAYÜZ KONFIGÜRASYONU
@@ -35,9 +53,21 @@ SEARCH_CONFIG = {
     'min_content_length': 50,      # 30'dan artırıldı
     'category_bonus': 0.4,         # 0.3'ten artırıldı
     'keyword_bonus_max': 0.5,      # 0.4'ten artırıldı
+    'two_phase_retrieval': True,   # Önce id/mesafe/metadata, belgeler sadece kazananlar için
+    'category_filter': True,       # Tam eşleştirmede sadece o kategoride ara, sonuç yoksa global
+    'batch_query_size': 256,       # Toplu aramada tek vektör sorgusundaki embedding sayısı
+    'adaptive_k': True,            # Aday sayısı küçük başlar, kazanan kesinleşmezse ikiye katlanır
+    'adaptive_k_min': 4,           # Uyarlanır k'nin başlangıç / alt sınırı
+    'adaptive_k_ema': 0.2,         # Kategori başına öğrenilen k'nin üstel ortalama katsayısı
+    'deadline_aware': True,        # soru_yanit/arama_yap hedef yanıt süresi bütçesiyle çalışır
+    'deadline_stage_min_remaining': {  # İsteğe bağlı aşama için gereken kalan bütçe oranı
+        'soru_genisletme': 0.5,
+        'kategori_filtresi': 0.25,
+        'keyword_bonusu': 0.1
+    },
     # YENİ EKLEMELER:
-    'multi_search': True,          # Çoklu arama
-    'question_expansion': True,    # Soru genişletme
+    'multi_search': True,          # Çoklu arama - soru varyantları tek vektör sorgusunda
+    'question_expansion': True,    # Soru genişletme - QUESTION_EXPANSION ile varyant üretimi
     'cross_validation': True,      # Çapraz doğrulama
     'confidence_threshold': 0.75   # Güven eşiği
 }
@@ -225,7 +255,11 @@ DATA_CONFIG = {
     'json_file': 'sigorta_bilgi_bankasi.json',
     'backup_file': 'sigorta_test_data.json',
     'encoding': 'utf-8',
-    'required_fields': ['id', 'icerik', 'kategori']
+    'required_fields': ['id', 'icerik', 'kategori'],
+    'vector_store_dir': 'chroma_db',        # Kalıcı ChromaDB dizini
+    'numpy_store_dir': 'numpy_store',       # Kalıcı NumPy vektör deposu dizini
+    'embedding_cache_dir': 'embedding_cache',  # Memory-mapped embedding önbelleği
+    'cache_db_file': 'cache/sonuc_cache.sqlite3'  # SQLite sonuç cache dosyası
 }
 
 # 🎨 CSS STİLLERİ
@@ -4,60 +4,268 @@
 JSON verilerini ChromaDB'ye yükleme ve işleme
 """
 import json
+import hashlib
 import streamlit as st
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Set
 import uuid
 import time
+from keyword_matcher import SigortaKeywordMatcher
+
+def _icerik_hash_hesapla(icerik: str, metadata: Dict) -> str:
+    """#️⃣ Belge içeriği ve metadata'sından kararlı hash"""
+    hash_girdisi = json.dumps(
+        {'icerik': icerik, 'metadata': {k: v for k, v in metadata.items() if k != 'icerik_hash'}},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(hash_girdisi.encode('utf-8')).hexdigest()
 
 class SigortaDataProcessor:
     """📊 Sigorta Veri İşleyicisi"""
     
-    def __init__(self, config):
+    def __init__(self, config, embedding_cache=None):
         self.config = config
         self.data_config = config['data']
+        self.embedding_cache = embedding_cache
+        
+        # Anahtar kelime imzaları yükleme sırasında bir kez hesaplanır
+        self.keyword_matcher = SigortaKeywordMatcher(config['categories'], config['exact_matches'])
+        
+        # Collection değişikliği dinleyicileri - cache geçersiz kılma için
+        self._degisiklik_dinleyicileri: List[Callable] = []
         
-    def load_and_embed_data(self, json_file: str, collection, embedding_model) -> int:
-        """📚 JSON verisini yükle ve embedding'lerle ChromaDB'ye kaydet"""
+        # Uyarı/hata mesajları - None ise doğrudan Streamlit'e (bkz. SigortaModelCore.sistem_baslat)
+        self.bildirim: Optional[Callable[[str, str], None]] = None
+    
+    def _bildir(self, seviye: str, mesaj: str):
+        """📣 Uyarı/hata mesajı - bildirim fonksiyonu yoksa Streamlit'e"""
+        if self.bildirim is not None:
+            self.bildirim(seviye, mesaj)
+        else:
+            getattr(st, seviye)(mesaj)
+
+    def degisiklik_dinleyicisi_ekle(self, dinleyici: Callable):
+        """👂 Collection değiştiğinde çağrılacak fonksiyon kaydet
+
+        Dinleyici `(kategoriler: Set[str], idler: Set[str], tumu: bool)` alır.
+        """
+        self._degisiklik_dinleyicileri.append(dinleyici)
+    
+    def _degisiklik_bildir(self, kategoriler: Set[str], idler: Set[str], tumu: bool = False):
+        """📣 Dinleyicilere değişen kategori ve belge id'lerini bildir"""
+        if not (kategoriler or idler or tumu):
+            return
+        for dinleyici in self._degisiklik_dinleyicileri:
+            try:
+                dinleyici(set(kategoriler), set(idler), tumu)
+            except Exception as e:
+                self._bildir('warning', f"Değişiklik bildirimi hatası: {str(e)}")
+    
+    def load_and_embed_data(self, json_file: str, collection, embedding_model) -> Dict:
+        """📚 JSON verisini yükle ve batch embedding'lerle ChromaDB'ye kaydet"""
+        rapor = self._bos_yukleme_raporu()
         try:
-            # JSON dosyasını oku
-            with open(json_file, 'r', encoding=self.data_config['encoding']) as f:
-                data = json.load(f)
-            
-            if not data:
-                st.error("JSON dosyası boş!")
-                return 0
-            
-            # Veri formatını kontrol et
-            if isinstance(data, dict) and 'veri' in data:
-                veri_listesi = data['veri']
-            elif isinstance(data, list):
-                veri_listesi = data
-            else:
-                st.error("Desteklenmeyen JSON formatı!")
-                return 0
-            
-            # Verileri işle ve yükle
-            yuklenen_sayisi = 0
+            # JSON dosyasını oku ve doğrula
+            veri_listesi = self._veri_listesi_oku(json_file)
+            gecerli_veriler = self._gecerli_verileri_ayir(veri_listesi, rapor)
+            
+            # Batch halinde yükle
+            rapor = self._toplu_yukle(gecerli_veriler, collection, embedding_model, rapor)
+            self._degisiklik_bildir(
+                {item['kategori'] for item in gecerli_veriler},
+                {str(item['id']) for item in gecerli_veriler}
+            )
+            return rapor
             
-            for item in veri_listesi:
-                if self._veri_dogrula(item):
-                    success = self._veri_yukle(item, collection, embedding_model)
-                    if success:
-                        yuklenen_sayisi += 1
+        except FileNotFoundError:
+            self._bildir('error', f"JSON dosyası bulunamadı: {json_file}")
+            return rapor
+        except json.JSONDecodeError as e:
+            self._bildir('error', f"JSON parse hatası: {str(e)}")
+            return rapor
+        except ValueError as e:
+            self._bildir('error', str(e))
+            return rapor
+        except Exception as e:
+            self._bildir('error', f"Veri yükleme hatası: {str(e)}")
+            return rapor
+    
+    def artimli_senkronize(self, json_file: str, collection, embedding_model) -> Dict:
+        """🔄 JSON ile collection'ı içerik hash'lerine göre senkronize et"""
+        rapor = {
+            'eklenen': 0,
+            'guncellenen': 0,
+            'degismeyen': 0,
+            'silinen': 0,
+            'hatali_kayitlar': [],
+            'yukleme_raporu': None
+        }
+        try:
+            veri_listesi = self._veri_listesi_oku(json_file)
+            gecerli_veriler = self._gecerli_verileri_ayir(veri_listesi, rapor)
+            
+            # JSON tarafı: id -> (item, hazırlanmış kayıt) - aynı id tekrar ederse son kayıt geçerli
+            hedef = {}
+            for item in gecerli_veriler:
+                kayit = self._veri_hazirla(item)
+                hedef[kayit['id']] = (item, kayit)
+            
+            # Collection tarafı: id -> saklanan hash ve kategori
+            mevcut = collection.get(include=['metadatas'])
+            mevcut_hashler = {}
+            mevcut_kategoriler = {}
+            for veri_id, metadata in zip(mevcut['ids'], mevcut['metadatas'] or []):
+                mevcut_hashler[veri_id] = (metadata or {}).get('icerik_hash')
+                mevcut_kategoriler[veri_id] = (metadata or {}).get('kategori')
+            
+            yeni_veriler = []
+            degisen_veriler = []
+            yazilacak_kayitlar = []
+            for veri_id, (item, kayit) in hedef.items():
+                if veri_id not in mevcut_hashler:
+                    yeni_veriler.append(item)
+                elif mevcut_hashler[veri_id] != kayit['metadata']['icerik_hash']:
+                    degisen_veriler.append(item)
                 else:
-                    st.warning(f"Geçersiz veri atlandı: {item.get('id', 'Bilinmeyen')}")
-            
-            return yuklenen_sayisi
+                    rapor['degismeyen'] += 1
+                    continue
+                yazilacak_kayitlar.append(kayit)
+            
+            silinecek_idler = [veri_id for veri_id in mevcut_hashler if veri_id not in hedef]
+            
+            # Yeni + değişenler önce embed edilip yerinde değiştirilir (upsert); encode sırasında
+            # ve encode'u başarısız olan kayıtta eski sürüm sunulmaya devam eder
+            if yazilacak_kayitlar:
+                yukleme_raporu = self._kayitlari_toplu_yukle(
+                    yazilacak_kayitlar, collection, embedding_model, degistir=True
+                )
+                hatali_idler = {kayit['id'] for kayit in yukleme_raporu['hatali_kayitlar']}
+                rapor['eklenen'] = sum(1 for item in yeni_veriler if str(item['id']) not in hatali_idler)
+                rapor['guncellenen'] = sum(1 for item in degisen_veriler if str(item['id']) not in hatali_idler)
+                rapor['hatali_kayitlar'].extend(yukleme_raporu['hatali_kayitlar'])
+                rapor['yukleme_raporu'] = yukleme_raporu
+            
+            # Sadece JSON'dan gerçekten kaldırılan kayıtlar silinir
+            if silinecek_idler:
+                collection.delete(ids=silinecek_idler)
+            rapor['silinen'] = len(silinecek_idler)
+            
+            # Etkilenen belgeler: eski ve yeni kategorileriyle
+            eski_idler = silinecek_idler + [str(item['id']) for item in degisen_veriler]
+            etkilenen_idler = set(eski_idler) | {str(item['id']) for item in yeni_veriler}
+            etkilenen_kategoriler = {mevcut_kategoriler.get(veri_id) for veri_id in eski_idler}
+            etkilenen_kategoriler |= {item['kategori'] for item in yeni_veriler + degisen_veriler}
+            etkilenen_kategoriler.discard(None)
+            self._degisiklik_bildir(etkilenen_kategoriler, etkilenen_idler)
+            
+            return rapor
             
         except FileNotFoundError:
-            st.error(f"JSON dosyası bulunamadı: {json_file}")
-            return 0
+            self._bildir('error', f"JSON dosyası bulunamadı: {json_file}")
+            return rapor
         except json.JSONDecodeError as e:
-            st.error(f"JSON parse hatası: {str(e)}")
-            return 0
+            self._bildir('error', f"JSON parse hatası: {str(e)}")
+            return rapor
+        except ValueError as e:
+            self._bildir('error', str(e))
+            return rapor
         except Exception as e:
-            st.error(f"Veri yükleme hatası: {str(e)}")
-            return 0
+            self._bildir('error', f"Senkronizasyon hatası: {str(e)}")
+            return rapor
+    
+    def _veri_listesi_oku(self, json_file: str) -> List[Dict]:
+        """📖 JSON dosyasından veri listesini okuma"""
+        with open(json_file, 'r', encoding=self.data_config['encoding']) as f:
+            data = json.load(f)
+        
+        if not data:
+            raise ValueError("JSON dosyası boş!")
+        
+        # Veri formatını kontrol et
+        if isinstance(data, dict) and 'veri' in data:
+            return data['veri']
+        if isinstance(data, list):
+            return data
+        raise ValueError("Desteklenmeyen JSON formatı!")
+    
+    def _gecerli_verileri_ayir(self, veri_listesi: List[Dict], rapor: Dict) -> List[Dict]:
+        """✅ Geçerli verileri ayır, geçersizleri rapora yaz"""
+        gecerli_veriler = []
+        for item in veri_listesi:
+            if self._veri_dogrula(item):
+                gecerli_veriler.append(item)
+            else:
+                self._bildir('warning', f"Geçersiz veri atlandı: {item.get('id', 'Bilinmeyen')}")
+                rapor['hatali_kayitlar'].append({
+                    'id': item.get('id', 'Bilinmeyen'),
+                    'hata': 'Doğrulama başarısız'
+                })
+        return gecerli_veriler
+    
+    def _bos_yukleme_raporu(self) -> Dict:
+        """📋 Boş yükleme raporu"""
+        return {
+            'yuklenen_sayisi': 0,
+            'hatali_kayitlar': [],
+            'batch_istatistikleri': [],
+            'toplam_sure': 0.0,
+            'belge_per_saniye': 0.0
+        }
+    
+    def _toplu_yukle(self, veriler: List[Dict], collection, embedding_model,
+                     rapor: Optional[Dict] = None) -> Dict:
+        """📦 Doğrulanmış verileri batch halinde encode edip ChromaDB'ye yaz"""
+        return self._kayitlari_toplu_yukle(
+            [self._veri_hazirla(item) for item in veriler], collection, embedding_model, rapor
+        )
+    
+    def _kayitlari_toplu_yukle(self, kayitlar: List[Dict], collection, embedding_model,
+                               rapor: Optional[Dict] = None, degistir: bool = False) -> Dict:
+        """📦 Hazırlanmış kayıtları batch halinde yaz - `degistir`: mevcut id'ler yeni sürümle değişir"""
+        if rapor is None:
+            rapor = self._bos_yukleme_raporu()
+        
+        batch_size = max(1, int(self.config['model'].get('batch_size', 10)))
+        
+        # Uzunluğa göre sırala - aynı batch'teki metinler benzer uzunlukta olsun (daha az padding)
+        kayitlar = sorted(kayitlar, key=lambda kayit: len(kayit['icerik']))
+        
+        baslangic = time.time()
+        
+        for batch_no, i in enumerate(range(0, len(kayitlar), batch_size), start=1):
+            batch = kayitlar[i:i + batch_size]
+            batch_baslangic = time.time()
+            yuklenen = 0
+            
+            try:
+                self._kayitlari_ekle(batch, collection, embedding_model, batch_size, degistir)
+                yuklenen = len(batch)
+            except Exception:
+                # Batch başarısız - hatalı kaydı izole etmek için tek tek dene
+                for kayit in batch:
+                    try:
+                        self._kayitlari_ekle([kayit], collection, embedding_model, batch_size, degistir)
+                        yuklenen += 1
+                    except Exception as e:
+                        self._bildir('warning', f"Veri yükleme hatası {kayit['id']}: {str(e)}")
+                        rapor['hatali_kayitlar'].append({'id': kayit['id'], 'hata': str(e)})
+            
+            batch_suresi = time.time() - batch_baslangic
+            rapor['yuklenen_sayisi'] += yuklenen
+            rapor['batch_istatistikleri'].append({
+                'batch_no': batch_no,
+                'boyut': len(batch),
+                'yuklenen': yuklenen,
+                'sure': batch_suresi,
+                'belge_per_saniye': yuklenen / batch_suresi if batch_suresi > 0 else 0.0
+            })
+        
+        toplam_sure = time.time() - baslangic
+        rapor['toplam_sure'] += toplam_sure
+        rapor['belge_per_saniye'] = (
+            rapor['yuklenen_sayisi'] / rapor['toplam_sure'] if rapor['toplam_sure'] > 0 else 0.0
+        )
+        return rapor
     
     def _veri_dogrula(self, item: Dict) -> bool:
         """✅ Veri doğrulama"""
@@ -81,41 +289,58 @@ class SigortaDataProcessor:
         
         return True
     
-    def _veri_yukle(self, item: Dict, collection, embedding_model) -> bool:
-        """📥 Tek veriyi ChromaDB'ye yükleme"""
-        try:
-            # Veri alanlarını al
-            veri_id = str(item.get('id', str(uuid.uuid4())))
-            icerik = item.get('icerik', '')
-            kategori = item.get('kategori', 'genel')
-            metadata = item.get('metadata', {})
-            
-            # Metadata'yı genişlet
-            full_metadata = {
-                'kategori': kategori,
-                'kaynak': metadata.get('kaynak', 'Sigorta Rehberi'),
-                'police_maddesi': metadata.get('police_maddesi', ''),
-                'guncelleme_tarihi': metadata.get('guncelleme_tarihi', ''),
-                'etiketler': metadata.get('etiketler', []),
-                'id': veri_id
-            }
-            
-            # İçeriği embedding'e çevir
-            embedding = embedding_model.encode([icerik])
-            
-            # ChromaDB'ye ekle
-            collection.add(
-                embeddings=embedding,
-                documents=[icerik],
-                metadatas=[full_metadata],
-                ids=[veri_id]
-            )
-            
-            return True
-            
-        except Exception as e:
-            st.warning(f"Veri yükleme hatası {item.get('id', 'Bilinmeyen')}: {str(e)}")
-            return False
+    def _veri_hazirla(self, item: Dict) -> Dict:
+        """🧾 Ham veriyi ChromaDB kaydına dönüştürme"""
+        veri_id = str(item.get('id', str(uuid.uuid4())))
+        icerik = item.get('icerik', '')
+        kategori = item.get('kategori', 'genel')
+        metadata = item.get('metadata', {})
+        
+        # ChromaDB metadata değerleri liste kabul etmez
+        etiketler = metadata.get('etiketler', [])
+        if isinstance(etiketler, list):
+            etiketler = ', '.join(str(etiket) for etiket in etiketler)
+        
+        # Metadata'yı genişlet
+        full_metadata = {
+            'kategori': kategori,
+            'kaynak': metadata.get('kaynak', 'Sigorta Rehberi'),
+            'police_maddesi': metadata.get('police_maddesi', ''),
+            'guncelleme_tarihi': metadata.get('guncelleme_tarihi', ''),
+            'etiketler': etiketler,
+            'id': veri_id,
+            'icerik_uzunlugu': len(icerik)
+        }
+        
+        # Kategori başına anahtar kelime bit maskeleri - sorguda metin taraması yerine
+        full_metadata.update(self.keyword_matcher.dokuman_imzasi(icerik))
+        
+        # İçerik hash'i - artımlı senkronizasyonda değişiklik tespiti için
+        full_metadata['icerik_hash'] = _icerik_hash_hesapla(icerik, full_metadata)
+        
+        return {'id': veri_id, 'icerik': icerik, 'metadata': full_metadata}
+    
+    def _kayitlari_ekle(self, kayitlar: List[Dict], collection, embedding_model, batch_size: int = 10,
+                        degistir: bool = False):
+        """📥 Kayıtları tek encode + tek add (veya upsert) çağrısıyla ChromaDB'ye yazma"""
+        icerikler = [kayit['icerik'] for kayit in kayitlar]
+        
+        # İçerikleri tek seferde embedding'e çevir
+        embeddings = self._encode(embedding_model, icerikler, batch_size=batch_size)
+        
+        # ChromaDB'ye ekle - değiştirmede mevcut sürüm yenisi yazılana kadar yerinde kalır
+        (collection.upsert if degistir else collection.add)(
+            embeddings=embeddings,
+            documents=icerikler,
+            metadatas=[kayit['metadata'] for kayit in kayitlar],
+            ids=[kayit['id'] for kayit in kayitlar]
+        )
+    
+    def _encode(self, embedding_model, metinler: List[str], **encode_kwargs):
+        """🔢 Önce embedding önbelleğine bak, eksikleri encode et"""
+        if self.embedding_cache is not None:
+            return self.embedding_cache.encode(embedding_model, metinler, **encode_kwargs)
+        return embedding_model.encode(metinler, **encode_kwargs)
     
     def veri_istatistikleri_al(self, json_file: str) -> Dict:
         """📊 JSON dosyası istatistikleri"""
@@ -161,21 +386,62 @@ class SigortaDataProcessor:
     def kategori_temizle(self, collection, kategori: str) -> int:
         """🗑️ Belirli kategorideki verileri temizle"""
         try:
-            # Kategori filtresiyle sorgu yap
-            sonuclar = collection.get(
-                where={"kategori": kategori}
-            )
-            
-            if sonuclar['ids']:
-                # Bulunan ID'leri sil
-                collection.delete(ids=sonuclar['ids'])
-                return len(sonuclar['ids'])
+            silinen_idler = self._kategoriyi_sil(collection, kategori)
+            if silinen_idler:
+                self._degisiklik_bildir({kategori}, set(silinen_idler))
+            return len(silinen_idler)
             
+        except Exception as e:
+            self._bildir('error', f"Kategori temizleme hatası: {str(e)}")
             return 0
+    
+    def _kategoriyi_sil(self, collection, kategori: str) -> List[str]:
+        """🗑️ Kategori shard'ını toptan düşür; shard'sız depoda filtreyle bul ve sil"""
+        if hasattr(collection, 'shard_dusur'):
+            return collection.shard_dusur(kategori)
+        
+        # Kategori filtresiyle sorgu yap
+        sonuclar = collection.get(
+            where={"kategori": kategori}
+        )
+        if sonuclar['ids']:
+            # Bulunan ID'leri sil
+            collection.delete(ids=sonuclar['ids'])
+        return list(sonuclar['ids'])
+    
+    def kategori_yeniden_olustur(self, json_file: str, collection, embedding_model, kategori: str) -> Dict:
+        """🔁 Tek kategoriyi JSON'dan yeniden yükle - diğer kategorilere dokunulmaz"""
+        rapor = self._bos_yukleme_raporu()
+        rapor['silinen'] = 0
+        try:
+            veri_listesi = [
+                item for item in self._veri_listesi_oku(json_file)
+                if item.get('kategori') == kategori
+            ]
+            gecerli_veriler = self._gecerli_verileri_ayir(veri_listesi, rapor)
+            
+            silinen_idler = self._kategoriyi_sil(collection, kategori)
+            rapor['silinen'] = len(silinen_idler)
+            rapor = self._toplu_yukle(gecerli_veriler, collection, embedding_model, rapor)
+            
+            self._degisiklik_bildir(
+                {kategori},
+                set(silinen_idler) | {str(item['id']) for item in gecerli_veriler}
+            )
+            return rapor
             
+        except FileNotFoundError:
+            self._bildir('error', f"JSON dosyası bulunamadı: {json_file}")
+            return rapor
+        except json.JSONDecodeError as e:
+            self._bildir('error', f"JSON parse hatası: {str(e)}")
+            return rapor
+        except ValueError as e:
+            self._bildir('error', str(e))
+            return rapor
         except Exception as e:
-            st.error(f"Kategori temizleme hatası: {str(e)}")
-            return 0
+            self._bildir('error', f"Kategori yeniden oluşturma hatası: {str(e)}")
+            return rapor
     
     def tum_veriyi_temizle(self, collection) -> bool:
         """🗑️ Tüm veriyi temizle"""
@@ -186,12 +452,13 @@ class SigortaDataProcessor:
             if sonuclar['ids']:
                 # Tüm ID'leri sil
                 collection.delete(ids=sonuclar['ids'])
+                self._degisiklik_bildir(set(), set(sonuclar['ids']), tumu=True)
                 return True
             
             return True
             
         except Exception as e:
-            st.error(f"Veri temizleme hatası: {str(e)}")
+            self._bildir('error', f"Veri temizleme hatası: {str(e)}")
             return False
     
     def veri_guncelle(self, collection, veri_id: str, yeni_icerik: str, embedding_model) -> bool:
@@ -204,11 +471,14 @@ class SigortaDataProcessor:
                 return False
             
             # Yeni embedding oluştur
-            yeni_embedding = embedding_model.encode([yeni_icerik])
+            yeni_embedding = self._encode(embedding_model, [yeni_icerik])
             
             # Metadata'yı güncelle
             metadata = mevcut['metadatas'][0] if mevcut['metadatas'] else {}
             metadata['guncelleme_tarihi'] = str(time.time())
+            metadata['icerik_uzunlugu'] = len(yeni_icerik)
+            metadata.update(self.keyword_matcher.dokuman_imzasi(yeni_icerik))
+            metadata['icerik_hash'] = _icerik_hash_hesapla(yeni_icerik, metadata)
             
             # Veriyi güncelle (önce sil, sonra ekle)
             collection.delete(ids=[veri_id])
@@ -219,23 +489,28 @@ class SigortaDataProcessor:
                 ids=[veri_id]
             )
             
+            self._degisiklik_bildir({metadata.get('kategori')} - {None}, {veri_id})
             return True
             
         except Exception as e:
-            st.error(f"Veri güncelleme hatası: {str(e)}")
+            self._bildir('error', f"Veri güncelleme hatası: {str(e)}")
             return False
     
     def veritabani_ozmeti(self, collection) -> Dict:
         """📋 Veritabanı özeti"""
         try:
+            # Shard boyutları - shard'sız depoda boş
+            shardlar = collection.shard_boyutlari() if hasattr(collection, 'shard_boyutlari') else {}
+            
             # Tüm verileri al (sadece metadata)
-            sonuclar = collection.get()
+            sonuclar = collection.get(include=['metadatas'])
             
             if not sonuclar['ids']:
                 return {
                     'toplam_belge': 0,
                     'kategoriler': {},
                     'kaynaklar': {},
+                    'shardlar': shardlar,
                     'durum': 'Boş veritabanı'
                 }
             
@@ -257,6 +532,7 @@ class SigortaDataProcessor:
                 'toplam_belge': len(sonuclar['ids']),
                 'kategoriler': kategoriler,
                 'kaynaklar': kaynaklar,
+                'shardlar': shardlar,
                 'durum': 'Aktif'
             }
             
@@ -265,6 +541,7 @@ class SigortaDataProcessor:
                 'toplam_belge': 0,
                 'kategoriler': {},
                 'kaynaklar': {},
+                'shardlar': {},
                 'durum': f'Hata: {str(e)}'
             }
 
@@ -0,0 +1,212 @@
+# embedding_cache.py - Kalıcı Embedding Önbelleği
+"""
+💾 Disk Tabanlı Embedding Önbelleği
+(model adı, sha256(normalize metin)) anahtarlı, memory-mapped float32 deposu
+"""
+import os
+import json
+import hashlib
+import threading
+import unicodedata
+from typing import List, Dict, Optional
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows - süreçler arası kilit yok, sadece thread kilidi
+    fcntl = None
+
+class SigortaEmbeddingCache:
+    """💾 Memory-mapped embedding önbelleği
+
+    Dizin yapısı (model başına bir alt dizin):
+        keys.bin    - satır başına 32 byte sha256 özeti
+        vectors.f32 - satır başına `boyut` adet float32
+        meta.json   - model adı ve vektör boyutu
+
+    Dosyalar sadece sona eklenir; aynı dizini kullanan süreçler birbirinin
+    yazdığı satırları bir sonraki ıskada görür. Yalnızca belge embedding'leri
+    (veri yükleme) için kullanılır; sorgu embedding'leri sınırsız büyümesin diye
+    sorgu motorunun bellek içi LRU'sunda kalır.
+    """
+
+    ANAHTAR_BOYUTU = 32
+
+    def __init__(self, model_name: str, cache_dir: str):
+        self.model_name = model_name
+        model_hash = hashlib.md5(model_name.encode()).hexdigest()[:8]
+        self.dizin = os.path.join(cache_dir, model_hash)
+        os.makedirs(self.dizin, exist_ok=True)
+
+        self.anahtar_dosyasi = os.path.join(self.dizin, 'keys.bin')
+        self.vektor_dosyasi = os.path.join(self.dizin, 'vectors.f32')
+        self.meta_dosyasi = os.path.join(self.dizin, 'meta.json')
+        self.kilit_dosyasi = os.path.join(self.dizin, '.lock')
+
+        self._lock = threading.RLock()
+        self._indeks = {}          # sha256 özeti -> satır numarası
+        self._satir_sayisi = 0
+        self._vektorler = None     # np.memmap (satır_sayisi, boyut)
+        self.boyut = None
+
+        self.stats = {
+            'hit': 0,
+            'miss': 0,
+            'yazilan': 0
+        }
+
+        self._meta_yukle()
+        self._yenile()
+
+    def encode(self, embedding_model, metinler: List[str], **encode_kwargs) -> np.ndarray:
+        """🔢 Önbellekten oku, eksikleri tek encode çağrısıyla hesapla ve kaydet"""
+        anahtarlar = [self._anahtar_olustur(metin) for metin in metinler]
+
+        with self._lock:
+            eksik_sayisi = sum(1 for a in anahtarlar if a not in self._indeks)
+            if eksik_sayisi:
+                # Başka süreçlerin yazdıklarını al
+                self._yenile()
+            eksikler = {a for a in anahtarlar if a not in self._indeks}
+            eksik_sayisi = sum(1 for a in anahtarlar if a in eksikler)
+
+            self.stats['hit'] += len(anahtarlar) - eksik_sayisi
+            self.stats['miss'] += eksik_sayisi
+
+        yeni_vektorler = {}
+        if eksikler:
+            # Aynı metin bir çağrıda birden çok kez geçebilir - bir kez encode et
+            eksik_metinler = {}
+            for metin, anahtar in zip(metinler, anahtarlar):
+                if anahtar in eksikler and anahtar not in eksik_metinler:
+                    eksik_metinler[anahtar] = metin
+
+            hesaplanan = np.asarray(
+                embedding_model.encode(list(eksik_metinler.values()), **encode_kwargs),
+                dtype=np.float32
+            )
+            yeni_vektorler = dict(zip(eksik_metinler.keys(), hesaplanan))
+            self._ekle(list(yeni_vektorler.keys()), hesaplanan)
+
+        with self._lock:
+            satirlar = []
+            for anahtar in anahtarlar:
+                if anahtar in yeni_vektorler:
+                    satirlar.append(yeni_vektorler[anahtar])
+                else:
+                    satirlar.append(np.array(self._vektorler[self._indeks[anahtar]]))
+
+        if not satirlar:
+            return np.zeros((0, self.boyut or 0), dtype=np.float32)
+        return np.vstack(satirlar)
+
+    def _anahtar_olustur(self, metin: str) -> bytes:
+        """🔑 Normalize metnin sha256 özeti (model dizin ile ayrışır)"""
+        # Model cased olduğu için harf büyüklüğü korunur, sadece Unicode ve boşluk normalize edilir
+        normalize = ' '.join(unicodedata.normalize('NFC', metin).split())
+        return hashlib.sha256(normalize.encode('utf-8')).digest()
+
+    def _meta_yukle(self):
+        """📋 Vektör boyutunu meta dosyasından oku"""
+        if os.path.exists(self.meta_dosyasi):
+            with open(self.meta_dosyasi, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            self.boyut = meta.get('boyut')
+
+    def _yenile(self):
+        """🔄 Diske eklenmiş yeni satırları indekse al"""
+        with self._lock:
+            if not self.boyut or not os.path.exists(self.anahtar_dosyasi):
+                return
+
+            satir_sayisi = self._tam_satir_sayisi()
+            if satir_sayisi <= self._satir_sayisi:
+                return
+
+            # Sadece yeni anahtarları oku
+            with open(self.anahtar_dosyasi, 'rb') as f:
+                f.seek(self._satir_sayisi * self.ANAHTAR_BOYUTU)
+                ham = f.read((satir_sayisi - self._satir_sayisi) * self.ANAHTAR_BOYUTU)
+
+            for i in range(len(ham) // self.ANAHTAR_BOYUTU):
+                ozet = ham[i * self.ANAHTAR_BOYUTU:(i + 1) * self.ANAHTAR_BOYUTU]
+                self._indeks.setdefault(ozet, self._satir_sayisi + i)
+
+            self._satir_sayisi = satir_sayisi
+            self._vektorler = np.memmap(
+                self.vektor_dosyasi, dtype=np.float32, mode='r',
+                shape=(satir_sayisi, self.boyut)
+            )
+
+    def _tam_satir_sayisi(self) -> int:
+        """📏 Hem anahtarı hem vektörü tam yazılmış satır sayısı"""
+        anahtar_satiri = os.path.getsize(self.anahtar_dosyasi) // self.ANAHTAR_BOYUTU
+        vektor_satiri = os.path.getsize(self.vektor_dosyasi) // (4 * self.boyut) if os.path.exists(self.vektor_dosyasi) else 0
+        return min(anahtar_satiri, vektor_satiri)
+
+    def _ekle(self, anahtarlar: List[bytes], vektorler: np.ndarray):
+        """💾 Yeni satırları dosyaların sonuna ekle (süreçler arası kilitli)"""
+        if not anahtarlar:
+            return
+
+        with self._lock:
+            with open(self.kilit_dosyasi, 'a') as kilit:
+                if fcntl:
+                    fcntl.flock(kilit, fcntl.LOCK_EX)
+                try:
+                    if self.boyut is None:
+                        self._meta_yukle()
+                    if self.boyut is None:
+                        self.boyut = int(vektorler.shape[1])
+                        with open(self.meta_dosyasi, 'w', encoding='utf-8') as f:
+                            json.dump({'model_name': self.model_name, 'boyut': self.boyut}, f)
+                    elif vektorler.shape[1] != self.boyut:
+                        return
+
+                    # Kilit altında güncel durumu al; yarım kalmış yazımları kes
+                    for dosya in (self.anahtar_dosyasi, self.vektor_dosyasi):
+                        if not os.path.exists(dosya):
+                            open(dosya, 'ab').close()
+                    self._yenile()
+                    satir_sayisi = self._tam_satir_sayisi()
+                    os.truncate(self.anahtar_dosyasi, satir_sayisi * self.ANAHTAR_BOYUTU)
+                    os.truncate(self.vektor_dosyasi, satir_sayisi * 4 * self.boyut)
+
+                    # Bu arada başka süreç yazdıysa tekrar yazma
+                    yeni = [i for i, a in enumerate(anahtarlar) if a not in self._indeks]
+                    if not yeni:
+                        return
+
+                    # Önce vektörler, sonra anahtarlar - okuyucu yarım satır görmez
+                    with open(self.vektor_dosyasi, 'ab') as f:
+                        f.write(np.ascontiguousarray(vektorler[yeni], dtype=np.float32).tobytes())
+                    with open(self.anahtar_dosyasi, 'ab') as f:
+                        f.write(b''.join(anahtarlar[i] for i in yeni))
+
+                    self.stats['yazilan'] += len(yeni)
+                    self._yenile()
+                finally:
+                    if fcntl:
+                        fcntl.flock(kilit, fcntl.LOCK_UN)
+
+    def get_stats(self) -> Dict:
+        """📊 Önbellek istatistikleri"""
+        with self._lock:
+            toplam = self.stats['hit'] + self.stats['miss']
+            return {
+                'hit': self.stats['hit'],
+                'miss': self.stats['miss'],
+                'hit_rate': int(self.stats['hit'] / toplam * 100) if toplam > 0 else 0,
+                'yazilan': self.stats['yazilan'],
+                'kayit_sayisi': self._satir_sayisi,
+                'boyut': self.boyut
+            }
+
+def create_embedding_cache(config) -> Optional[SigortaEmbeddingCache]:
+    """🏭 Konfigürasyona göre embedding önbelleği oluştur"""
+    if not config['model'].get('embedding_cache', False):
+        return None
+    return SigortaEmbeddingCache(
+        config['model']['model_name'],
+        config['data']['embedding_cache_dir']
+    )
@@ -0,0 +1,226 @@
+# keyword_matcher.py - Çok Desenli Anahtar Kelime Eşleştirme
+"""
+🔎 Aho-Corasick Anahtar Kelime Otomatı
+Tam eşleştirmeler, anahtar kelimeler ve negatif anahtar kelimeler tek otomatta;
+soru üzerinden tek geçişte tüm eşleşmeler
+"""
+import hashlib
+import json
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from text_normalizer import turkce_kucuk_harf
+
+# Anahtar kelime bonusuna giren, kategori başına ilk N anahtar kelime
+BONUS_KEYWORD_LIMITI = 10
+
+# Doküman metadata'sındaki imza alanları
+IMZA_VERSIYON_ALANI = 'kw_imza'
+IMZA_ALAN_ONEKI = 'kw_'
+
+class AhoCorasick:
+    """🔎 Aho-Corasick otomatı - tek geçişte tüm alt dizi eşleşmeleri
+
+    Her desen bir kez derlenir; arama maliyeti desen sayısından bağımsız olarak
+    metin uzunluğu + eşleşme sayısı ile orantılıdır.
+    """
+
+    def __init__(self, desenler: Iterable[str]):
+        self.desenler: List[str] = []
+        self._gecis: List[Dict[str, int]] = [{}]
+        self._hata: List[int] = [0]
+        self._cikti: List[Tuple[int, ...]] = [()]
+
+        desen_indeksi = {}
+        for desen in desenler:
+            if desen and desen not in desen_indeksi:
+                desen_indeksi[desen] = len(self.desenler)
+                self.desenler.append(desen)
+                self._desen_ekle(desen, desen_indeksi[desen])
+        self._hata_baglantilari_kur()
+
+    def _desen_ekle(self, desen: str, desen_no: int):
+        """➕ Deseni trie'ye ekle"""
+        dugum = 0
+        for karakter in desen:
+            sonraki = self._gecis[dugum].get(karakter)
+            if sonraki is None:
+                sonraki = len(self._gecis)
+                self._gecis[dugum][karakter] = sonraki
+                self._gecis.append({})
+                self._hata.append(0)
+                self._cikti.append(())
+            dugum = sonraki
+        self._cikti[dugum] = self._cikti[dugum] + (desen_no,)
+
+    def _hata_baglantilari_kur(self):
+        """🔗 BFS ile hata bağlantıları; çıktılar hata zinciri boyunca birleştirilir"""
+        kuyruk = deque(self._gecis[0].values())
+        while kuyruk:
+            dugum = kuyruk.popleft()
+            for karakter, cocuk in self._gecis[dugum].items():
+                kuyruk.append(cocuk)
+                hata = self._hata[dugum]
+                while hata and karakter not in self._gecis[hata]:
+                    hata = self._hata[hata]
+                hedef = self._gecis[hata].get(karakter, 0)
+                self._hata[cocuk] = hedef if hedef != cocuk else 0
+                self._cikti[cocuk] = self._cikti[cocuk] + self._cikti[self._hata[cocuk]]
+
+    def bul(self, metin: str) -> Set[int]:
+        """🔍 Metinde geçen desenlerin numaraları (tekrarlar tek sayılır)"""
+        gecis = self._gecis
+        hata = self._hata
+        cikti = self._cikti
+        bulunan = set()
+        dugum = 0
+        for karakter in metin:
+            while dugum and karakter not in gecis[dugum]:
+                dugum = hata[dugum]
+            dugum = gecis[dugum].get(karakter, 0)
+            if cikti[dugum]:
+                bulunan.update(cikti[dugum])
+        return bulunan
+
+class SigortaKeywordMatcher:
+    """🎯 Konfigürasyondaki tüm eşleştirme kurallarını tek otomatta derler
+
+    `eslesmeler()` soru için tam eşleşmeleri ve kategori başına pozitif/negatif
+    isabet sayılarını döndürür; kategori skoru bu tablodan hesaplanır.
+    """
+
+    def __init__(self, categories: Dict, exact_matches: Dict):
+        self.categories = categories
+        self.kategori_sirasi = list(categories.keys())
+
+        # desen -> [(rol, kategori, sıra)]; aynı desen birden çok role sahip olabilir
+        self._roller: Dict[str, List[Tuple[str, str, int]]] = {}
+        for sira, (tam_eslestirme, kategori) in enumerate(exact_matches.items()):
+            self._rol_ekle(tam_eslestirme, ('tam', kategori, sira))
+        for kategori, config in categories.items():
+            for sira, keyword in enumerate(config.get('keywords', [])):
+                self._rol_ekle(keyword, ('pozitif', kategori, sira))
+            for sira, neg_keyword in enumerate(config.get('negative_keywords', [])):
+                self._rol_ekle(neg_keyword, ('negatif', kategori, sira))
+
+        self.otomat = AhoCorasick(self._roller.keys())
+        self._desen_rolleri = [self._roller[desen] for desen in self.otomat.desenler]
+        
+        # Bonus anahtar kelimeleri değişirse eski doküman imzaları kullanılmaz
+        imza_girdisi = json.dumps(
+            {
+                kategori: [turkce_kucuk_harf(k) for k in config.get('keywords', [])[:BONUS_KEYWORD_LIMITI]]
+                for kategori, config in categories.items()
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        self.imza_versiyonu = hashlib.md5(imza_girdisi.encode('utf-8')).hexdigest()[:12]
+
+    def _rol_ekle(self, desen: str, rol: Tuple[str, str, int]):
+        self._roller.setdefault(turkce_kucuk_harf(desen), []).append(rol)
+
+    def eslesmeler(self, soru: str) -> Dict:
+        """🔍 Tek geçişte tüm isabetler
+
+        Dönüş:
+            tam: isabet eden tam eşleştirmelerin (sıra, kategori) listesi, sıralı
+            pozitif / negatif: kategori -> isabet eden kelime sayısı (liste tekrarları dahil)
+            keyword_indeksleri: kategori -> isabet eden anahtar kelimelerin liste sıraları
+        """
+        tam = []
+        pozitif: Dict[str, int] = {}
+        negatif: Dict[str, int] = {}
+        keyword_indeksleri: Dict[str, Set[int]] = {}
+
+        for desen_no in self.otomat.bul(turkce_kucuk_harf(soru)):
+            for rol, kategori, sira in self._desen_rolleri[desen_no]:
+                if rol == 'tam':
+                    tam.append((sira, kategori))
+                elif rol == 'pozitif':
+                    pozitif[kategori] = pozitif.get(kategori, 0) + 1
+                    keyword_indeksleri.setdefault(kategori, set()).add(sira)
+                else:
+                    negatif[kategori] = negatif.get(kategori, 0) + 1
+
+        tam.sort()
+        return {
+            'tam': tam,
+            'pozitif': pozitif,
+            'negatif': negatif,
+            'keyword_indeksleri': keyword_indeksleri
+        }
+
+    def kategori_tespit_et(self, eslesmeler: Dict) -> Optional[str]:
+        """🎯 İsabet tablosundan kategori - sıralı tarama ile aynı sonuç"""
+        # 1. Konfigürasyon sırasındaki ilk tam eşleştirme
+        if eslesmeler['tam']:
+            return eslesmeler['tam'][0][1]
+
+        # 2. Kategori skorlaması
+        en_iyi_kategori = None
+        en_iyi_skor = None
+        for kategori in self.kategori_sirasi:
+            config = self.categories[kategori]
+            skor = 0
+
+            # Toplama sırası sıralı taramayla aynı - float sonuç birebir korunur
+            for _ in range(eslesmeler['pozitif'].get(kategori, 0)):
+                skor += config.get('weight', 1.0)
+                skor += config.get('accuracy_boost', 0)
+            for _ in range(eslesmeler['negatif'].get(kategori, 0)):
+                skor -= 0.5
+
+            # Priorite bonusu
+            if config.get('priority') == 'high':
+                skor *= 1.2
+            elif config.get('priority') == 'medium':
+                skor *= 1.1
+
+            # Eşitlikte ilk kategori kazanır (max() davranışı)
+            if en_iyi_skor is None or skor > en_iyi_skor:
+                en_iyi_kategori, en_iyi_skor = kategori, skor
+
+        # Minimum eşik kontrolü
+        if en_iyi_skor is not None and en_iyi_skor > 0.5:
+            return en_iyi_kategori
+        return None
+
+    def dokuman_imzasi(self, icerik: str) -> Dict:
+        """🧾 Doküman için kategori başına anahtar kelime bit maskesi (metadata alanları)
+
+        Bit i: kategorinin i. anahtar kelimesi (ilk BONUS_KEYWORD_LIMITI içinde) dokümanda geçiyor.
+        """
+        maskeler = {kategori: 0 for kategori in self.kategori_sirasi}
+        for desen_no in self.otomat.bul(turkce_kucuk_harf(icerik)):
+            for rol, kategori, sira in self._desen_rolleri[desen_no]:
+                if rol == 'pozitif' and sira < BONUS_KEYWORD_LIMITI:
+                    maskeler[kategori] |= 1 << sira
+
+        imza = {IMZA_VERSIYON_ALANI: self.imza_versiyonu}
+        for kategori, maske in maskeler.items():
+            imza[IMZA_ALAN_ONEKI + kategori] = maske
+        return imza
+
+    def dokuman_maskesi(self, metadata: Optional[Dict], kategori: str) -> Optional[int]:
+        """🧾 Metadata'daki güncel maske; imza yoksa veya eskiyse None"""
+        if not metadata or metadata.get(IMZA_VERSIYON_ALANI) != self.imza_versiyonu:
+            return None
+        maske = metadata.get(IMZA_ALAN_ONEKI + kategori)
+        return int(maske) if maske is not None else None
+
+    def soru_maskesi(self, eslesmeler: Dict, kategori: str) -> int:
+        """🔑 Soruda geçen bonus anahtar kelimelerinin bit maskesi"""
+        maske = 0
+        for sira in eslesmeler['keyword_indeksleri'].get(kategori, ()):
+            if sira < BONUS_KEYWORD_LIMITI:
+                maske |= 1 << sira
+        return maske
+
+    def ortak_keywordler(self, eslesmeler: Dict, kategori: str,
+                         limit: int = BONUS_KEYWORD_LIMITI) -> List[str]:
+        """🔑 Soruda geçen, kategorinin ilk `limit` anahtar kelimesi (liste sırasıyla)"""
+        indeksler = eslesmeler['keyword_indeksleri'].get(kategori)
+        if not indeksler:
+            return []
+        keywords = self.categories.get(kategori, {}).get('keywords', [])
+        return [turkce_kucuk_harf(keywords[i]) for i in sorted(indeksler) if i < limit]
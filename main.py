@@ -159,6 +159,7 @@ def main():
             ui = components['ui']
             # ui.setup_page()  # Bu satırı kaldır - çifte config önlemek için
             ui.render_header()
+            ui.sistemi_baslat()  # Sidebar'daki sistem durumu ilk çalıştırmada da güncel olsun
             ui.render_sidebar()
             ui.render_main_interface()
             ui.render_integrated_advisor_section()
@@ -3,11 +3,26 @@
 🧠 Akıllı Sigorta Model Core - Optimize RAG-Only Sistem
 Doğruluk artırım optimizasyonları eklenmiş
 """
-from typing import List, Dict, Optional
+from contextlib import nullcontext
+from typing import Callable, List, Dict, Optional, Set
 import streamlit as st
+import threading
 import time
 import os
 from config import get_config
+from result_cache import SemanticQueryCache, StripedCache, ThreadLocalCounters, create_result_cache
+from text_normalizer import cache_anahtari_metni, turkce_kucuk_harf
+
+# Thread başına tutulan performans sayaçları
+SAYAC_ALANLARI = {
+    'sorgu_sayisi': 0,
+    'basari_sayisi': 0,
+    'hata_sayisi': 0,
+    'cache_hit': 0,
+    'negatif_cache_hit': 0,
+    'semantik_cache_hit': 0,
+    'toplam_sure': 0.0
+}
 
 class SigortaModelCore:
     """🧠 Optimize RAG-Only Sigorta Sistemi"""
@@ -18,59 +33,103 @@ class SigortaModelCore:
         
         # Temel bileşenler
         self.embedding_model = None
+        self.embedding_cache = None
         self.collection = None
         self.query_engine = None
         self.data_processor = None
         
-        # Cache sistemi
-        self.cache = {}
+        # Cache sistemi - backend konfigürasyondan (bellek içi LRU veya SQLite)
         self.cache_max_size = self.config['model']['cache_size']
+        self.cache = create_result_cache(self.config)
         
-        # Performans takibi
-        self.stats = {
-            'sorgu_sayisi': 0,
-            'basari_sayisi': 0,
-            'hata_sayisi': 0,
-            'cache_hit': 0,
-            'toplam_sure': 0.0,
-            'dokuman_sayisi': 0
-        }
+        # Cevapsız sorular cache'i - kısa ömürlü, ayrı boyut sınırı
+        self.negatif_cache = StripedCache(
+            self.config['model'].get('negative_cache_size', 200),
+            self.config['model'].get('cache_shards', 16),
+            ttl=self.config['model'].get('negative_cache_ttl_seconds', 300)
+        )
+        
+        # Anlamsal cache - paraphrase sorular aynı sonuç cache kaydına yönlenir
+        self.semantik_cache = None
+        if self.config['model'].get('semantic_cache', False):
+            self.semantik_cache = SemanticQueryCache(
+                self.config['model'].get('semantic_cache_size', 500),
+                self.config['model'].get('semantic_cache_max_distance', 0.08)
+            )
+        
+        # İndeks versiyonu - her collection değişikliğinde artar
+        self.index_versiyonu = 0
+        self._versiyon_lock = threading.Lock()
+        
+        # Performans takibi - thread başına sayaçlar, okumada birleştirilir
+        self.sayaclar = ThreadLocalCounters(SAYAC_ALANLARI)
+        self.dokuman_sayisi = 0
+        self._bildirim: Optional[Callable[[str, str], None]] = None
+        self.baslatma_mesajlari: List[tuple] = []
     
-    def sistem_baslat(self) -> bool:
-        """🚀 Sistem başlatma - Optimize RAG"""
+    @property
+    def stats(self) -> Dict:
+        """📊 Birleştirilmiş sayaçların anlık görüntüsü"""
+        stats = self.sayaclar.topla()
+        stats['dokuman_sayisi'] = self.dokuman_sayisi
+        return stats
+    
+    def sistem_baslat(self, bildirim: Optional[Callable[[str, str], None]] = None) -> bool:
+        """🚀 Sistem başlatma - Optimize RAG
+
+        `bildirim(seviye, mesaj)` verilirse ('info', 'success', 'warning', 'error')
+        Streamlit'e hiçbir şey yazılmaz, spinner gösterilmez; `st.cache_resource`
+        içinde başlatma için - cache'lenen fonksiyondaki öğeler her hit'te tekrar çizilir.
+        """
+        self._bildirim = bildirim
         try:
-            with st.spinner("🧠 Embedding modeli yükleniyor..."):
+            with self._asama("🧠 Embedding modeli yükleniyor..."):
                 success = self._embedding_model_yukle()
                 if not success:
                     return False
             
-            with st.spinner("🗄️ Veritabanı başlatılıyor..."):
-                success = self._chromadb_baslat()
+            with self._asama("🗄️ Veritabanı başlatılıyor..."):
+                success = self._vektor_deposu_baslat()
                 if not success:
                     return False
             
-            with st.spinner("📊 Veri işleyici başlatılıyor..."):
+            with self._asama("📊 Veri işleyici başlatılıyor..."):
                 success = self._data_processor_baslat()
                 if not success:
                     return False
             
-            with st.spinner("🔍 Sorgu motoru başlatılıyor..."):
+            with self._asama("🔍 Sorgu motoru başlatılıyor..."):
                 success = self._query_engine_baslat()
                 if not success:
                     return False
             
-            with st.spinner("📚 Sigorta verileri yükleniyor..."):
+            with self._asama("📚 Sigorta verileri yükleniyor..."):
                 success = self._sigorta_verileri_yukle()
                 if not success:
                     return False
             
             self.is_ready = True
-            st.success("✅ Sistem başarıyla başlatıldı!")
+            self._bildir('success', "✅ Sistem başarıyla başlatıldı!")
             return True
             
         except Exception as e:
-            st.error(f"❌ Sistem başlatma hatası: {str(e)}")
+            self._bildir('error', f"❌ Sistem başlatma hatası: {str(e)}")
             return False
+        finally:
+            self._bildirim = None
+            if self.data_processor is not None:
+                self.data_processor.bildirim = None
+    
+    def _bildir(self, seviye: str, mesaj: str):
+        """📣 Başlatma mesajı - bildirim fonksiyonu yoksa doğrudan Streamlit'e"""
+        if self._bildirim is not None:
+            self._bildirim(seviye, mesaj)
+        else:
+            getattr(st, seviye)(mesaj)
+    
+    def _asama(self, mesaj: str):
+        """⏳ Başlatma aşaması - sessiz modda spinner yok"""
+        return st.spinner(mesaj) if self._bildirim is None else nullcontext()
     
     def _embedding_model_yukle(self) -> bool:
         """🧠 Embedding model yükleme"""
@@ -79,48 +138,42 @@ class SigortaModelCore:
             
             model_name = self.config['model']['model_name']
             self.embedding_model = SentenceTransformer(model_name)
+            
+            # Embedding önbelleği - hata durumunda önbelleksiz devam et
+            try:
+                from embedding_cache import create_embedding_cache
+                self.embedding_cache = create_embedding_cache(self.config)
+            except Exception as e:
+                self.embedding_cache = None
+                self._bildir('warning', f"⚠️ Embedding önbelleği devre dışı: {str(e)}")
+            
             return True
             
         except Exception as e:
-            st.error(f"Model yükleme hatası: {str(e)}")
+            self._bildir('error', f"Model yükleme hatası: {str(e)}")
             return False
     
-    def _chromadb_baslat(self) -> bool:
-        """🗄️ ChromaDB başlatma"""
+    def _vektor_deposu_baslat(self) -> bool:
+        """🗄️ Vektör deposu başlatma - backend MODEL_CONFIG['vector_store_backend']"""
         try:
-            import chromadb
-            from chromadb.config import Settings
-            
-            # Client oluştur
-            client = chromadb.Client(Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            ))
-            
-            # Collection al veya oluştur
-            collection_name = self.config['model']['collection_name']
-            try:
-                self.collection = client.get_collection(collection_name)
-            except:
-                self.collection = client.create_collection(
-                    name=collection_name,
-                    metadata={"hnsw:space": "cosine"}
-                )
-            
+            from vector_store import create_vector_store
+            self.collection = create_vector_store(self.config, self._bildirim)
             return True
             
         except Exception as e:
-            st.error(f"ChromaDB başlatma hatası: {str(e)}")
+            self._bildir('error', f"Vektör deposu başlatma hatası: {str(e)}")
             return False
     
     def _data_processor_baslat(self) -> bool:
         """📊 Veri işleyici başlatma"""
         try:
             from data_processor import SigortaDataProcessor
-            self.data_processor = SigortaDataProcessor(self.config)
+            self.data_processor = SigortaDataProcessor(self.config, self.embedding_cache)
+            self.data_processor.bildirim = self._bildirim  # Başlatma sonunda Streamlit'e döner
+            self.data_processor.degisiklik_dinleyicisi_ekle(self._indeks_degisti)
             return True
         except Exception as e:
-            st.error(f"Data processor başlatma hatası: {str(e)}")
+            self._bildir('error', f"Data processor başlatma hatası: {str(e)}")
             return False
     
     def _query_engine_baslat(self) -> bool:
@@ -134,7 +187,7 @@ class SigortaModelCore:
             )
             return True
         except Exception as e:
-            st.error(f"Query engine başlatma hatası: {str(e)}")
+            self._bildir('error', f"Query engine başlatma hatası: {str(e)}")
             return False
     
     def _sigorta_verileri_yukle(self) -> bool:
@@ -147,37 +200,39 @@ class SigortaModelCore:
                 if os.path.exists(backup_file):
                     json_file = backup_file
                 else:
-                    st.error(f"JSON dosyası bulunamadı: {json_file}")
+                    self._bildir('error', f"JSON dosyası bulunamadı: {json_file}")
                     return False
             
-            # Veri sayısını kontrol et
-            existing_count = self.collection.count()
-            if existing_count > 0:
-                self.stats['dokuman_sayisi'] = existing_count
-                st.info(f"📊 {existing_count} belge zaten yüklü")
-                return True
-            
-            # Verileri yükle
-            loaded_count = self.data_processor.load_and_embed_data(
+            # JSON ile collection'ı senkronize et - sadece yeni/değişen belgeler embed edilir
+            rapor = self.data_processor.artimli_senkronize(
                 json_file, 
                 self.collection, 
                 self.embedding_model
             )
             
-            if loaded_count > 0:
-                self.stats['dokuman_sayisi'] = loaded_count
-                st.success(f"✅ {loaded_count} sigorta belgesi yüklendi")
+            self.dokuman_sayisi = self.collection.count()
+            
+            if self.dokuman_sayisi > 0:
+                self._bildir('info', 
+                    f"📊 {self.dokuman_sayisi} belge hazır - "
+                    f"eklenen: {rapor['eklenen']}, güncellenen: {rapor['guncellenen']}, "
+                    f"değişmeyen: {rapor['degismeyen']}, silinen: {rapor['silinen']}"
+                )
                 return True
             else:
-                st.error("❌ Veri yükleme başarısız")
+                self._bildir('error', "❌ Veri yükleme başarısız")
                 return False
                 
         except Exception as e:
-            st.error(f"Veri yükleme hatası: {str(e)}")
+            self._bildir('error', f"Veri yükleme hatası: {str(e)}")
             return False
 
-    def soru_yanit(self, soru: str) -> List[Dict]:
-        """💬 Ana soru-yanıt fonksiyonu"""
+    def soru_yanit(self, soru: str, zaman_butcesi: Optional[float] = None) -> List[Dict]:
+        """💬 Ana soru-yanıt fonksiyonu
+
+        `zaman_butcesi` (saniye) verilmezse `deadline_aware` açıkken hedef yanıt
+        süresi kullanılır. Bütçe yüzünden bozulmuş yanıtlar cache'e yazılmaz.
+        """
         if not self.is_ready:
             st.error("⚠️ Sistem henüz hazır değil!")
             return []
@@ -187,7 +242,11 @@ class SigortaModelCore:
             return []
                 
         start_time = time.time()
-        self.stats['sorgu_sayisi'] += 1
+        self.sayaclar.artir('sorgu_sayisi')
+        
+        # Arama sırasında veri değişirse eski sonuç cache'e yazılmasın
+        baslangic_versiyonu = self.index_versiyonu
+        butce = self.query_engine.zaman_butcesi_olustur(zaman_butcesi)
                 
         try:
             # Cache kontrolü
@@ -195,22 +254,45 @@ class SigortaModelCore:
             cached_result = self._cache_kontrol(cache_key)
                         
             if cached_result:
-                self.stats['cache_hit'] += 1
+                self.sayaclar.artir('cache_hit')
                 st.info("⚡ Hızlı yanıt (önbellekten)")
                 return cached_result
+            
+            # Daha önce cevapsız kalmış soru - aramayı tekrarlama
+            if self.negatif_cache.get(cache_key):
+                self.sayaclar.artir('negatif_cache_hit')
+                self.sayaclar.artir('hata_sayisi')
+                st.warning("😔 Bu soru için uygun cevap bulunamadı.")
+                self._oneri_sun(soru)
+                return []
+                        
+            # Anlamsal cache - encode yapılır, vektör araması ve skorlama atlanır
+            hazir_sorgu = None
+            if self.semantik_cache is not None:
+                hazir_sorgu = self.query_engine.sorgu_hazirla(soru, butce)
+                semantik_sonuc = self._semantik_cache_kontrol(cache_key, hazir_sorgu, soru, baslangic_versiyonu)
+                if semantik_sonuc:
+                    self.sayaclar.artir('semantik_cache_hit')
+                    st.info("⚡ Hızlı yanıt (benzer sorudan)")
+                    return semantik_sonuc
                         
-            # RAG araması
+            # RAG araması - arama hatası cevapsız soru olarak cache'lenmesin
             st.info("🔍 Sigorta bilgi bankasında aranıyor...")
-            sonuclar = self.query_engine.arama_yap(soru)
+            sonuclar = self.query_engine.arama_yap(
+                soru, hata_firlat=True, hazir_sorgu=hazir_sorgu, butce=butce
+            )
+            # Atlanan aşama varsa tam yanıt sonraki denemede bulunabilir - cache'lenmesin
+            cachelenebilir = butce is None or not butce.bozulmus
                         
             if sonuclar:
-                self.stats['basari_sayisi'] += 1
+                self.sayaclar.artir('basari_sayisi')
                                 
                 # Poliçe uyarıları ekle
                 sonuclar = self._policy_warnings_ekle(sonuclar)
                                 
                 # Cache'e kaydet
-                self._cache_kaydet(cache_key, sonuclar)
+                if cachelenebilir:
+                    self._cache_kaydet(cache_key, sonuclar, soru, baslangic_versiyonu, hazir_sorgu)
                                 
                 # İstatistikleri güncelle
                 self._istatistik_guncelle(time.time() - start_time)
@@ -218,18 +300,196 @@ class SigortaModelCore:
                 st.success("✅ Cevap bulundu!")
                 return sonuclar
             else:
-                self.stats['hata_sayisi'] += 1
+                self.sayaclar.artir('hata_sayisi')
                 st.warning("😔 Bu soru için uygun cevap bulunamadı.")
+                
+                if cachelenebilir:
+                    self._guncelken_yaz(baslangic_versiyonu, lambda: self.negatif_cache.put(cache_key, True))
                                 
                 # Öneri sunumu
                 self._oneri_sun(soru)
                 return []
                 
         except Exception as e:
-            self.stats['hata_sayisi'] += 1
+            self.sayaclar.artir('hata_sayisi')
             st.error(f"❌ Soru işleme hatası: {str(e)}")
             return []
 
+    async def soru_yanit_async(self, soru: str, zaman_butcesi: Optional[float] = None) -> Dict:
+        """⚡ Async soru-yanıt - asyncio tabanlı sunucular için
+
+        `{'soru', 'sonuclar', 'hata', 'kaynak'}` döner (bkz. `soru_yanit_toplu`).
+        Cache kontrolleri event loop'ta yapılır; encode ve vektör araması sorgu
+        motorunun sınırlı executor'larında. Streamlit mesajı yazılmaz.
+        """
+        cikti = {'soru': soru, 'sonuclar': [], 'hata': None, 'kaynak': None}
+        if not self.is_ready:
+            cikti['hata'] = "Sistem henüz hazır değil"
+            return cikti
+        if not soru or len(soru.strip()) < 3:
+            cikti['hata'] = "Soru en az 3 karakter olmalı"
+            return cikti
+
+        start_time = time.time()
+        self.sayaclar.artir('sorgu_sayisi')
+        baslangic_versiyonu = self.index_versiyonu
+        butce = self.query_engine.zaman_butcesi_olustur(zaman_butcesi)
+
+        try:
+            cache_key = self._cache_key_olustur(soru)
+            cached_result = self._cache_kontrol(cache_key)
+            if cached_result:
+                self.sayaclar.artir('cache_hit')
+                cikti.update(sonuclar=cached_result, kaynak='cache')
+                return cikti
+
+            if self.negatif_cache.get(cache_key):
+                self.sayaclar.artir('negatif_cache_hit')
+                self.sayaclar.artir('hata_sayisi')
+                cikti['kaynak'] = 'negatif_cache'
+                return cikti
+
+            hazir_sorgu = None
+            if self.semantik_cache is not None:
+                hazir_sorgu = await self.query_engine.sorgu_hazirla_async(soru, butce)
+                semantik_sonuc = self._semantik_cache_kontrol(cache_key, hazir_sorgu, soru, baslangic_versiyonu)
+                if semantik_sonuc:
+                    self.sayaclar.artir('semantik_cache_hit')
+                    cikti.update(sonuclar=semantik_sonuc, kaynak='semantik_cache')
+                    return cikti
+
+            sonuclar = await self.query_engine.arama_yap_async(soru, hazir_sorgu=hazir_sorgu, butce=butce)
+            cachelenebilir = butce is None or not butce.bozulmus
+            if sonuclar:
+                self.sayaclar.artir('basari_sayisi')
+                sonuclar = self._policy_warnings_ekle(sonuclar)
+                if cachelenebilir:
+                    self._cache_kaydet(cache_key, sonuclar, soru, baslangic_versiyonu, hazir_sorgu)
+                self._istatistik_guncelle(time.time() - start_time)
+            else:
+                self.sayaclar.artir('hata_sayisi')
+                if cachelenebilir:
+                    self._guncelken_yaz(baslangic_versiyonu, lambda: self.negatif_cache.put(cache_key, True))
+            cikti.update(sonuclar=sonuclar, kaynak='arama')
+        except Exception as e:
+            self.sayaclar.artir('hata_sayisi')
+            cikti['hata'] = str(e)
+        return cikti
+
+    def soru_yanit_toplu(self, sorular: List[str]) -> List[Dict]:
+        """📦 Toplu soru-yanıt - önce tüm cache'ler, kalanlar tek encode + toplu vektör sorgusu
+
+        Soru başına `{'soru', 'sonuclar', 'hata', 'kaynak'}` döner, giriş sırasıyla.
+        `kaynak`: 'cache', 'negatif_cache', 'semantik_cache', 'arama' veya hatada None.
+        Streamlit mesajı yazılmaz - gece çalışan kalite ölçümü gibi toplu işler için.
+        """
+        ciktilar = [{'soru': soru, 'sonuclar': [], 'hata': None, 'kaynak': None} for soru in sorular]
+        if not self.is_ready:
+            for cikti in ciktilar:
+                cikti['hata'] = "Sistem henüz hazır değil"
+            return ciktilar
+
+        start_time = time.time()
+        baslangic_versiyonu = self.index_versiyonu
+
+        # Cache kontrolü - aynı anahtara düşen sorular bir kez aranır
+        bekleyenler: Dict[str, List[int]] = {}
+        for i, soru in enumerate(sorular):
+            if not soru or len(soru.strip()) < 3:
+                ciktilar[i]['hata'] = "Soru en az 3 karakter olmalı"
+                continue
+            self.sayaclar.artir('sorgu_sayisi')
+
+            cache_key = self._cache_key_olustur(soru)
+            if cache_key in bekleyenler:
+                bekleyenler[cache_key].append(i)
+                continue
+
+            cached_result = self._cache_kontrol(cache_key)
+            if cached_result:
+                self.sayaclar.artir('cache_hit')
+                ciktilar[i].update(sonuclar=cached_result, kaynak='cache')
+            elif self.negatif_cache.get(cache_key):
+                self.sayaclar.artir('negatif_cache_hit')
+                self.sayaclar.artir('hata_sayisi')
+                ciktilar[i]['kaynak'] = 'negatif_cache'
+            else:
+                bekleyenler[cache_key] = [i]
+
+        if bekleyenler:
+            anahtarlar = list(bekleyenler)
+            temsilciler = [sorular[bekleyenler[key][0]] for key in anahtarlar]
+            try:
+                hazir_sorgular = self.query_engine.sorgu_hazirla_toplu(temsilciler)
+
+                # Anlamsal cache - encode yapıldı, vektör araması atlanır
+                aranacaklar = []
+                for j, (key, hazir_sorgu) in enumerate(zip(anahtarlar, hazir_sorgular)):
+                    semantik_sonuc = None
+                    if self.semantik_cache is not None:
+                        semantik_sonuc = self._semantik_cache_kontrol(
+                            key, hazir_sorgu, temsilciler[j], baslangic_versiyonu
+                        )
+                    if semantik_sonuc:
+                        for i in bekleyenler[key]:
+                            self.sayaclar.artir('semantik_cache_hit')
+                            ciktilar[i].update(sonuclar=semantik_sonuc, kaynak='semantik_cache')
+                    else:
+                        aranacaklar.append(j)
+
+                arama_ciktilari = self.query_engine.arama_yap_toplu(
+                    [temsilciler[j] for j in aranacaklar],
+                    hazir_sorgular=[hazir_sorgular[j] for j in aranacaklar]
+                ) if aranacaklar else []
+            except Exception as e:
+                for key in anahtarlar:
+                    for i in bekleyenler[key]:
+                        if ciktilar[i]['kaynak'] is None:
+                            self.sayaclar.artir('hata_sayisi')
+                            ciktilar[i]['hata'] = str(e)
+                aranacaklar, arama_ciktilari = [], []
+
+            # Sonuçları dağıt - cache yazımı tek seferde, arama eski indekste yapıldıysa yazılmaz
+            guncel = baslangic_versiyonu == self.index_versiyonu
+            yeni_kayitlar = {}
+            etiketler = {}
+            semantik_kayitlar = []
+            negatifler = []
+            for j, arama in zip(aranacaklar, arama_ciktilari):
+                key = anahtarlar[j]
+                sonuclar = self._policy_warnings_ekle(arama['sonuclar']) if arama['sonuclar'] else []
+                for i in bekleyenler[key]:
+                    if arama['hata']:
+                        self.sayaclar.artir('hata_sayisi')
+                        ciktilar[i]['hata'] = arama['hata']
+                        continue
+                    self.sayaclar.artir('basari_sayisi' if sonuclar else 'hata_sayisi')
+                    ciktilar[i].update(sonuclar=sonuclar, kaynak='arama')
+
+                if arama['hata'] or not guncel:
+                    continue
+                if sonuclar:
+                    yeni_kayitlar[key] = sonuclar
+                    etiketler[key] = self._cache_etiketleri(temsilciler[j], sonuclar)
+                    if self.semantik_cache is not None:
+                        semantik_kayitlar.append((hazir_sorgular[j]['embedding'], hazir_sorgular[j]['kategori'], key))
+                else:
+                    negatifler.append(key)
+
+            def yaz():
+                if yeni_kayitlar:
+                    self.cache.toplu_kaydet(yeni_kayitlar, etiketler=etiketler)
+                for embedding, kategori, key in semantik_kayitlar:
+                    self.semantik_cache.ekle(embedding, kategori, key)
+                for key in negatifler:
+                    self.negatif_cache.put(key, True)
+
+            if yeni_kayitlar or negatifler:
+                self._guncelken_yaz(baslangic_versiyonu, yaz)
+
+        self._istatistik_guncelle(time.time() - start_time)
+        return ciktilar
+
     def soru_sor(self, soru: str) -> List[Dict]:
         """🔍 Alternatif soru fonksiyonu - soru_yanit alias"""
         return self.soru_yanit(soru)
@@ -294,23 +554,99 @@ class SigortaModelCore:
         return natural
 
     def _cache_key_olustur(self, soru: str) -> str:
-        """🔑 Cache anahtarı oluşturma"""
+        """🔑 Cache anahtarı oluşturma - yazım varyantları aynı anahtara düşer"""
         import hashlib
-        return hashlib.md5(soru.lower().strip().encode()).hexdigest()
+        metin = cache_anahtari_metni(
+            soru, diakritik=self.config['model'].get('cache_key_diacritic_folding', False)
+        )
+        return hashlib.md5(metin.encode()).hexdigest()
     
     def _cache_kontrol(self, cache_key: str) -> Optional[List[Dict]]:
         """📋 Cache kontrolü"""
         return self.cache.get(cache_key)
     
-    def _cache_kaydet(self, cache_key: str, sonuclar: List[Dict]):
-        """💾 Cache'e kaydetme"""
-        # Cache boyut kontrolü
-        if len(self.cache) >= self.cache_max_size:
-            # LRU - en eski olanı sil
-            oldest_key = next(iter(self.cache))
-            del self.cache[oldest_key]
+    def _cache_kaydet(self, cache_key: str, sonuclar: List[Dict], soru: str = '',
+                      versiyon: Optional[int] = None, hazir_sorgu: Optional[Dict] = None):
+        """💾 Cache'e kaydetme - sonuç kaynaklarıyla etiketlenir
+
+        `hazir_sorgu` verilirse soru anlamsal cache'e de eklenir.
+        """
+        etiketler = self._cache_etiketleri(soru, sonuclar)
+        
+        def yaz():
+            self.cache.put(cache_key, sonuclar, etiketler=etiketler)
+            if hazir_sorgu is not None and self.semantik_cache is not None:
+                self.semantik_cache.ekle(hazir_sorgu['embedding'], hazir_sorgu['kategori'], cache_key)
+        
+        self._guncelken_yaz(versiyon, yaz)
+    
+    def _guncelken_yaz(self, versiyon: Optional[int], yaz: Callable[[], None]) -> bool:
+        """🔒 Arama `versiyon` indeksinde yapıldıysa cache'e yaz
+
+        Kontrol ve yazma `_indeks_degisti`nin versiyon artırma + geçersiz kılma adımıyla
+        aynı kilit altında; aradaki bir değişiklik eski indeksten üretilmiş kaydı
+        silinmeden cache'te bırakamaz.
+        """
+        with self._versiyon_lock:
+            if versiyon is not None and versiyon != self.index_versiyonu:
+                return False  # Arama eski indeks üzerinde yapıldı - cache'lenmez
+            yaz()
+            return True
+    
+    def _semantik_cache_kontrol(self, cache_key: str, hazir_sorgu: Dict, soru: str,
+                                versiyon: Optional[int] = None) -> Optional[List[Dict]]:
+        """🧠 Benzer sorunun cache'teki sonucu - `soru` ve `versiyon` tam eşleşme kaydı için"""
+        benzer_key = self.semantik_cache.ara(hazir_sorgu['embedding'], hazir_sorgu['kategori'])
+        if not benzer_key:
+            return None
+        
+        sonuclar = self._cache_kontrol(benzer_key)
+        if not sonuclar:
+            # Sonuç tahliye edilmiş veya geçersiz kılınmış
+            self.semantik_cache.sil(benzer_key)
+            return None
+        
+        # Bu ifade için de tam eşleşme kaydı - sonraki tekrar doğrudan hit olur
+        self._cache_kaydet(cache_key, sonuclar, soru, versiyon)
+        return sonuclar
+    
+    def _cache_etiketleri(self, soru: str, sonuclar: List[Dict]) -> Set[str]:
+        """🏷️ Cache kaydının bağlı olduğu kategori ve belge etiketleri"""
+        etiketler = set()
+        for sonuc in sonuclar:
+            etiketler.add(f"kat:{sonuc.get('kategori', 'genel')}")
+            belge_id = sonuc.get('metadata', {}).get('id')
+            if belge_id:
+                etiketler.add(f"id:{belge_id}")
+        
+        # Sorunun kategorisindeki yeni belgeler de cevabı değiştirebilir
+        if soru and self.query_engine:
+            soru_kategorisi = self.query_engine.soru_kategorisi(soru)
+            if soru_kategorisi:
+                etiketler.add(f"kat:{soru_kategorisi}")
+        return etiketler
+    
+    def _indeks_degisti(self, kategoriler: Set[str], idler: Set[str], tumu: bool = False):
+        """🔄 Collection değişti - versiyonu artır, etkilenen cache kayıtlarını sil
+
+        Artırma ve geçersiz kılma tek kilit altında (bkz. `_guncelken_yaz`).
+        """
+        with self._versiyon_lock:
+            self.index_versiyonu += 1
+            
+            # Yeni belge cevapsız bir soruyu cevaplayabilir - negatif cache tamamen düşer
+            self.negatif_cache.clear()
+            
+            if tumu:
+                self.cache.clear()
+                if self.semantik_cache is not None:
+                    self.semantik_cache.clear()
+            else:
+                etiketler = {f"kat:{k}" for k in kategoriler} | {f"id:{i}" for i in idler}
+                self.cache.etiketle_gecersiz_kil(etiketler)
         
-        self.cache[cache_key] = sonuclar
+        if self.collection is not None:
+            self.dokuman_sayisi = self.collection.count()
     
     def _policy_warnings_ekle(self, sonuclar: List[Dict]) -> List[Dict]:
         """⚠️ Poliçe uyarıları ekleme"""
@@ -340,7 +676,7 @@ class SigortaModelCore:
     
     def _istatistik_guncelle(self, sure: float):
         """📊 İstatistik güncelleme"""
-        self.stats['toplam_sure'] += sure
+        self.sayaclar.artir('toplam_sure', sure)
     
     def _oneri_sun(self, soru: str):
         """💡 Soru önerisi sunma"""
@@ -377,7 +713,7 @@ class SigortaModelCore:
 
     def _detect_category_simple(self, soru: str) -> str:
         """🎯 Basit kategori tespiti"""
-        soru_lower = soru.lower()
+        soru_lower = turkce_kucuk_harf(soru)
         
         for kategori, config in self.config['categories'].items():
             for keyword in config['keywords'][:3]:  # İlk 3 anahtar kelime
@@ -388,59 +724,130 @@ class SigortaModelCore:
 
     def get_sistem_stats(self) -> Dict:
         """📊 Sistem istatistikleri"""
+        # Tutarlı bir anlık görüntü üzerinden hesapla
+        stats = self.stats
+        
         # Cache istatistikleri
-        cache_size = len(self.cache)
+        cache_stats = self.cache.get_stats()
         cache_hit_rate = (
-            (self.stats['cache_hit'] / self.stats['sorgu_sayisi'] * 100) 
-            if self.stats['sorgu_sayisi'] > 0 else 0
+            (stats['cache_hit'] / stats['sorgu_sayisi'] * 100) 
+            if stats['sorgu_sayisi'] > 0 else 0
         )
         
         # Performans istatistikleri
         basari_orani = (
-            (self.stats['basari_sayisi'] / self.stats['sorgu_sayisi'] * 100) 
-            if self.stats['sorgu_sayisi'] > 0 else 0
+            (stats['basari_sayisi'] / stats['sorgu_sayisi'] * 100) 
+            if stats['sorgu_sayisi'] > 0 else 0
         )
         
         ortalama_sure = (
-            (self.stats['toplam_sure'] / self.stats['sorgu_sayisi']) 
-            if self.stats['sorgu_sayisi'] > 0 else 0
+            (stats['toplam_sure'] / stats['sorgu_sayisi']) 
+            if stats['sorgu_sayisi'] > 0 else 0
         )
         
         return {
             'is_ready': self.is_ready,
-            'dokuman_sayisi': self.stats['dokuman_sayisi'],
+            'dokuman_sayisi': stats['dokuman_sayisi'],
+            'index_versiyonu': self.index_versiyonu,
             'cache_stats': {
-                'size': cache_size,
-                'max_size': self.cache_max_size,
-                'hit_rate': int(cache_hit_rate)
+                **cache_stats,
+                'hit_rate': int(cache_hit_rate),
+                'negatif_hit': stats['negatif_cache_hit'],
+                'negatif': self.negatif_cache.get_stats(),
+                'semantik_hit': stats['semantik_cache_hit'],
+                'semantik': self.semantik_cache.get_stats() if self.semantik_cache else {}
             },
+            'embedding_cache_stats': self.embedding_cache.get_stats() if self.embedding_cache else {},
+            'sorgu_embedding_stats': self.query_engine.get_embedding_lru_stats() if self.query_engine else {},
             'performance_stats': {
-                'toplam_sorgu': self.stats['sorgu_sayisi'],
-                'basarili_sorgu': self.stats['basari_sayisi'],
+                'toplam_sorgu': stats['sorgu_sayisi'],
+                'basarili_sorgu': stats['basari_sayisi'],
                 'basari_orani': int(basari_orani),
-                'hata_sayisi': self.stats['hata_sayisi'],
+                'hata_sayisi': stats['hata_sayisi'],
                 'ortalama_yanit_suresi': ortalama_sure
             }
         }
 
+    def cache_isit(self, sorular: List[str]) -> Dict:
+        """🔥 Soru listesiyle cache'i toplu ısıtma"""
+        if not self.is_ready:
+            return {'isitilan': 0, 'zaten_var': 0, 'cevapsiz': 0, 'bozulmus': 0}
+        
+        rapor = {'isitilan': 0, 'zaten_var': 0, 'cevapsiz': 0, 'bozulmus': 0}
+        yeni_kayitlar = {}
+        etiketler = {}
+        # Isıtma sırasında indeks değişirse önceki soruların sonuçları da eskidir
+        baslangic_versiyonu = self.index_versiyonu
+        
+        for soru in sorular:
+            cache_key = self._cache_key_olustur(soru)
+            if cache_key in yeni_kayitlar or self._cache_kontrol(cache_key):
+                rapor['zaten_var'] += 1
+                continue
+            
+            butce = self.query_engine.zaman_butcesi_olustur()
+            sonuclar = self.query_engine.arama_yap(soru, butce=butce)
+            # Atlanan aşamalı yanıt eksik olabilir - ısıtmada cache'lenmez, ilk gerçek soruda tam aranır
+            if butce is not None and butce.bozulmus:
+                rapor['bozulmus'] += 1
+            elif sonuclar:
+                yeni_kayitlar[cache_key] = self._policy_warnings_ekle(sonuclar)
+                etiketler[cache_key] = self._cache_etiketleri(soru, sonuclar)
+            else:
+                rapor['cevapsiz'] += 1
+        
+        # Tek seferde yaz - SQLite backend'de tek transaction
+        if yeni_kayitlar and self._guncelken_yaz(
+            baslangic_versiyonu, lambda: self.cache.toplu_kaydet(yeni_kayitlar, etiketler=etiketler)
+        ):
+            rapor['isitilan'] = len(yeni_kayitlar)
+        return rapor
+    
     def cache_temizle(self):
-        """🗑️ Cache temizleme"""
+        """🗑️ Cache temizleme - core paylaşımlı olduğundan tüm oturumları etkiler"""
         self.cache.clear()
+        self.negatif_cache.clear()
+        if self.semantik_cache is not None:
+            self.semantik_cache.clear()
         st.success("✅ Cache temizlendi!")
 
     def sistem_sifirla(self):
         """🔄 Sistem sıfırlama"""
         self.cache.clear()
-        self.stats = {
-            'sorgu_sayisi': 0,
-            'basari_sayisi': 0,
-            'hata_sayisi': 0,
-            'cache_hit': 0,
-            'toplam_sure': 0.0,
-            'dokuman_sayisi': self.stats['dokuman_sayisi']  # Belge sayısını koru
-        }
+        self.negatif_cache.clear()
+        if self.semantik_cache is not None:
+            self.semantik_cache.clear()
+        self.sayaclar.sifirla()  # Belge sayısı korunur
         st.success("✅ Sistem istatistikleri sıfırlandı!")
 
+@st.cache_resource(show_spinner=False)
+def _paylasimli_core_olustur() -> SigortaModelCore:
+    """🔒 Süreç başına tek core - Streamlit resource cache'inde tutulur"""
+    # Cache'lenen fonksiyonda st.* çağrılmaz - mesajlar core'da saklanır, oturum başına bir kez gösterilir
+    core = SigortaModelCore()
+    mesajlar = []
+    if not core.sistem_baslat(bildirim=lambda seviye, mesaj: mesajlar.append((seviye, mesaj))):
+        # İstisnalar cache'lenmez - sonraki oturum yeniden dener
+        hatalar = [mesaj for seviye, mesaj in mesajlar if seviye == 'error']
+        raise RuntimeError('; '.join(hatalar) or "Sigorta sistemi başlatılamadı")
+    core.baslatma_mesajlari = mesajlar
+    return core
+
+def get_shared_model_core() -> Optional[SigortaModelCore]:
+    """🌐 Tüm Streamlit oturumlarının paylaştığı model core"""
+    try:
+        with st.spinner("🚀 Sigorta sistemi başlatılıyor..."):
+            core = _paylasimli_core_olustur()
+    except Exception as e:
+        st.error(f"⚠️ Sistem başlatma hatası: {str(e)}")
+        return None
+    
+    if not st.session_state.get('baslatma_mesajlari_gosterildi', False):
+        for seviye, mesaj in core.baslatma_mesajlari:
+            getattr(st, seviye)(mesaj)
+        st.session_state.baslatma_mesajlari_gosterildi = True
+    return core
+
 if __name__ == "__main__":
     # Test modu
     print("🧠 Sigorta Model Core - Test Modu")
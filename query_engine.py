@@ -3,9 +3,32 @@
 🔍 Akıllı Sigorta Sorgu Motoru v2.0
 Güçlendirilmiş kategori eşleştirme, optimize RAG
 """
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
 from typing import List, Dict, Optional
 import streamlit as st
+import numpy as np
+import asyncio
+import math
 import re
+import threading
+from keyword_matcher import BONUS_KEYWORD_LIMITI, IMZA_VERSIYON_ALANI, SigortaKeywordMatcher
+from result_cache import ThreadLocalCounters
+from text_normalizer import soru_normalize, turkce_kucuk_harf
+from zaman_butcesi import ISTEGE_BAGLI_ASAMALAR, ZORUNLU_ASAMALAR, ZamanButcesi, zaman_butcesi_olustur
+
+# n eşleşme için bonus - metin taramasındaki ardışık `+= 0.05` ile birebir aynı float
+KEYWORD_BONUS_TABLOSU = [0]
+for _ in range(BONUS_KEYWORD_LIMITI):
+    KEYWORD_BONUS_TABLOSU.append(KEYWORD_BONUS_TABLOSU[-1] + 0.05)
+KEYWORD_BONUS_DIZISI = np.array(KEYWORD_BONUS_TABLOSU, dtype=np.float64)
+
+# Maske değeri -> set bit sayısı (BONUS_KEYWORD_LIMITI bitlik maskeler için)
+BIT_SAYISI_TABLOSU = np.array(
+    [bin(maske).count('1') for maske in range(1 << BONUS_KEYWORD_LIMITI)], dtype=np.int64
+)
 
 class SigortaQueryEngine:
     """🔍 Optimize Sigorta Sorgu Motoru"""
@@ -20,162 +43,770 @@ class SigortaQueryEngine:
         self.categories = config['categories']
         self.exact_matches = config['exact_matches']
         
-    def arama_yap(self, soru: str) -> List[Dict]:
-        """🔍 Ana arama fonksiyonu"""
+        # Tüm tam eşleştirme / anahtar kelime desenleri tek otomatta derlenir
+        self.keyword_matcher = SigortaKeywordMatcher(self.categories, self.exact_matches)
+        
+        # Soru genişletme - QUESTION_EXPANSION anahtarları tek regex geçişinde değiştirilir
+        self._genisletmeler = {
+            turkce_kucuk_harf(anahtar): ' '.join(turkce_kucuk_harf(deger) for deger in degerler)
+            for anahtar, degerler in config.get('expansion', {}).items()
+        }
+        self._genisletme_deseni = re.compile('|'.join(
+            re.escape(anahtar) for anahtar in sorted(self._genisletmeler, key=len, reverse=True)
+        )) if self._genisletmeler else None
+        
+        # Sorgu embedding LRU'su - temizlenmiş soru -> float32 vektör
+        self.embedding_lru_boyutu = config['model'].get('query_embedding_cache_size', 256)
+        self._embedding_lru = OrderedDict()
+        self._embedding_lru_lock = threading.Lock()
+        self.embedding_lru_stats = {'hit': 0, 'miss': 0}
+        
+        # İki aşamalı arama sayaçları
+        self.arama_sayaclari = ThreadLocalCounters({
+            'iki_asamali_sorgu': 0,
+            'tek_asamaya_donus': 0,
+            'getirilen_belge': 0,
+            'kategori_filtreli_sorgu': 0,
+            'kategori_filtre_hit': 0,
+            'kategori_filtre_geri_donus': 0
+        })
+        
+        # Async API executor'ları - ilk async çağrıda oluşturulur
+        self._executorlar: Dict[str, ThreadPoolExecutor] = {}
+        self._executor_lock = threading.Lock()
+        
+        # Uyarlanır aday sayısı - kategori başına yeterli k'nin üstel ortalaması
+        self._kategori_k = {}
+        self._kategori_k_lock = threading.Lock()
+        self.aday_sayaclari = ThreadLocalCounters({
+            'uyarlanir_sorgu': 0,
+            'genisletme_turu': 0,
+            'genisletilen_sorgu': 0,
+            'istenen_aday': 0
+        })
+        
+        # Zaman bütçesi sayaçları - atlanan isteğe bağlı aşamalar ve bütçeyi aşan zorunlu aşamalar
+        self.butce_asama_oranlari = self.search_config.get('deadline_stage_min_remaining', {})
+        self.butce_sayaclari = ThreadLocalCounters({
+            'butceli_sorgu': 0,
+            'bozulmus_yanit': 0,
+            **{f'atlanan_{asama}': 0 for asama in ISTEGE_BAGLI_ASAMALAR},
+            **{f'asim_{asama}': 0 for asama in ZORUNLU_ASAMALAR}
+        })
+        
+    def sorgu_hazirla(self, soru: str, butce: Optional[ZamanButcesi] = None) -> Dict:
+        """🧩 Temizleme, kategori tespiti ve embedding - aramadan önceki ortak adım"""
+        return self.sorgu_hazirla_toplu([soru], butce)[0]
+    
+    def sorgu_hazirla_toplu(self, sorular: List[str], butce: Optional[ZamanButcesi] = None) -> List[Dict]:
+        """🧩 Birden çok soru için `sorgu_hazirla` - sorular ve varyantları tek encode çağrısında"""
+        temiz_sorular = [self._soru_temizle(soru) for soru in sorular]
+        varyantlar = [self._soru_varyantlari(temiz_soru) for temiz_soru in temiz_sorular]
+        if any(varyantlar) and not self._asama_izni(butce, 'soru_genisletme'):
+            varyantlar = [[] for _ in temiz_sorular]
+        with self._olc(butce, 'sorgu_hazirlama'):
+            embeddingler = self._sorgu_embeddingleri(
+                temiz_sorular + [varyant for liste in varyantlar for varyant in liste]
+            )
+        varyant_embeddingleri = embeddingler[len(temiz_sorular):]
+        
+        hazir_sorgular = []
+        for temiz_soru, embedding, liste in zip(temiz_sorular, embeddingler, varyantlar):
+            eslesmeler = self.keyword_matcher.eslesmeler(temiz_soru)
+            hazir_sorgular.append({
+                'temiz_soru': temiz_soru,
+                'kategori': self.keyword_matcher.kategori_tespit_et(eslesmeler),
+                'eslesmeler': eslesmeler,
+                'embedding': embedding,
+                'varyant_embeddingleri': varyant_embeddingleri[:len(liste)]
+            })
+            varyant_embeddingleri = varyant_embeddingleri[len(liste):]
+        return hazir_sorgular
+    
+    def _soru_varyantlari(self, temiz_soru: str) -> List[str]:
+        """🔀 Aynı vektör sorgusunda aranacak ek ifadeler - QUESTION_EXPANSION ile genişletilmiş soru
+
+        `multi_search` ve `question_expansion` birlikte açıkken üretilir. Varyantlar orijinal
+        sorunun kategorisini, kategori filtresini ve anahtar kelime bonuslarını paylaşır. Eski
+        ikinci soru_yanit çağrısı genişletilmiş metinde kategoriyi yeniden tespit ediyordu;
+        alt dize genişletmesi tam eşleştirmeyi bozabildiğinde ('hasarsızlık indirimi' ->
+        '... ödemesızlık indirimi') soru yanlış kategoride, filtresiz aranıyordu.
+        """
+        if not (self.search_config.get('multi_search', False)
+                and self.search_config.get('question_expansion', False)
+                and self._genisletme_deseni is not None):
+            return []
+        genisletilmis = self._genisletme_deseni.sub(
+            lambda eslesme: self._genisletmeler[eslesme.group(0)], temiz_soru
+        )
+        return [genisletilmis] if genisletilmis != temiz_soru else []
+    
+    def _sorgu_embedding(self, temiz_soru: str) -> np.ndarray:
+        """🧠 Temizlenmiş sorunun embedding'i - önce LRU, sonra encode"""
+        return self._sorgu_embeddingleri([temiz_soru])[0]
+    
+    def _sorgu_embeddingleri(self, temiz_sorular: List[str]) -> List[np.ndarray]:
+        """🧠 Temizlenmiş soruların embedding'leri - LRU'da olmayanlar tek batch'te encode edilir"""
+        embeddingler: List[Optional[np.ndarray]] = [None] * len(temiz_sorular)
+        eksikler: Dict[str, List[int]] = {}
+        with self._embedding_lru_lock:
+            for i, temiz_soru in enumerate(temiz_sorular):
+                embedding = self._embedding_lru.get(temiz_soru)
+                if embedding is not None:
+                    self._embedding_lru.move_to_end(temiz_soru)
+                    self.embedding_lru_stats['hit'] += 1
+                    embeddingler[i] = embedding
+                elif temiz_soru in eksikler:
+                    self.embedding_lru_stats['hit'] += 1  # Aynı batch'te tekrar - bir kez encode
+                    eksikler[temiz_soru].append(i)
+                else:
+                    self.embedding_lru_stats['miss'] += 1
+                    eksikler[temiz_soru] = [i]
+        if not eksikler:
+            return embeddingler
+        
+        # Encode kilit dışında - diğer thread'ler beklemesin
+        metinler = list(eksikler)
+        vektorler = np.asarray(self._encode(metinler), dtype=np.float32).reshape(len(metinler), -1)
+        yeni = {}
+        for temiz_soru, vektor in zip(metinler, vektorler):
+            embedding = np.array(vektor, dtype=np.float32)  # Satır kopyası - batch matrisi tutulmasın
+            embedding.setflags(write=False)
+            yeni[temiz_soru] = embedding
+            for i in eksikler[temiz_soru]:
+                embeddingler[i] = embedding
+        
+        if self.embedding_lru_boyutu > 0:
+            with self._embedding_lru_lock:
+                for temiz_soru, embedding in yeni.items():
+                    self._embedding_lru[temiz_soru] = embedding
+                    self._embedding_lru.move_to_end(temiz_soru)
+                while len(self._embedding_lru) > self.embedding_lru_boyutu:
+                    self._embedding_lru.popitem(last=False)
+        return embeddingler
+    
+    def arama_yap(self, soru: str, hata_firlat: bool = False,
+                  hazir_sorgu: Optional[Dict] = None,
+                  butce: Optional[ZamanButcesi] = None) -> List[Dict]:
+        """🔍 Ana arama fonksiyonu
+
+        `hata_firlat=True` ise hata boş sonuçla gizlenmez; çağıran taraf
+        "cevap yok" ile "arama başarısız" durumunu ayırt edebilir.
+        `hazir_sorgu` verilirse (bkz. `sorgu_hazirla`) tekrar encode edilmez.
+        `butce` verilmezse `deadline_aware` açıkken hedef yanıt süresiyle oluşturulur;
+        isteğe bağlı aşama atlanırsa sonuçlar `bozulmus=True` taşır.
+        """
         try:
-            # Soruyu temizle ve hazırla
-            temiz_soru = self._soru_temizle(soru)
-            
-            # Kategori tespit et
-            tespit_edilen_kategori = self._kategori_tespit_et(temiz_soru)
+            if butce is None:
+                butce = self.zaman_butcesi_olustur()
             
-            # Embedding oluştur
-            query_embedding = self.embedding_model.encode([temiz_soru])
-            
-            # ChromaDB'den arama yap
-            arama_sonuclari = self.collection.query(
-                query_embeddings=query_embedding,
-                n_results=self.search_config['max_search_results'],
-                include=['metadatas', 'documents', 'distances']
-            )
+            # Soruyu temizle, kategori tespit et, embedding oluştur
+            sorgu = hazir_sorgu or self.sorgu_hazirla(soru, butce)
             
-            # Sonuçları işle
-            if arama_sonuclari['documents'] and arama_sonuclari['documents'][0]:
-                islenmiş_sonuclar = self._sonuclari_isle(
-                    arama_sonuclari, 
-                    temiz_soru, 
-                    tespit_edilen_kategori
-                )
-                
-                # Final filtreleme ve sıralama
-                final_sonuclar = self._final_filtreleme(islenmiş_sonuclar)
-                
-                return final_sonuclar
+            # Güçlü kategori sinyalinde önce sadece o kategoride ara
+            filtre_kategorisi = self._filtre_kategorisi(sorgu)
+            if filtre_kategorisi and self._asama_izni(butce, 'kategori_filtresi'):
+                self.arama_sayaclari.artir('kategori_filtreli_sorgu')
+                try:
+                    sonuclar = self._ara_ve_isle(sorgu, where={'kategori': filtre_kategorisi}, butce=butce)
+                except Exception:
+                    sonuclar = []  # Filtreli sorgu desteklenmiyorsa global aramaya düş
+                if sonuclar:
+                    self.arama_sayaclari.artir('kategori_filtre_hit')
+                    return self._butceyi_kapat(butce, sonuclar)
+                self.arama_sayaclari.artir('kategori_filtre_geri_donus')
             
-            return []
+            # Global arama
+            return self._butceyi_kapat(butce, self._ara_ve_isle(sorgu, butce=butce))
             
         except Exception as e:
+            if hata_firlat:
+                raise
             st.error(f"Arama hatası: {str(e)}")
             return []
     
-    def _soru_temizle(self, soru: str) -> str:
-        """🧹 Soru temizleme"""
-        # Temel temizlik
-        temiz = soru.strip().lower()
+    def arama_yap_toplu(self, sorular: List[str],
+                        hazir_sorgular: Optional[List[Dict]] = None) -> List[Dict]:
+        """📦 Toplu arama - tek encode, filtre grubu başına tek çok-embedding'li vektör sorgusu
+
+        Soru başına `{'sonuclar': [...], 'hata': None | str}` döner, giriş sırasıyla.
+        Hatalar Streamlit'e yazılmaz; gece çalışan toplu işler için sessizdir.
+        """
+        ciktilar = [{'sonuclar': [], 'hata': None} for _ in sorular]
+        if not sorular:
+            return ciktilar
+        try:
+            hazir_sorgular = hazir_sorgular or self.sorgu_hazirla_toplu(sorular)
+        except Exception as e:
+            for cikti in ciktilar:
+                cikti['hata'] = str(e)
+            return ciktilar
         
-        # Gereksiz karakterleri temizle
-        temiz = re.sub(r'[^\w\sğüşıöçĞÜŞİÖÇ]', ' ', temiz)
+        # Güçlü kategori sinyali olan sorular kategori başına tek filtreli sorguda
+        gruplar: Dict[Optional[str], List[int]] = {}
+        for i, sorgu in enumerate(hazir_sorgular):
+            gruplar.setdefault(self._filtre_kategorisi(sorgu), []).append(i)
+        global_indeksler = gruplar.pop(None, [])
         
-        # Çoklu boşlukları tek boşluğa çevir
-        temiz = re.sub(r'\s+', ' ', temiz)
+        for kategori, indeksler in gruplar.items():
+            self.arama_sayaclari.artir('kategori_filtreli_sorgu', len(indeksler))
+            try:
+                parcalar = self._ara_ve_isle_toplu(
+                    [hazir_sorgular[i] for i in indeksler], where={'kategori': kategori}
+                )
+            except Exception:
+                parcalar = [{'sonuclar': [], 'hata': None} for _ in indeksler]
+            for i, parca in zip(indeksler, parcalar):
+                if parca['sonuclar']:
+                    self.arama_sayaclari.artir('kategori_filtre_hit')
+                    ciktilar[i] = parca
+                else:
+                    self.arama_sayaclari.artir('kategori_filtre_geri_donus')
+                    global_indeksler.append(i)
         
-        return temiz.strip()
+        # Global arama - filtresiz sorular ve filtreli sorgudan sonuç çıkmayanlar
+        if global_indeksler:
+            global_indeksler.sort()
+            try:
+                parcalar = self._ara_ve_isle_toplu([hazir_sorgular[i] for i in global_indeksler])
+            except Exception as e:
+                parcalar = [{'sonuclar': [], 'hata': str(e)} for _ in global_indeksler]
+            for i, parca in zip(global_indeksler, parcalar):
+                ciktilar[i] = parca
+        return ciktilar
     
-    def _kategori_tespit_et(self, soru: str) -> Optional[str]:
-        """🎯 Gelişmiş kategori tespiti"""
-        soru_lower = soru.lower()
+    def _ara_ve_isle_toplu(self, sorgular: List[Dict], where: Optional[Dict] = None) -> List[Dict]:
+        """🔎 Çok-embedding'li vektör sorgusu + soru başına skorlama; kazanan belgeler tek `get` ile"""
+        adaylar = self._uyarlanir_aday_sorgusu(sorgular, where)
+        arama_sonuclari = [arama for arama, _ in adaylar]
         
-        # 1. Önce tam eşleştirmeleri kontrol et
-        for tam_eslestirme, kategori in self.exact_matches.items():
-            if tam_eslestirme in soru_lower:
-                return kategori
+        ciktilar = []
+        for sorgu, (arama, skorlama) in zip(sorgular, adaylar):
+            try:
+                sonuclar = []
+                if arama['ids'] and arama['ids'][0]:
+                    sonuclar = self._sonuclari_isle(
+                        arama, sorgu['temiz_soru'], sorgu['kategori'], sorgu.get('eslesmeler'),
+                        belgeleri_getir=False, skorlama=skorlama
+                    )
+                ciktilar.append({'sonuclar': sonuclar, 'hata': None})
+            except Exception as e:
+                ciktilar.append({'sonuclar': [], 'hata': str(e)})
         
-        # 2. Kategori skorlaması
-        kategori_skorlari = {}
+        # İkinci aşama: tüm soruların kazananları için tek belge isteği
+        eksik_idler = {}
+        for cikti, arama in zip(ciktilar, arama_sonuclari):
+            for sonuc in cikti['sonuclar']:
+                if sonuc['icerik'] is None:
+                    eksik_idler[arama['ids'][0][sonuc['rank'] - 1]] = None
+        if eksik_idler:
+            belgeler = dict(zip(eksik_idler, self._belgeleri_getir(list(eksik_idler))))
+            for cikti, arama in zip(ciktilar, arama_sonuclari):
+                doldurulan = []
+                for sonuc in cikti['sonuclar']:
+                    if sonuc['icerik'] is None:
+                        sonuc['icerik'] = belgeler[arama['ids'][0][sonuc['rank'] - 1]]
+                    if sonuc['icerik'] is not None:  # Aradaki silinmeler atlanır
+                        doldurulan.append(sonuc)
+                cikti['sonuclar'] = doldurulan
+        return ciktilar
+    
+    async def sorgu_hazirla_async(self, soru: str, butce: Optional[ZamanButcesi] = None) -> Dict:
+        """🧩 `sorgu_hazirla`nın async hali - embedding'leri LRU'da olan soru executor'a gitmez"""
+        temiz_soru = self._soru_temizle(soru)
+        if self._lru_iceriyor([temiz_soru] + self._soru_varyantlari(temiz_soru)):
+            return self.sorgu_hazirla(soru, butce)
+        return await self._executorda('encode', self.sorgu_hazirla, soru, butce)
+    
+    async def arama_yap_async(self, soru: str, hazir_sorgu: Optional[Dict] = None,
+                              butce: Optional[ZamanButcesi] = None) -> List[Dict]:
+        """🔍 `arama_yap`ın async hali - encode ve vektör deposu çağrıları sınırlı executor'larda
+
+        Streamlit mesajı yazılmaz; hata çağırana exception olarak iletilir
+        (`hata_firlat=True` davranışı).
+        """
+        if butce is None:
+            butce = self.zaman_butcesi_olustur()
+        if hazir_sorgu is None:
+            hazir_sorgu = await self.sorgu_hazirla_async(soru, butce)
+        return await self._executorda('arama', self.arama_yap, soru, True, hazir_sorgu, butce)
+    
+    def _lru_iceriyor(self, temiz_sorular: List[str]) -> bool:
+        """🧠 Tüm metinlerin embedding'i LRU'da mı (istatistik ve sıra değişmez)"""
+        with self._embedding_lru_lock:
+            return all(temiz_soru in self._embedding_lru for temiz_soru in temiz_sorular)
+    
+    async def _executorda(self, tur: str, fonksiyon, *args):
+        """⚙️ Fonksiyonu `tur` executor'ında çalıştır ve bekle"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(tur), partial(fonksiyon, *args))
+    
+    def _executor(self, tur: str) -> ThreadPoolExecutor:
+        """🏭 Sınırlı thread havuzu - 'encode' (CPU) ve 'arama' (vektör deposu) ayrı"""
+        with self._executor_lock:
+            executor = self._executorlar.get(tur)
+            if executor is None:
+                varsayilan = {'encode': 2, 'arama': 8}[tur]
+                executor = ThreadPoolExecutor(
+                    max_workers=self.config['model'].get(f'async_{tur}_workers', varsayilan),
+                    thread_name_prefix=f'sorgu_{tur}'
+                )
+                self._executorlar[tur] = executor
+            return executor
+    
+    def executorlari_kapat(self):
+        """🛑 Async API executor'larını kapat - sonraki async çağrı yenilerini oluşturur"""
+        with self._executor_lock:
+            executorlar, self._executorlar = list(self._executorlar.values()), {}
+        for executor in executorlar:
+            executor.shutdown(wait=True)
+    
+    def zaman_butcesi_olustur(self, saniye: Optional[float] = None) -> Optional[ZamanButcesi]:
+        """⏱️ İstek bütçesi - bkz. `zaman_butcesi.zaman_butcesi_olustur`"""
+        return zaman_butcesi_olustur(self.config, saniye)
+    
+    def _asama_izni(self, butce: Optional[ZamanButcesi], asama: str) -> bool:
+        """✅ İsteğe bağlı aşama için yeterli süre var mı; yoksa atlanır ve sayılır"""
+        if butce is None:
+            return True
+        onceden_atlandi = asama in butce.atlanan
+        if butce.izin_ver(asama, self.butce_asama_oranlari.get(asama, 0.0)):
+            return True
+        if not onceden_atlandi:  # Genişletme turlarında aynı aşama bir kez sayılır
+            self.butce_sayaclari.artir(f'atlanan_{asama}')
+        return False
+    
+    def _olc(self, butce: Optional[ZamanButcesi], asama: str):
+        """📏 Zorunlu aşama ölçümü - bütçe yoksa boş bağlam"""
+        return butce.olc(asama) if butce is not None else nullcontext()
+    
+    def _butceyi_kapat(self, butce: Optional[ZamanButcesi], sonuclar: List[Dict]) -> List[Dict]:
+        """🏁 Bütçe sayaçlarını işle; atlanan aşama varsa sonuçları bozulmuş olarak işaretle"""
+        if butce is None:
+            return sonuclar
+        self.butce_sayaclari.artir('butceli_sorgu')
+        if butce.asan_asama:
+            self.butce_sayaclari.artir(f'asim_{butce.asan_asama}')
+        if butce.bozulmus:
+            self.butce_sayaclari.artir('bozulmus_yanit')
+            for sonuc in sonuclar:
+                sonuc['bozulmus'] = True
+                sonuc['atlanan_asamalar'] = list(butce.atlanan)
+        return sonuclar
+    
+    def _filtre_kategorisi(self, sorgu: Dict) -> Optional[str]:
+        """🎯 Vektör sorgusunun kısıtlanacağı kategori - sadece tam eşleştirme gibi güçlü sinyalde"""
+        if not self.search_config.get('category_filter', False) or not sorgu.get('kategori'):
+            return None
+        eslesmeler = sorgu.get('eslesmeler')
+        if eslesmeler and eslesmeler['tam']:
+            return sorgu['kategori']
+        return None
+    
+    def _ara_ve_isle(self, sorgu: Dict, where: Optional[Dict] = None,
+                     butce: Optional[ZamanButcesi] = None) -> List[Dict]:
+        """🔎 Vektör sorgusu + skorlama, filtreleme ve top-k"""
+        with self._olc(butce, 'vektor_sorgusu'):
+            arama_sonuclari, skorlama = self._uyarlanir_aday_sorgusu([sorgu], where, butce)[0]
+        if not (arama_sonuclari['ids'] and arama_sonuclari['ids'][0]):
+            return []
+        return self._sonuclari_isle(
+            arama_sonuclari,
+            sorgu['temiz_soru'],
+            sorgu['kategori'],
+            sorgu.get('eslesmeler'),
+            butce=butce,
+            skorlama=skorlama
+        )
+    
+    def _uyarlanir_aday_sorgusu(self, sorgular: List[Dict], where: Optional[Dict] = None,
+                                butce: Optional[ZamanButcesi] = None) -> List[tuple]:
+        """📈 Uyarlanır k - küçük aday sayısıyla başla, gerekirse ikiye katla
+
+        Başlangıç k'si kategori için öğrenilmiş değerdir. Görülmeyen bir aday
+        (mesafesi k. adaydan küçük olamaz) en fazla bonuslarla kazananları
+        geçebiliyorsa k `max_search_results`e kadar ikiye katlanır. Sonucun sabit
+        `max_search_results` ile birebir aynı olması küçük k'nin büyük k'nin öneki
+        olmasına dayanır: tam aramada (NumPy) her zaman, Chroma HNSW'de sadece
+        search_ef >= max_search_results iken; depo bunu garanti etmiyorsa sabit k
+        kullanılır. Soru başına `(arama, skorlama)` döner.
+        """
+        max_k = self.search_config['max_search_results']
+        if not self.search_config.get('adaptive_k', False) or not self._uyarlanir_k_guvenli():
+            return [(arama, None) for arama in self._aday_sorgusu(sorgular, where)]
         
-        for kategori, config in self.categories.items():
-            skor = 0
-            
-            # Pozitif anahtar kelimeler
-            for keyword in config.get('keywords', []):
-                if keyword.lower() in soru_lower:
-                    # Ağırlık uygula
-                    skor += config.get('weight', 1.0)
-                    
-                    # Accuracy boost ekle
-                    skor += config.get('accuracy_boost', 0)
-            
-            # Negatif anahtar kelimeler - skor düşür
-            for neg_keyword in config.get('negative_keywords', []):
-                if neg_keyword.lower() in soru_lower:
-                    skor -= 0.5
-            
-            # Priorite bonusu
-            if config.get('priority') == 'high':
-                skor *= 1.2
-            elif config.get('priority') == 'medium':
-                skor *= 1.1
-            
-            kategori_skorlari[kategori] = skor
+        k_degerleri = [self._baslangic_k(sorgu['kategori']) for sorgu in sorgular]
+        sonuclar = [None] * len(sorgular)
+        turlar = [0] * len(sorgular)
+        bekleyenler = list(range(len(sorgular)))
+        while bekleyenler:
+            # Aynı k'deki sorular tek çok-embedding'li sorguda
+            gruplar: Dict[int, List[int]] = {}
+            for i in bekleyenler:
+                gruplar.setdefault(k_degerleri[i], []).append(i)
+            bekleyenler = []
+            for k, indeksler in gruplar.items():
+                aramalar = self._aday_sorgusu([sorgular[i] for i in indeksler], where, k)
+                for i, arama in zip(indeksler, aramalar):
+                    sorgu = sorgular[i]
+                    skorlama = self._skorla(
+                        arama, sorgu['temiz_soru'], sorgu['kategori'], sorgu.get('eslesmeler'), butce
+                    ) if arama['ids'][0] else None
+                    self.aday_sayaclari.artir('istenen_aday', k)
+                    if k >= max_k or self._aday_sayisi_yeterli(arama, skorlama, sorgu['kategori']):
+                        sonuclar[i] = (arama, skorlama)
+                    else:
+                        k_degerleri[i] = min(max_k, k * 2)
+                        turlar[i] += 1
+                        bekleyenler.append(i)
         
-        # En yüksek skoru bul
-        if kategori_skorlari:
-            en_iyi_kategori = max(kategori_skorlari.items(), key=lambda x: x[1])
-            
-            # Minimum eşik kontrolü
-            if en_iyi_kategori[1] > 0.5:
-                return en_iyi_kategori[0]
+        for sorgu, k, tur in zip(sorgular, k_degerleri, turlar):
+            self._kategori_k_guncelle(sorgu['kategori'], k)
+            self.aday_sayaclari.artir('uyarlanir_sorgu')
+            if tur:
+                self.aday_sayaclari.artir('genisletilen_sorgu')
+                self.aday_sayaclari.artir('genisletme_turu', tur)
+        return sonuclar
+    
+    def _uyarlanir_k_guvenli(self) -> bool:
+        """🛡️ Depo, max_search_results'a kadar k'yi küçültünce aynı komşuları döndürüyor mu"""
+        siniri = getattr(self.collection, 'kararli_k_siniri', None)
+        return siniri is not None and siniri() >= self.search_config['max_search_results']
+    
+    def _aday_sayisi_yeterli(self, arama: Dict, skorlama: Optional[Dict], kategori: Optional[str]) -> bool:
+        """✅ Görülmeyen adaylar kazananları geçemez mi
+
+        `sinir_mesafe`: dolu dönen varyantların en küçük k. mesafesi. Bundan yakın
+        her aday doğru mesafesiyle görülmüştür; diğerlerinin skoru en fazla
+        similarity sınırı + kategori ve anahtar kelime bonusudur.
+        """
+        sinir_mesafe = arama.get('sinir_mesafe')
+        if sinir_mesafe is None:
+            return True  # Tüm varyantlar k'den az döndü - depo tükendi
+        gizli_similarity = 1.0 - sinir_mesafe
+        if gizli_similarity < self.search_config['similarity_threshold']:
+            return True  # Görülmeyenler eşiği geçemez
         
-        return None
+        kazananlar = skorlama['kazananlar'] if skorlama else []
+        if len(kazananlar) < self.search_config['final_results']:
+            return False
+        max_bonus = (
+            self.search_config['category_bonus'] + self.search_config['keyword_bonus_max']
+        ) if kategori else 0.0
+        ust_sinir = min(gizli_similarity + max_bonus, 1.0)
+        similarity = skorlama['similarity']
+        # Eşit skorda daha yakın (küçük rank) aday kazanır
+        return all(
+            skor > ust_sinir or (skor >= ust_sinir and similarity[i] > gizli_similarity)
+            for i, skor in kazananlar
+        )
+    
+    def _baslangic_k(self, kategori: Optional[str]) -> int:
+        """🎯 Kategori için öğrenilmiş başlangıç k'si - [adaptive_k_min, max_search_results]"""
+        min_k = self.search_config.get('adaptive_k_min', 4)
+        with self._kategori_k_lock:
+            ortalama = self._kategori_k.get(kategori or 'genel')
+        if ortalama is None:
+            ortalama = min_k
+        return max(min_k, min(self.search_config['max_search_results'], math.ceil(ortalama)))
+    
+    def _kategori_k_guncelle(self, kategori: Optional[str], k: int):
+        """📈 Yeterli olan k ile kategorinin üstel ortalamasını güncelle"""
+        alfa = self.search_config.get('adaptive_k_ema', 0.2)
+        anahtar = kategori or 'genel'
+        with self._kategori_k_lock:
+            onceki = self._kategori_k.get(anahtar)
+            self._kategori_k[anahtar] = float(k) if onceki is None else onceki + alfa * (k - onceki)
+    
+    def _aday_sorgusu(self, sorgular: List[Dict], where: Optional[Dict] = None,
+                      k: Optional[int] = None) -> List[Dict]:
+        """🗄️ Soru başına aday listesi
+
+        Sorular ve varyantları tek çok-embedding'li vektör sorgusunda aranır; bir sorunun
+        aday listeleri skorlamadan önce birleştirilir.
+
+        İki aşamalı modda belgeler istenmez; skorlama metadata'daki içerik
+        uzunluğu ve anahtar kelime imzasıyla yapılır, belgeler sadece kazananlar
+        için getirilir. Bu alanları olmayan eski kayıtlarda tüm belgeler getirilir.
+        """
+        embeddingler = []
+        sahipler = []
+        for j, sorgu in enumerate(sorgular):
+            for embedding in [sorgu['embedding']] + list(sorgu.get('varyant_embeddingleri', ())):
+                embeddingler.append(embedding)
+                sahipler.append(j)
+        
+        k = k or self.search_config['max_search_results']
+        aramalar = self._vektor_sorgusu_toplu(np.stack(embeddingler), where, k)
+        gruplar = [[] for _ in sorgular]
+        for j, arama in zip(sahipler, aramalar):
+            gruplar[j].append(arama)
+        arama_sonuclari = []
+        for grup in gruplar:
+            # k aday dönen varyantların en küçük son mesafesi - bkz. `_aday_sayisi_yeterli`
+            dolu = [arama['distances'][0][-1] for arama in grup if len(arama['ids'][0]) >= k]
+            arama = self._aday_listelerini_birlestir(grup)
+            arama['sinir_mesafe'] = min(dolu) if dolu else None
+            arama_sonuclari.append(arama)
+        
+        if self.search_config.get('two_phase_retrieval', False):
+            # Metadata ile skorlanamayan sorgular için belgeler tek istekte
+            eksikler = [arama for arama in arama_sonuclari if arama['ids'][0]]
+            self.arama_sayaclari.artir('iki_asamali_sorgu', len(eksikler))
+            eksikler = [
+                arama for arama in eksikler if not self._metadata_ile_skorlanabilir(arama['metadatas'][0])
+            ]
+            if eksikler:
+                self.arama_sayaclari.artir('tek_asamaya_donus', len(eksikler))
+                idler = list(dict.fromkeys(veri_id for arama in eksikler for veri_id in arama['ids'][0]))
+                belgeler = dict(zip(idler, self._belgeleri_getir(idler)))
+                for arama in eksikler:
+                    arama['documents'] = [[belgeler[veri_id] for veri_id in arama['ids'][0]]]
+        
+        return arama_sonuclari
     
-    def _sonuclari_isle(self, arama_sonuclari, soru, kategori) -> List[Dict]:
-        """⚙️ Arama sonuçlarını işleme"""
-        islenmiş_sonuclar = []
+    def _aday_listelerini_birlestir(self, aramalar: List[Dict]) -> Dict:
+        """🔀 Varyant sonuçlarını id bazında en küçük mesafeyle birleştir
+
+        Sıra: mesafe, eşitlikte varyant sırası ve varyant içi sıra; ilk
+        `max_search_results` aday tutulur - tek sorgudaki aday sayısıyla aynı.
+        """
+        if len(aramalar) == 1:
+            return aramalar[0]
         
-        documents = arama_sonuclari['documents'][0]
+        en_iyi = {}
+        for varyant_no, arama in enumerate(aramalar):
+            for sira, (veri_id, mesafe) in enumerate(zip(arama['ids'][0], arama['distances'][0])):
+                onceki = en_iyi.get(veri_id)
+                if onceki is None or mesafe < onceki[0]:
+                    en_iyi[veri_id] = (mesafe, varyant_no, sira)
+        secilen = sorted(en_iyi.values())[:self.search_config['max_search_results']]
+        
+        return {
+            alan: [[aramalar[varyant_no][alan][0][sira] for _, varyant_no, sira in secilen]]
+            if aramalar[0].get(alan) is not None else None
+            for alan in ('ids', 'distances', 'metadatas', 'documents')
+        }
+    
+    def _vektor_sorgusu_toplu(self, embeddingler: np.ndarray, where: Optional[Dict] = None,
+                              k: Optional[int] = None) -> List[Dict]:
+        """🗄️ Çok-embedding'li vektör deposu sorgusu - sorgu başına tekli sonuç biçimi"""
+        iki_asamali = self.search_config.get('two_phase_retrieval', False)
+        include = ['metadatas', 'distances'] if iki_asamali else ['metadatas', 'documents', 'distances']
+        parca_boyutu = max(1, int(self.search_config.get('batch_query_size', 256)))
+        
+        arama_sonuclari = []
+        for bas in range(0, len(embeddingler), parca_boyutu):
+            toplu = self.collection.query(
+                query_embeddings=embeddingler[bas:bas + parca_boyutu],
+                n_results=k or self.search_config['max_search_results'],
+                include=include,
+                where=where
+            )
+            for q in range(len(toplu['ids'])):
+                arama_sonuclari.append({
+                    alan: [toplu[alan][q]] if toplu.get(alan) is not None else None
+                    for alan in ('ids', 'distances', 'metadatas', 'documents')
+                })
+        return arama_sonuclari
+    
+    def _metadata_ile_skorlanabilir(self, metadatas: List[Dict]) -> bool:
+        """🧾 Tüm adaylarda içerik uzunluğu ve güncel anahtar kelime imzası var mı"""
+        imza_versiyonu = self.keyword_matcher.imza_versiyonu
+        return all(
+            metadata and 'icerik_uzunlugu' in metadata
+            and metadata.get(IMZA_VERSIYON_ALANI) == imza_versiyonu
+            for metadata in metadatas
+        )
+    
+    def _belgeleri_getir(self, idler: List[str]) -> List[Optional[str]]:
+        """📄 Belgeleri id sırasıyla getir (ikinci aşama)"""
+        sonuc = self.collection.get(ids=list(idler), include=['documents'])
+        belgeler = dict(zip(sonuc['ids'], sonuc['documents']))
+        self.arama_sayaclari.artir('getirilen_belge', len(belgeler))
+        return [belgeler.get(veri_id) for veri_id in idler]
+    
+    def soru_kategorisi(self, soru: str) -> Optional[str]:
+        """🎯 Sorunun tespit edilen kategorisi (arama yapmadan)"""
+        return self._kategori_tespit_et(self._soru_temizle(soru))
+    
+    def _encode(self, metinler: List[str]):
+        """🔢 Sorgu metinlerini encode et
+
+        Disk embedding önbelleği yalnızca veri yüklemede kullanılır; her benzersiz soruyu
+        kalıcı yazmamak için sorgu embedding'leri sadece bellek içi LRU'da tutulur.
+        """
+        return self.embedding_model.encode(metinler)
+    
+    def _soru_temizle(self, soru: str) -> str:
+        """🧹 Soru temizleme - Türkçe küçük harf, Unicode ve noktalama normalizasyonu"""
+        return soru_normalize(soru)
+    
+    def _kategori_tespit_et(self, soru: str) -> Optional[str]:
+        """🎯 Gelişmiş kategori tespiti - tek geçişli otomat + isabet tablosu"""
+        return self.keyword_matcher.kategori_tespit_et(self.keyword_matcher.eslesmeler(soru))
+    
+    def _sonuclari_isle(self, arama_sonuclari, soru, kategori, eslesmeler=None,
+                        belgeleri_getir: bool = True, butce: Optional[ZamanButcesi] = None,
+                        skorlama: Optional[Dict] = None) -> List[Dict]:
+        """⚙️ Arama sonuçlarını işleme - vektörel skorlama, sonuç dict'i sadece kazananlar için
+
+        Belgeler sonuçta yoksa (iki aşamalı arama) uzunluklar metadata'dan okunur
+        ve belgeler sadece kazananlar için getirilir. `belgeleri_getir=False` ise
+        `icerik` None kalır; toplu aramada belgeler tek istekte doldurulur.
+        `skorlama` verilirse (bkz. `_skorla`) tekrar skorlanmaz.
+        """
+        skorlama = skorlama or self._skorla(arama_sonuclari, soru, kategori, eslesmeler, butce)
+        kazananlar = skorlama['kazananlar']
+        if not kazananlar:
+            return []
+        documents, metadatas = skorlama['documents'], skorlama['metadatas']
+        distances, similarity = skorlama['distances'], skorlama['similarity']
+        
+        if documents is None and not belgeleri_getir:
+            documents = dict.fromkeys(i for i, _ in kazananlar)
+        elif documents is None:
+            # İkinci aşama: sadece kazananların belgeleri; aradaki silinmeler atlanır
+            ids = arama_sonuclari['ids'][0]
+            with self._olc(butce, 'belge_getirme'):
+                belgeler = self._belgeleri_getir([ids[i] for i, _ in kazananlar])
+            documents = {i: belge for (i, _), belge in zip(kazananlar, belgeler)}
+            kazananlar = [(i, skor) for i, skor in kazananlar if documents[i] is not None]
+        
+        return [
+            {
+                'icerik': documents[i],
+                'kategori': metadatas[i].get('kategori', 'genel'),
+                'skor': float(skor),
+                'metadata': metadatas[i],
+                'orijinal_distance': distances[i],
+                'similarity_score': float(similarity[i]),
+                'rank': int(i) + 1
+            }
+            for i, skor in kazananlar
+        ]
+    
+    def _skorla(self, arama_sonuclari, soru, kategori, eslesmeler=None,
+                butce: Optional[ZamanButcesi] = None) -> Dict:
+        """🧮 Eşik ve içerik uzunluğu maskeleri, skorlar ve ilk `final_results` kazanan"""
+        documents = (arama_sonuclari.get('documents') or [None])[0]
         metadatas = arama_sonuclari['metadatas'][0]
         distances = arama_sonuclari['distances'][0]
         
-        for i, (doc, metadata, distance) in enumerate(zip(documents, metadatas, distances)):
-            # Distance'ı similarity skora çevir
-            similarity_score = 1.0 - distance
-            
-            # Minimum eşik kontrolü
-            if similarity_score < self.search_config['similarity_threshold']:
-                continue
-            
-            # Kategori bonusu uygula
-            final_score = similarity_score
-            doc_kategori = metadata.get('kategori', 'genel')
-            
-            if kategori and doc_kategori == kategori:
-                final_score += self.search_config['category_bonus']
-            
-            # Anahtar kelime bonusu
-            keyword_bonus = self._hesapla_keyword_bonusu(soru, doc, kategori)
-            final_score += keyword_bonus
-            
-            # Sonucu hazırla
-            sonuc = {
-                'icerik': doc,
-                'kategori': doc_kategori,
-                'skor': min(final_score, 1.0),  # 1.0'ı aşmasın
-                'metadata': metadata,
-                'orijinal_distance': distance,
-                'similarity_score': similarity_score,
-                'rank': i + 1
-            }
+        # Distance'ı similarity skora çevir, eşik ve içerik uzunluğu maskeleri
+        similarity = 1.0 - np.asarray(distances, dtype=np.float64)
+        if documents is not None:
+            uzunluklar = np.fromiter((len(doc) for doc in documents), dtype=np.int64, count=len(documents))
+        else:
+            uzunluklar = np.fromiter(
+                (metadata['icerik_uzunlugu'] for metadata in metadatas), dtype=np.int64, count=len(metadatas)
+            )
+        adaylar = np.flatnonzero(
+            (similarity >= self.search_config['similarity_threshold'])
+            & (uzunluklar >= self.search_config['min_content_length'])
+        )
+        kazananlar = []
+        if adaylar.size:
+            with self._olc(butce, 'skorlama'):
+                skorlar = self._aday_skorlari(
+                    adaylar, similarity, documents, metadatas, soru, kategori, eslesmeler, butce
+                )
+                kazananlar = self._en_iyi_adaylar(adaylar, skorlar, self.search_config['final_results'])
+        return {
+            'documents': documents,
+            'metadatas': metadatas,
+            'distances': distances,
+            'similarity': similarity,
+            'kazananlar': kazananlar
+        }
+    
+    def _aday_skorlari(self, adaylar, similarity, documents, metadatas, soru, kategori,
+                       eslesmeler=None, butce: Optional[ZamanButcesi] = None) -> np.ndarray:
+        """🧮 Similarity + kategori bonusu + anahtar kelime bonusu, 1.0 ile sınırlı"""
+        final_skor = similarity[adaylar]
+        
+        # Kategori bonusu uygula
+        if kategori:
+            kategori_eslesen = np.fromiter(
+                (metadatas[i].get('kategori', 'genel') == kategori for i in adaylar),
+                dtype=bool, count=adaylar.size
+            )
+            final_skor = final_skor + np.where(kategori_eslesen, self.search_config['category_bonus'], 0.0)
             
-            islenmiş_sonuclar.append(sonuc)
+            # Anahtar kelime bonusu - soruda bonus kelimesi yoksa tüm adaylar için 0
+            if eslesmeler is None:
+                eslesmeler = self.keyword_matcher.eslesmeler(soru)
+            soru_maskesi = self.keyword_matcher.soru_maskesi(eslesmeler, kategori)
+            if soru_maskesi and self._asama_izni(butce, 'keyword_bonusu'):
+                final_skor = final_skor + self._keyword_bonuslari(
+                    adaylar, documents, metadatas, soru, kategori, eslesmeler, soru_maskesi
+                )
         
-        return islenmiş_sonuclar
+        return np.minimum(final_skor, 1.0)  # 1.0'ı aşmasın
     
-    def _hesapla_keyword_bonusu(self, soru, doc, kategori) -> float:
-        """🔑 Anahtar kelime bonusu hesaplama"""
+    def _keyword_bonuslari(self, adaylar, documents, metadatas, soru, kategori,
+                           eslesmeler, soru_maskesi: int) -> np.ndarray:
+        """🔑 Adaylar için anahtar kelime bonusu vektörü - önce maske, yoksa metin taraması"""
+        maskeler = np.zeros(adaylar.size, dtype=np.int64)
+        imzasiz = []
+        for j, i in enumerate(adaylar):
+            maske = self.keyword_matcher.dokuman_maskesi(metadatas[i], kategori)
+            if maske is None:
+                imzasiz.append(j)
+            else:
+                maskeler[j] = maske
+        
+        eslesen = BIT_SAYISI_TABLOSU[maskeler & soru_maskesi]
+        bonuslar = np.minimum(KEYWORD_BONUS_DIZISI[eslesen], self.search_config['keyword_bonus_max'])
+        
+        if imzasiz:
+            ortak_keywordler = self.keyword_matcher.ortak_keywordler(eslesmeler, kategori)
+            for j in imzasiz:
+                bonuslar[j] = self._hesapla_keyword_bonusu(
+                    soru, documents[adaylar[j]], kategori, ortak_keywordler
+                )
+        return bonuslar
+    
+    def _en_iyi_adaylar(self, adaylar: np.ndarray, skorlar: np.ndarray, k: int) -> List:
+        """🏆 Skora göre azalan, eşitlikte orijinal sıraya göre ilk k aday
+
+        `argpartition` ile k. skor bulunur; sınırdaki eşitler dahil edilip
+        kararlı sıralanır - tam kararlı sıralamayla aynı sonuç.
+        """
+        if k <= 0:
+            return []
+        if k < skorlar.size:
+            esik = -np.partition(-skorlar, k - 1)[k - 1]
+            secilen = np.flatnonzero(skorlar >= esik)
+        else:
+            secilen = np.arange(skorlar.size)
+        
+        sira = secilen[np.lexsort((secilen, -skorlar[secilen]))][:k]
+        return [(adaylar[j], skorlar[j]) for j in sira]
+    
+    def _hesapla_keyword_bonusu(self, soru, doc, kategori, ortak_keywordler=None) -> float:
+        """🔑 Anahtar kelime bonusu hesaplama
+
+        `ortak_keywordler`: soruda geçen ilk 10 kategori anahtar kelimesi
+        (bkz. `SigortaKeywordMatcher.ortak_keywordler`); verilmezse sorudan hesaplanır.
+        """
         if not kategori:
             return 0
         
-        keyword_config = self.categories.get(kategori, {})
-        keywords = keyword_config.get('keywords', [])
+        if ortak_keywordler is None:
+            ortak_keywordler = self.keyword_matcher.ortak_keywordler(
+                self.keyword_matcher.eslesmeler(soru), kategori
+            )
+        if not ortak_keywordler:
+            return 0
         
-        soru_lower = soru.lower()
-        doc_lower = doc.lower()
+        doc_lower = turkce_kucuk_harf(doc)
         
         bonus = 0
         matched_keywords = 0
         
-        for keyword in keywords[:10]:  # İlk 10 anahtar kelimeyi kontrol et
-            if keyword.lower() in soru_lower and keyword.lower() in doc_lower:
+        for keyword in ortak_keywordler:  # Sadece soruda geçenler dokümanda aranır
+            if keyword in doc_lower:
                 bonus += 0.05  # Her eşleşme için bonus
                 matched_keywords += 1
         
@@ -183,34 +814,79 @@ class SigortaQueryEngine:
         max_bonus = self.search_config['keyword_bonus_max']
         return min(bonus, max_bonus)
     
-    def _final_filtreleme(self, sonuclar: List[Dict]) -> List[Dict]:
-        """🎯 Final filtreleme ve sıralama"""
-        if not sonuclar:
-            return []
-        
-        # Skor bazlı sıralama
-        sonuclar.sort(key=lambda x: x['skor'], reverse=True)
-        
-        # Minimum içerik uzunluğu filtresi
-        min_length = self.search_config['min_content_length']
-        filtrelenmiş = [
-            s for s in sonuclar 
-            if len(s['icerik']) >= min_length
-        ]
-        
-        # Final sonuç sayısını sınırla
-        final_count = self.search_config['final_results']
-        return filtrelenmiş[:final_count]
-    
     def get_arama_stats(self) -> Dict:
         """📊 Arama istatistikleri"""
+        sayaclar = self.arama_sayaclari.topla()
+        filtreli = sayaclar['kategori_filtreli_sorgu']
         return {
             'active_categories': len(self.categories),
             'exact_matches': len(self.exact_matches),
             'similarity_threshold': self.search_config['similarity_threshold'],
             'max_results': self.search_config['max_search_results'],
-            'final_results': self.search_config['final_results']
+            'final_results': self.search_config['final_results'],
+            'two_phase_retrieval': self.search_config.get('two_phase_retrieval', False),
+            'iki_asamali': {
+                alan: sayaclar[alan] for alan in ('iki_asamali_sorgu', 'tek_asamaya_donus', 'getirilen_belge')
+            },
+            'kategori_filtresi': {
+                'aktif': self.search_config.get('category_filter', False),
+                'sorgu': filtreli,
+                'hit': sayaclar['kategori_filtre_hit'],
+                'geri_donus': sayaclar['kategori_filtre_geri_donus'],
+                'hit_rate': int(sayaclar['kategori_filtre_hit'] / filtreli * 100) if filtreli else 0,
+                'geri_donus_orani': int(sayaclar['kategori_filtre_geri_donus'] / filtreli * 100) if filtreli else 0
+            },
+            'embedding_lru': self.get_embedding_lru_stats(),
+            'zaman_butcesi': self.get_butce_stats(),
+            'uyarlanir_k': self.get_uyarlanir_k_stats()
+        }
+    
+    def get_uyarlanir_k_stats(self) -> Dict:
+        """📈 Uyarlanır aday sayısı istatistikleri - genişletme turları ve öğrenilen k'ler"""
+        sayaclar = self.aday_sayaclari.topla()
+        sorgu = sayaclar['uyarlanir_sorgu']
+        with self._kategori_k_lock:
+            kategori_k = {kategori: round(k, 1) for kategori, k in self._kategori_k.items()}
+        return {
+            'aktif': self.search_config.get('adaptive_k', False) and self._uyarlanir_k_guvenli(),
+            'min_k': self.search_config.get('adaptive_k_min', 4),
+            'max_k': self.search_config['max_search_results'],
+            'sorgu': sorgu,
+            'genisletilen_sorgu': sayaclar['genisletilen_sorgu'],
+            'genisletme_turu': sayaclar['genisletme_turu'],
+            'ortalama_istenen_aday': round(sayaclar['istenen_aday'] / sorgu, 1) if sorgu else 0,
+            'kategori_k': kategori_k
+        }
+    
+    def get_butce_stats(self) -> Dict:
+        """⏱️ Zaman bütçesi istatistikleri - aşama başına atlanma ve aşım sayıları"""
+        sayaclar = self.butce_sayaclari.topla()
+        return {
+            'aktif': self.search_config.get('deadline_aware', False),
+            'hedef_saniye': self.config['accuracy']['target_metrics']['response_time_goal'],
+            'butceli_sorgu': sayaclar['butceli_sorgu'],
+            'bozulmus_yanit': sayaclar['bozulmus_yanit'],
+            'atlanan': {asama: sayaclar[f'atlanan_{asama}'] for asama in ISTEGE_BAGLI_ASAMALAR},
+            'asim': {asama: sayaclar[f'asim_{asama}'] for asama in ZORUNLU_ASAMALAR}
         }
+    
+    def get_embedding_lru_stats(self) -> Dict:
+        """📊 Sorgu embedding LRU istatistikleri"""
+        with self._embedding_lru_lock:
+            toplam = self.embedding_lru_stats['hit'] + self.embedding_lru_stats['miss']
+            return {
+                'hit': self.embedding_lru_stats['hit'],
+                'miss': self.embedding_lru_stats['miss'],
+                'hit_rate': int(self.embedding_lru_stats['hit'] / toplam * 100) if toplam > 0 else 0,
+                'size': len(self._embedding_lru),
+                'max_size': self.embedding_lru_boyutu,
+                'bytes': sum(v.nbytes for v in self._embedding_lru.values())
+            }
+    
+    def embedding_lru_temizle(self):
+        """🗑️ Sorgu embedding LRU'sunu boşalt"""
+        with self._embedding_lru_lock:
+            self._embedding_lru.clear()
 
 if __name__ == "__main__":
     print("🔍 Sigorta Query Engine - Test Modu")
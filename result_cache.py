@@ -0,0 +1,566 @@
+# result_cache.py - Thread-Safe Önbellek ve Sayaçlar
+"""
+🗂️ Paylaşılan Model Core için Önbellek Backend'leri
+Kilit-şeritli bellek içi LRU, süreçler arası SQLite (WAL) önbelleği ve thread başına sayaçlar
+
+Backend arayüzü: get / put / toplu_kaydet / etiketle_gecersiz_kil / clear / get_stats / __len__
+Kayıtlar etiket taşıyabilir (ör. 'kat:kasko', 'id:kasko_001'); veri değiştiğinde
+sadece ilgili etiketli kayıtlar silinir.
+"""
+import itertools
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set
+import numpy as np
+
+# Backend'lerin ortak tahliye/geçersiz kılma sayaçları
+TAHLIYE_SAYACLARI = {
+    'lru_tahliye': 0,
+    'ttl_tahliye': 0,
+    'boyut_tahliye': 0,
+    'reddedilen': 0,
+    'gecersiz_kilinan': 0
+}
+
+class ThreadLocalCounters:
+    """🧮 Thread başına sayaçlar - okumada birleştirilir
+
+    Her thread kendi sözlüğünü kilitsiz artırır; `topla` tüm thread'lerin
+    değerlerini toplar. Biten thread'lerin değerleri emekli toplamına aktarılır,
+    böylece Streamlit'in her rerun'da açtığı yeni thread'ler listeyi büyütmez.
+    """
+
+    def __init__(self, alanlar: Dict[str, float]):
+        self._sifir = dict(alanlar)
+        self._yerel = threading.local()
+        self._lock = threading.Lock()
+        self._aktif = []                    # (thread, sayaç sözlüğü)
+        self._emekli = dict(self._sifir)
+        self._taban = dict(self._sifir)     # sifirla() anındaki toplam
+
+    def artir(self, alan: str, miktar: float = 1):
+        """➕ Çağıran thread'in sayacını artır"""
+        sayac = getattr(self._yerel, 'sayac', None)
+        if sayac is None:
+            sayac = self._thread_kaydet()
+        sayac[alan] += miktar
+
+    def _thread_kaydet(self) -> Dict[str, float]:
+        """🧵 Yeni thread için sayaç sözlüğü oluştur"""
+        sayac = dict(self._sifir)
+        with self._lock:
+            self._aktif.append((threading.current_thread(), sayac))
+        self._yerel.sayac = sayac
+        return sayac
+
+    def _ham_toplam(self) -> Dict[str, float]:
+        """Σ Tüm thread'lerin toplamı (kilit altında çağrılır)"""
+        toplam = dict(self._emekli)
+        canli = []
+        for thread, sayac in self._aktif:
+            if thread.is_alive():
+                canli.append((thread, sayac))
+            else:
+                # Thread bitti, sözlüğü artık değişmez - emekli toplamına aktar
+                for alan, deger in sayac.items():
+                    self._emekli[alan] += deger
+            for alan, deger in sayac.items():
+                toplam[alan] += deger
+        self._aktif = canli
+        return toplam
+
+    def topla(self) -> Dict[str, float]:
+        """📊 Birleştirilmiş sayaç değerleri"""
+        with self._lock:
+            toplam = self._ham_toplam()
+            return {alan: toplam[alan] - self._taban[alan] for alan in toplam}
+
+    def sifirla(self):
+        """🔄 Sayaçları sıfırla - çalışan thread'lerin artışları kaybolmaz"""
+        with self._lock:
+            self._taban = self._ham_toplam()
+
+class StripedCache:
+    """🗂️ Kilit-şeritli LRU önbellek
+
+    Anahtarlar hash ile parçalara (shard) dağıtılır, her parçanın kendi kilidi
+    vardır; farklı parçalara giden okuma/yazmalar birbirini beklemez. Her parça
+    bir OrderedDict'tir: okuma kaydı sona taşır (O(1)).
+    Kayıt sayısı ve bayt bütçesi cache geneline uygulanır - hash dağılımı
+    dengesiz olsa da `max_size` altındaki çalışma kümesi tahliye edilmez.
+    Sınır aşılınca tüm parçaların en eskisi arasından son erişimi en eski
+    olan kayıt çıkarılır (global LRU).
+    """
+
+    def __init__(self, max_size: int, shard_sayisi: int = 16,
+                 ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.max_size = max(1, int(max_size))
+        self.shard_sayisi = max(1, min(int(shard_sayisi), self.max_size))
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # Her kayıt: anahtar -> (değer, son geçerlilik zamanı, bayt, etiketler, son erişim sırası)
+        self._shardlar: List[OrderedDict] = [OrderedDict() for _ in range(self.shard_sayisi)]
+        self._kilitler = [threading.Lock() for _ in range(self.shard_sayisi)]
+        # Global kayıt/bayt toplamı - parça kilidi altındayken alınır, tersi yapılmaz
+        self._toplam_lock = threading.Lock()
+        self._toplam_kayit = 0
+        self._toplam_bayt = 0
+        self._erisim_sirasi = itertools.count()
+        self.sayaclar = ThreadLocalCounters(TAHLIYE_SAYACLARI)
+
+    def _shard_no(self, anahtar: str) -> int:
+        return hash(anahtar) % self.shard_sayisi
+
+    def get(self, anahtar: str) -> Optional[Any]:
+        """📋 Anahtarın değeri (yoksa veya süresi dolduysa None) - kaydı en yeni yapar"""
+        no = self._shard_no(anahtar)
+        with self._kilitler[no]:
+            shard = self._shardlar[no]
+            kayit = shard.get(anahtar)
+            if kayit is None:
+                return None
+            if kayit[1] is not None and kayit[1] <= time.time():
+                self._kayit_sil(no, anahtar)
+                self.sayaclar.artir('ttl_tahliye')
+                return None
+            shard[anahtar] = kayit[:4] + (next(self._erisim_sirasi),)
+            shard.move_to_end(anahtar)
+            return kayit[0]
+
+    def put(self, anahtar: str, deger: Any, ttl: Optional[float] = None,
+            etiketler: Optional[Iterable[str]] = None):
+        """💾 Değer kaydet - sınır aşılırsa en az kullanılanları çıkar"""
+        bayt = self._bayt_olc(deger)
+        if self.max_bytes and bayt > self.max_bytes:
+            # Tek başına bütçeyi aşan sonuç cache'lenmez
+            self.sayaclar.artir('reddedilen')
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        son_gecerlilik = time.time() + ttl if ttl else None
+
+        no = self._shard_no(anahtar)
+        with self._kilitler[no]:
+            shard = self._shardlar[no]
+            if anahtar in shard:
+                self._kayit_sil(no, anahtar)
+            shard[anahtar] = (
+                deger, son_gecerlilik, bayt, frozenset(etiketler or ()), next(self._erisim_sirasi)
+            )
+            with self._toplam_lock:
+                self._toplam_kayit += 1
+                self._toplam_bayt += bayt
+        self._tahliye_et(anahtar)
+
+    def _sinir_asimi(self) -> Optional[str]:
+        """📏 Aşılan global sınır: 'sayi', 'bayt' veya None"""
+        with self._toplam_lock:
+            if self._toplam_kayit > self.max_size:
+                return 'sayi'
+            if self.max_bytes and self._toplam_bayt > self.max_bytes and self._toplam_kayit > 1:
+                return 'bayt'
+        return None
+
+    def _tahliye_et(self, korunan: str):
+        """🧹 Global sınırlar sağlanana kadar son erişimi en eski kaydı çıkar
+
+        Parça kilitleri tek tek alınır (hiçbiri tutulurken diğeri beklenmez);
+        yeni yazılan `korunan` kayıt çıkarılmaz.
+        """
+        while True:
+            asim = self._sinir_asimi()
+            if asim is None:
+                return
+            hedef = None
+            for no in range(self.shard_sayisi):
+                with self._kilitler[no]:
+                    for eski_anahtar, kayit in self._shardlar[no].items():
+                        if eski_anahtar == korunan:
+                            continue
+                        if hedef is None or kayit[4] < hedef[2]:
+                            hedef = (no, eski_anahtar, kayit[4])
+                        break  # Parçanın en eskisi yeterli
+            if hedef is None:
+                return
+            no, eski_anahtar, sira = hedef
+            simdi = time.time()
+            with self._kilitler[no]:
+                kayit = self._shardlar[no].get(eski_anahtar)
+                if kayit is None or kayit[4] != sira:
+                    continue  # Arada okundu veya silindi - yeniden seç
+                self._kayit_sil(no, eski_anahtar)
+            if kayit[1] is not None and kayit[1] <= simdi:
+                self.sayaclar.artir('ttl_tahliye')
+            elif asim == 'sayi':
+                self.sayaclar.artir('lru_tahliye')
+            else:
+                self.sayaclar.artir('boyut_tahliye')
+
+    def _kayit_sil(self, no: int, anahtar: str):
+        """➖ Kaydı parçadan ve global toplamlardan düş (parça kilidi altında)"""
+        kayit = self._shardlar[no].pop(anahtar, None)
+        if kayit is not None:
+            with self._toplam_lock:
+                self._toplam_kayit -= 1
+                self._toplam_bayt -= kayit[2]
+
+    def _bayt_olc(self, deger: Any) -> int:
+        """📏 Cache'lenen sonucun serileştirilmiş boyutu"""
+        try:
+            return len(pickle.dumps(deger, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return len(repr(deger).encode('utf-8'))
+
+    def toplu_kaydet(self, kayitlar: Dict[str, Any], ttl: Optional[float] = None,
+                     etiketler: Optional[Dict[str, Set[str]]] = None):
+        """📦 Çok sayıda kaydı tek seferde yükle (cache ısıtma)"""
+        etiketler = etiketler or {}
+        for anahtar, deger in kayitlar.items():
+            self.put(anahtar, deger, ttl, etiketler.get(anahtar))
+
+    def etiketle_gecersiz_kil(self, etiketler: Set[str]) -> int:
+        """🎯 Verilen etiketlerden birini taşıyan kayıtları sil"""
+        etiketler = set(etiketler)
+        silinen = 0
+        for no, kilit in enumerate(self._kilitler):
+            with kilit:
+                hedefler = [
+                    anahtar for anahtar, kayit in self._shardlar[no].items()
+                    if kayit[3] & etiketler
+                ]
+                for anahtar in hedefler:
+                    self._kayit_sil(no, anahtar)
+                silinen += len(hedefler)
+        if silinen:
+            self.sayaclar.artir('gecersiz_kilinan', silinen)
+        return silinen
+
+    def clear(self):
+        """🗑️ Tüm parçaları temizle"""
+        for no, kilit in enumerate(self._kilitler):
+            with kilit:
+                for anahtar in list(self._shardlar[no]):
+                    self._kayit_sil(no, anahtar)
+
+    def get_stats(self) -> Dict:
+        """📊 Boyut ve tahliye istatistikleri"""
+        stats = {
+            'backend': 'memory',
+            'size': len(self),
+            'max_size': self.max_size,
+            'bytes': self._toplam_bayt,
+            'max_bytes': self.max_bytes or 0,
+            'ttl_saniye': self.ttl or 0
+        }
+        stats.update(self.sayaclar.topla())
+        return stats
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shardlar)
+
+class SQLiteResultCache:
+    """🗄️ SQLite (WAL) tabanlı sonuç önbelleği
+
+    Aynı makinedeki tüm Streamlit süreçleri tek dosyayı okur/yazar; bir sürecin
+    ısıttığı cevap diğerlerinde de hit olur. Harici servis gerektirmez.
+    LRU sırası `son_erisim` sütunuyla tutulur. Değerler pickle ile saklanır;
+    dosya sadece bu uygulamanın yazdığı yerel bir önbellektir.
+    """
+
+    # Her hit'te yazma yapmamak için son erişim en fazla bu sıklıkla güncellenir
+    ERISIM_GUNCELLEME_ARALIGI = 5.0
+
+    def __init__(self, db_file: str, max_size: int,
+                 ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.db_file = db_file
+        self.max_size = max(1, int(max_size))
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._yerel = threading.local()
+        self.sayaclar = ThreadLocalCounters(TAHLIYE_SAYACLARI)
+
+        dizin = os.path.dirname(db_file)
+        if dizin:
+            os.makedirs(dizin, exist_ok=True)
+
+        conn = self._baglanti()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sonuc_cache ("
+            " anahtar TEXT PRIMARY KEY,"
+            " deger BLOB NOT NULL,"
+            " son_gecerlilik REAL,"
+            " bayt INTEGER NOT NULL,"
+            " son_erisim REAL NOT NULL,"
+            " etiketler TEXT NOT NULL DEFAULT '')"
+        )
+        # Eski şemaya etiket sütunu ekle
+        sutunlar = {satir[1] for satir in conn.execute("PRAGMA table_info(sonuc_cache)")}
+        if 'etiketler' not in sutunlar:
+            conn.execute("ALTER TABLE sonuc_cache ADD COLUMN etiketler TEXT NOT NULL DEFAULT ''")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_son_erisim ON sonuc_cache(son_erisim)")
+
+    def _baglanti(self) -> sqlite3.Connection:
+        """🔌 Thread başına bağlantı (thread bitince kapanır)"""
+        conn = getattr(self._yerel, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._yerel.conn = conn
+        return conn
+
+    def get(self, anahtar: str) -> Optional[Any]:
+        """📋 Anahtarın değeri (yoksa veya süresi dolduysa None)"""
+        conn = self._baglanti()
+        satir = conn.execute(
+            "SELECT deger, son_gecerlilik, son_erisim FROM sonuc_cache WHERE anahtar = ?",
+            (anahtar,)
+        ).fetchone()
+        if satir is None:
+            return None
+
+        deger, son_gecerlilik, son_erisim = satir
+        simdi = time.time()
+        if son_gecerlilik is not None and son_gecerlilik <= simdi:
+            conn.execute("DELETE FROM sonuc_cache WHERE anahtar = ?", (anahtar,))
+            self.sayaclar.artir('ttl_tahliye')
+            return None
+
+        if simdi - son_erisim > self.ERISIM_GUNCELLEME_ARALIGI:
+            conn.execute("UPDATE sonuc_cache SET son_erisim = ? WHERE anahtar = ?", (simdi, anahtar))
+        return pickle.loads(deger)
+
+    def put(self, anahtar: str, deger: Any, ttl: Optional[float] = None,
+            etiketler: Optional[Iterable[str]] = None):
+        """💾 Değer kaydet ve sınırları uygula"""
+        self.toplu_kaydet({anahtar: deger}, ttl, {anahtar: etiketler} if etiketler else None)
+
+    def toplu_kaydet(self, kayitlar: Dict[str, Any], ttl: Optional[float] = None,
+                     etiketler: Optional[Dict[str, Set[str]]] = None):
+        """📦 Kayıtları tek transaction'da yaz (cache ısıtma)"""
+        etiketler = etiketler or {}
+        ttl = self.ttl if ttl is None else ttl
+        simdi = time.time()
+        son_gecerlilik = simdi + ttl if ttl else None
+
+        satirlar = []
+        for anahtar, deger in kayitlar.items():
+            blob = pickle.dumps(deger, protocol=pickle.HIGHEST_PROTOCOL)
+            if self.max_bytes and len(blob) > self.max_bytes:
+                self.sayaclar.artir('reddedilen')
+                continue
+            # '|a|b|' biçimi - instr(etiketler, '|a|') ile tam etiket eşleşmesi
+            etiket_metni = ''.join(f"|{etiket}" for etiket in sorted(etiketler.get(anahtar) or ())) + '|'
+            satirlar.append((anahtar, sqlite3.Binary(blob), son_gecerlilik, len(blob), simdi, etiket_metni))
+        if not satirlar:
+            return
+
+        conn = self._baglanti()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO sonuc_cache "
+                "(anahtar, deger, son_gecerlilik, bayt, son_erisim, etiketler) VALUES (?, ?, ?, ?, ?, ?)",
+                satirlar
+            )
+            self._tahliye_et(conn, simdi)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _tahliye_et(self, conn: sqlite3.Connection, simdi: float):
+        """🧹 Süresi dolanları, sonra sayı ve bayt sınırını aşan en eski kayıtları sil"""
+        silinen = conn.execute(
+            "DELETE FROM sonuc_cache WHERE son_gecerlilik IS NOT NULL AND son_gecerlilik <= ?",
+            (simdi,)
+        ).rowcount
+        if silinen > 0:
+            self.sayaclar.artir('ttl_tahliye', silinen)
+
+        silinen = conn.execute(
+            "DELETE FROM sonuc_cache WHERE anahtar IN ("
+            " SELECT anahtar FROM sonuc_cache ORDER BY son_erisim DESC LIMIT -1 OFFSET ?)",
+            (self.max_size,)
+        ).rowcount
+        if silinen > 0:
+            self.sayaclar.artir('lru_tahliye', silinen)
+
+        if self.max_bytes:
+            silinen = conn.execute(
+                "DELETE FROM sonuc_cache WHERE anahtar IN ("
+                " SELECT anahtar FROM ("
+                "  SELECT anahtar, SUM(bayt) OVER (ORDER BY son_erisim DESC, anahtar) AS kumulatif"
+                "  FROM sonuc_cache) WHERE kumulatif > ?)",
+                (self.max_bytes,)
+            ).rowcount
+            if silinen > 0:
+                self.sayaclar.artir('boyut_tahliye', silinen)
+
+    def etiketle_gecersiz_kil(self, etiketler: Set[str]) -> int:
+        """🎯 Verilen etiketlerden birini taşıyan kayıtları sil (tüm süreçler için)"""
+        etiketler = sorted(etiketler)
+        if not etiketler:
+            return 0
+        kosul = " OR ".join("instr(etiketler, ?) > 0" for _ in etiketler)
+        silinen = self._baglanti().execute(
+            f"DELETE FROM sonuc_cache WHERE {kosul}",
+            [f"|{etiket}|" for etiket in etiketler]
+        ).rowcount
+        if silinen > 0:
+            self.sayaclar.artir('gecersiz_kilinan', silinen)
+        return max(silinen, 0)
+
+    def clear(self):
+        """🗑️ Tüm kayıtları sil (tüm süreçler için)"""
+        self._baglanti().execute("DELETE FROM sonuc_cache")
+
+    def get_stats(self) -> Dict:
+        """📊 Boyut ve tahliye istatistikleri"""
+        sayi, bayt = self._baglanti().execute(
+            "SELECT COUNT(*), COALESCE(SUM(bayt), 0) FROM sonuc_cache"
+        ).fetchone()
+        stats = {
+            'backend': 'sqlite',
+            'size': sayi,
+            'max_size': self.max_size,
+            'bytes': bayt,
+            'max_bytes': self.max_bytes or 0,
+            'ttl_saniye': self.ttl or 0
+        }
+        stats.update(self.sayaclar.topla())
+        return stats
+
+    def __len__(self) -> int:
+        return self._baglanti().execute("SELECT COUNT(*) FROM sonuc_cache").fetchone()[0]
+
+class SemanticQueryCache:
+    """🧠 Anlamsal yakın-kopya soru indeksi
+
+    Cevaplanmış soruların normalize embedding'lerini küçük bir matriste tutar.
+    Yeni sorunun embedding'i kosinüs mesafesi eşiği içinde ve aynı kategoride bir
+    soruya denk gelirse, o sorunun sonuç cache anahtarı döner. Sonuçların kendisi
+    sonuç cache'inde kalır; geçersiz kılınan sonuç burada da ıska sayılır.
+    Doluyken en uzun süredir kullanılmayan satır değiştirilir.
+    """
+
+    def __init__(self, kapasite: int, max_mesafe: float):
+        self.kapasite = max(1, int(kapasite))
+        self.max_mesafe = max_mesafe
+        self._lock = threading.Lock()
+        self._matris = None                  # (kapasite, boyut) float32
+        self._anahtarlar: List[Optional[str]] = [None] * self.kapasite
+        self._kategoriler: List[Optional[str]] = [None] * self.kapasite
+        self._son_kullanim = np.zeros(self.kapasite, dtype=np.float64)
+        self._satirlar: Dict[str, int] = {}  # cache anahtarı -> satır
+        self._dolu = 0
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vektor = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vektor))
+        return vektor / norm if norm > 0 else vektor
+
+    def ara(self, embedding, kategori: Optional[str]) -> Optional[str]:
+        """🔎 Eşik içindeki en yakın aynı kategorili sorunun cache anahtarı"""
+        vektor = self._normalize(embedding)
+        with self._lock:
+            if not self._dolu or self._matris is None or self._matris.shape[1] != vektor.shape[0]:
+                return None
+
+            benzerlikler = self._matris[:self._dolu] @ vektor
+            # Farklı kategorideki sorular eşleşmesin
+            for satir in np.argsort(-benzerlikler):
+                if 1.0 - float(benzerlikler[satir]) > self.max_mesafe:
+                    return None
+                if self._kategoriler[satir] == kategori:
+                    self._son_kullanim[satir] = time.time()
+                    return self._anahtarlar[satir]
+            return None
+
+    def ekle(self, embedding, kategori: Optional[str], cache_anahtari: str):
+        """➕ Cevaplanan soruyu indekse ekle"""
+        vektor = self._normalize(embedding)
+        with self._lock:
+            if self._matris is None or self._matris.shape[1] != vektor.shape[0]:
+                self._matris = np.zeros((self.kapasite, vektor.shape[0]), dtype=np.float32)
+                self._anahtarlar = [None] * self.kapasite
+                self._kategoriler = [None] * self.kapasite
+                self._satirlar = {}
+                self._dolu = 0
+
+            satir = self._satirlar.get(cache_anahtari)
+            if satir is None:
+                if self._dolu < self.kapasite:
+                    satir = self._dolu
+                    self._dolu += 1
+                else:
+                    satir = int(np.argmin(self._son_kullanim))
+                    self._satirlar.pop(self._anahtarlar[satir], None)
+
+            self._matris[satir] = vektor
+            self._anahtarlar[satir] = cache_anahtari
+            self._kategoriler[satir] = kategori
+            self._son_kullanim[satir] = time.time()
+            self._satirlar[cache_anahtari] = satir
+
+    def sil(self, cache_anahtari: str):
+        """➖ Sonucu artık cache'te olmayan soruyu indeksten çıkar"""
+        with self._lock:
+            satir = self._satirlar.pop(cache_anahtari, None)
+            if satir is None:
+                return
+            # Son satırı boşalan yere taşı - matris sıkı kalsın
+            son = self._dolu - 1
+            if satir != son:
+                self._matris[satir] = self._matris[son]
+                self._anahtarlar[satir] = self._anahtarlar[son]
+                self._kategoriler[satir] = self._kategoriler[son]
+                self._son_kullanim[satir] = self._son_kullanim[son]
+                self._satirlar[self._anahtarlar[satir]] = satir
+            self._anahtarlar[son] = None
+            self._kategoriler[son] = None
+            self._son_kullanim[son] = 0.0
+            self._dolu = son
+
+    def clear(self):
+        """🗑️ İndeksi boşalt"""
+        with self._lock:
+            self._anahtarlar = [None] * self.kapasite
+            self._kategoriler = [None] * self.kapasite
+            self._son_kullanim[:] = 0.0
+            self._satirlar = {}
+            self._dolu = 0
+
+    def get_stats(self) -> Dict:
+        """📊 İndeks boyutu ve eşik"""
+        return {
+            'size': self._dolu,
+            'max_size': self.kapasite,
+            'max_mesafe': self.max_mesafe
+        }
+
+def create_result_cache(config):
+    """🏭 Konfigürasyona göre sonuç önbelleği backend'i oluştur"""
+    model_config = config['model']
+    backend = model_config.get('cache_backend', 'memory')
+
+    if backend == 'sqlite':
+        return SQLiteResultCache(
+            config['data']['cache_db_file'],
+            model_config['cache_size'],
+            ttl=model_config.get('cache_ttl_seconds'),
+            max_bytes=model_config.get('cache_max_bytes')
+        )
+    if backend == 'memory':
+        return StripedCache(
+            model_config['cache_size'],
+            model_config.get('cache_shards', 16),
+            ttl=model_config.get('cache_ttl_seconds'),
+            max_bytes=model_config.get('cache_max_bytes')
+        )
+    raise ValueError(f"Bilinmeyen cache backend: {backend}")
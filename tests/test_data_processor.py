@@ -0,0 +1,95 @@
+# test_data_processor.py - Artımlı senkronizasyon: sayımlar ve güncelleme sırasında kayıt sürekliliği
+import json
+
+import pytest
+
+from data_processor import SigortaDataProcessor
+from tests.yardimcilar import KB_DOSYASI, SayanEncoder, yerel_config
+from vector_store import NumpyVectorStore, ShardedVectorStore
+
+
+class _BozukEncoder(SayanEncoder):
+    """💥 'BOZUK' içeren metinlerde encode hatası veren sahte encoder"""
+
+    def encode(self, metinler, **kwargs):
+        if any('BOZUK' in metin for metin in metinler):
+            raise RuntimeError("encode hatası")
+        return super().encode(metinler, **kwargs)
+
+
+def _json_yaz(yol, veriler):
+    with open(yol, 'w', encoding='utf-8') as f:
+        json.dump(veriler, f, ensure_ascii=False)
+    return str(yol)
+
+
+@pytest.fixture
+def kaynak():
+    with open(KB_DOSYASI, 'r', encoding='utf-8') as f:
+        return json.load(f)[:8]
+
+
+def _isleyici():
+    isleyici = SigortaDataProcessor(yerel_config())
+    isleyici.bildirim = lambda seviye, mesaj: None
+    return isleyici
+
+
+@pytest.mark.parametrize('depo_olustur', [
+    NumpyVectorStore,
+    lambda: ShardedVectorStore({ad: NumpyVectorStore() for ad in yerel_config()['categories']})
+], ids=['numpy', 'sharded'])
+def test_iki_senkronizasyon_sayimlari(tmp_path, kaynak, depo_olustur):
+    isleyici = _isleyici()
+    depo = depo_olustur()
+    encoder = SayanEncoder(64)
+    degisiklikler = []
+    isleyici.degisiklik_dinleyicisi_ekle(lambda kategoriler, idler, tumu: degisiklikler.append(idler))
+
+    rapor = isleyici.artimli_senkronize(_json_yaz(tmp_path / 'v1.json', kaynak), depo, encoder)
+    assert (rapor['eklenen'], rapor['guncellenen'], rapor['degismeyen'], rapor['silinen']) == (8, 0, 0, 0)
+    assert depo.count() == 8
+    assert encoder.encode_sayisi == 8
+
+    # Bir kayıt değişir, biri kategori değiştirir, biri kaldırılır, biri eklenir
+    ikinci = [dict(item) for item in kaynak[1:]]
+    ikinci[0]['icerik'] += ' Güncellenmiş madde.'
+    yeni_kategori = next(k for k in yerel_config()['categories'] if k != ikinci[1]['kategori'])
+    ikinci[1]['kategori'] = yeni_kategori
+    ikinci.append(dict(kaynak[0], id='yeni_kayit_001'))
+    encoder.encode_sayisi = 0
+
+    rapor = isleyici.artimli_senkronize(_json_yaz(tmp_path / 'v2.json', ikinci), depo, encoder)
+    assert (rapor['eklenen'], rapor['guncellenen'], rapor['degismeyen'], rapor['silinen']) == (1, 2, 5, 1)
+    assert not rapor['hatali_kayitlar']
+    assert encoder.encode_sayisi == 3  # Değişmeyenler yeniden embed edilmez
+    assert depo.count() == 8
+    assert depo.get(ids=[str(kaynak[0]['id'])], include=[])['ids'] == []
+    guncel = depo.get(ids=[str(ikinci[0]['id'])], include=['documents'])
+    assert guncel['documents'] == [ikinci[0]['icerik']]
+    tasinan = depo.get(ids=[str(ikinci[1]['id'])], include=['metadatas'])
+    assert [m['kategori'] for m in tasinan['metadatas']] == [yeni_kategori]
+    assert degisiklikler[-1] == {str(kaynak[0]['id']), str(kaynak[1]['id']), str(kaynak[2]['id']), 'yeni_kayit_001'}
+
+    # Üçüncü senkronizasyon: her şey aynı
+    rapor = isleyici.artimli_senkronize(_json_yaz(tmp_path / 'v2.json', ikinci), depo, encoder)
+    assert (rapor['eklenen'], rapor['guncellenen'], rapor['degismeyen'], rapor['silinen']) == (0, 0, 8, 0)
+
+
+def test_encode_hatasinda_eski_surum_kalir(tmp_path, kaynak):
+    isleyici = _isleyici()
+    depo = NumpyVectorStore()
+    encoder = _BozukEncoder(64)
+    isleyici.artimli_senkronize(_json_yaz(tmp_path / 'v1.json', kaynak), depo, encoder)
+
+    ikinci = [dict(item) for item in kaynak]
+    ikinci[0]['icerik'] += ' BOZUK'
+    ikinci[1]['icerik'] += ' Güncellenmiş madde.'
+    rapor = isleyici.artimli_senkronize(_json_yaz(tmp_path / 'v2.json', ikinci), depo, encoder)
+
+    assert rapor['guncellenen'] == 1
+    assert [kayit['id'] for kayit in rapor['hatali_kayitlar']] == [str(kaynak[0]['id'])]
+    assert depo.count() == 8
+    # Yeni sürümü yazılamayan kayıt eski sürümüyle sunulmaya devam eder
+    eski = depo.get(ids=[str(kaynak[0]['id'])], include=['documents'])
+    assert eski['documents'] == [kaynak[0]['icerik']]
@@ -0,0 +1,66 @@
+# test_keyword_bonus.py - Yükleme anı bit maskesi bonusu ile metin taraması bonusu eşdeğerliği
+import numpy as np
+import pytest
+
+from config import SAMPLE_QUESTIONS
+from keyword_matcher import IMZA_VERSIYON_ALANI
+from query_engine import SigortaQueryEngine
+from tests.yardimcilar import kb_kayitlari, metin_taramasi_bonusu, yerel_config
+
+
+@pytest.fixture(scope='module')
+def ortam():
+    config = yerel_config()
+    motor = SigortaQueryEngine(None, None, config)
+    kayitlar = kb_kayitlari(config)
+    # Örnek sorular + her kategorinin bonus anahtar kelimelerinden üretilmiş sorular
+    sorular = list(SAMPLE_QUESTIONS)
+    for kategori_config in config['categories'].values():
+        keywords = kategori_config['keywords'][:10]
+        sorular += [' '.join(keywords[i:i + 3]) for i in range(0, len(keywords), 2)]
+    return config, motor, kayitlar, sorular
+
+
+def _bonuslar(motor, kayitlar, metadatas, soru):
+    temiz = motor._soru_temizle(soru)
+    eslesmeler = motor.keyword_matcher.eslesmeler(temiz)
+    kategori = motor.keyword_matcher.kategori_tespit_et(eslesmeler)
+    soru_maskesi = motor.keyword_matcher.soru_maskesi(eslesmeler, kategori) if kategori else 0
+    if not soru_maskesi:
+        return temiz, kategori, [0] * len(kayitlar)
+    return temiz, kategori, motor._keyword_bonuslari(
+        np.arange(len(kayitlar)), [k['icerik'] for k in kayitlar], metadatas,
+        temiz, kategori, eslesmeler, soru_maskesi
+    ).tolist()
+
+
+def test_bit_maskesi_bonusu_metin_taramasiyla_ayni(ortam):
+    config, motor, kayitlar, sorular = ortam
+    bonuslu = 0
+    for soru in sorular:
+        temiz, kategori, yeni = _bonuslar(motor, kayitlar, [k['metadata'] for k in kayitlar], soru)
+        eski = [
+            metin_taramasi_bonusu(temiz, k['icerik'], kategori, config['categories'],
+                                   config['search']['keyword_bonus_max'])
+            for k in kayitlar
+        ]
+        assert yeni == eski, soru
+        bonuslu += sum(1 for bonus in yeni if bonus)
+    assert bonuslu > 0  # Karşılaştırma sıfır bonuslarla geçmiş olmasın
+
+
+def test_eski_imza_metin_taramasina_duser(ortam):
+    config, motor, kayitlar, sorular = ortam
+    eski_metadatas = []
+    for kayit in kayitlar:
+        metadata = dict(kayit['metadata'])
+        metadata[IMZA_VERSIYON_ALANI] = 'eski_imza'
+        eski_metadatas.append(metadata)
+        for kategori in config['categories']:
+            assert motor.keyword_matcher.dokuman_maskesi(metadata, kategori) is None
+    assert motor.keyword_matcher.dokuman_maskesi({}, 'kasko') is None
+
+    for soru in sorular:
+        _, _, guncel = _bonuslar(motor, kayitlar, [k['metadata'] for k in kayitlar], soru)
+        _, _, eski_imzali = _bonuslar(motor, kayitlar, eski_metadatas, soru)
+        assert eski_imzali == guncel, soru
@@ -0,0 +1,61 @@
+# test_keyword_matcher.py - Aho-Corasick otomatı ile desen başına doğrusal taramanın eşdeğerliği
+import random
+
+import pytest
+
+from config import SAMPLE_QUESTIONS
+from keyword_matcher import AhoCorasick, SigortaKeywordMatcher
+from tests.yardimcilar import dogrusal_kategori_tespiti, kb_kayitlari, yerel_config
+from text_normalizer import soru_normalize
+
+# Biri diğerinin öneki/soneki/içi olan desenler - hata bağlantılarının zorlandığı durumlar
+ORTUSEN_DESENLER = ['he', 'she', 'his', 'hers', 'hasar', 'hasarsız', 'hasarsızlık', 'sız', 'sızlık',
+                    'kas', 'kasko', 'asko', 'ko', 'sigorta', 'sigortası', 'orta', 'a', 'aaa', 'aa']
+
+
+def _metinler():
+    kayitlar = kb_kayitlari(yerel_config())
+    return ([soru_normalize(soru) for soru in SAMPLE_QUESTIONS]
+            + [soru_normalize(kayit['icerik']) for kayit in kayitlar])
+
+
+def test_otomat_tum_alt_dizi_eslesmelerini_bulur():
+    otomat = AhoCorasick(ORTUSEN_DESENLER)
+    rastgele = random.Random(3)
+    metinler = _metinler() + ['ushers', 'aaaa', 'hasarsızlıksızlık kaskosigortası']
+    # Desen parçalarından rastgele yapıştırılmış metinler
+    metinler += [''.join(rastgele.choices(ORTUSEN_DESENLER, k=8)) for _ in range(200)]
+    for metin in metinler:
+        beklenen = {i for i, desen in enumerate(otomat.desenler) if desen in metin}
+        assert otomat.bul(metin) == beklenen, metin
+
+
+def _ortusen_kategoriler(config):
+    """Konfigürasyon kategorilerine birbirini içeren ve başka kategorilerle ortak anahtar kelimeler"""
+    kategoriler = {ad: dict(kategori) for ad, kategori in config['categories'].items()}
+    adlar = list(kategoriler)
+    for i, ad in enumerate(adlar):
+        ekler = ['hasar', 'hasarsız', 'sigorta', 'sigortası', adlar[(i + 1) % len(adlar)][:3]]
+        kategoriler[ad]['keywords'] = list(kategoriler[ad].get('keywords', [])) + ekler
+        kategoriler[ad]['negative_keywords'] = list(kategoriler[ad].get('negative_keywords', [])) + ['orta']
+    return kategoriler
+
+
+@pytest.mark.parametrize('ortusen', [False, True], ids=['config', 'ortusen_keywordler'])
+def test_kategori_tespiti_dogrusal_taramayla_ayni(ortusen):
+    config = yerel_config()
+    kategoriler = _ortusen_kategoriler(config) if ortusen else config['categories']
+    eslestirici = SigortaKeywordMatcher(kategoriler, config['exact_matches'])
+
+    metinler = _metinler()
+    # Her kategorinin anahtar kelimelerinden üretilmiş, birden çok kategoriye değen sorular
+    for kategori in kategoriler.values():
+        keywords = [soru_normalize(k) for k in kategori['keywords']]
+        metinler += [' '.join(keywords[i:i + 3]) for i in range(0, len(keywords), 2)]
+
+    tespit_edilen = 0
+    for metin in metinler:
+        beklenen = dogrusal_kategori_tespiti(metin, kategoriler, config['exact_matches'])
+        assert eslestirici.kategori_tespit_et(eslestirici.eslesmeler(metin)) == beklenen, metin
+        tespit_edilen += beklenen is not None
+    assert tespit_edilen > 0
@@ -0,0 +1,84 @@
+# test_model_core.py - Toplu ve async soru_yanit yollarının tekil yolla eşdeğerliği
+import asyncio
+
+from config import SAMPLE_QUESTIONS
+from tests.yardimcilar import (
+    BellekKoleksiyonu, KelimeEncoder, SayanEncoder, hazir_core, kb_kayitlari, suresi_dolmus_butce, yerel_config
+)
+
+
+def test_toplu_soru_yanit_tekli_donguyle_ayni():
+    config = yerel_config()
+    config['search']['similarity_threshold'] = 0.0
+    kayitlar = kb_kayitlari(config, belge_sayisi=100)
+    # Geçmiş müşteri soruları: örnek soruların numaralı varyantları, bir kısmı tekrar
+    sorular = [f"{SAMPLE_QUESTIONS[i % 30 % len(SAMPLE_QUESTIONS)]} {i % 30}" for i in range(60)]
+
+    cekirdekler = {}
+    for mod in ('tek', 'toplu'):
+        cekirdekler[mod] = hazir_core(config, SayanEncoder(64), BellekKoleksiyonu.kayitlardan(kayitlar, SayanEncoder(64)))
+    tek = [cekirdekler['tek'].soru_yanit(soru) for soru in sorular]
+    toplu = [cikti['sonuclar'] for cikti in cekirdekler['toplu'].soru_yanit_toplu(sorular)]
+
+    assert any(toplu)
+    assert toplu == tek
+    tek_motor, toplu_motor = cekirdekler['tek'].query_engine, cekirdekler['toplu'].query_engine
+    assert toplu_motor.embedding_model.encode_cagrisi < tek_motor.embedding_model.encode_cagrisi
+    assert toplu_motor.collection.sorgu_cagrisi < tek_motor.collection.sorgu_cagrisi
+
+
+def _async_core():
+    config = yerel_config()
+    config['search']['similarity_threshold'] = 0.0
+    # Kuyrukta bekleme bütçeyi tüketip yanıtları bozabilir - eşitlik karşılaştırması bütçesiz
+    config['search']['deadline_aware'] = False
+    kayitlar = kb_kayitlari(config)
+    return hazir_core(config, KelimeEncoder(gecikme=0.005), BellekKoleksiyonu.kayitlardan(kayitlar, KelimeEncoder()))
+
+
+def test_async_soru_yanit_senkronla_ayni():
+    sorular = [f"{SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)]} {i}" for i in range(30)]
+    senkron = [_async_core().soru_yanit(soru) for soru in sorular]
+
+    async def eszamanli(core):
+        ciktilar = await asyncio.gather(*(core.soru_yanit_async(soru) for soru in sorular))
+        return [cikti['sonuclar'] for cikti in ciktilar]
+
+    async def iki_tur():
+        core = _async_core()
+        ilk = await eszamanli(core)
+        # İkinci tur tamamen cache hit - executor'a gidilmez, encode yapılmaz
+        encode_oncesi = core.query_engine.embedding_model.encode_cagrisi
+        ikinci = await eszamanli(core)
+        core.query_engine.executorlari_kapat()
+        return ilk, ikinci, core.query_engine.embedding_model.encode_cagrisi - encode_oncesi
+
+    ilk, ikinci, cache_turu_encode = asyncio.run(iki_tur())
+    assert any(senkron)
+    assert ilk == senkron
+    assert ikinci == senkron
+    assert cache_turu_encode == 0
+
+
+def test_cache_isitma_bozulmus_yaniti_cachelemez():
+    config = yerel_config()
+    config['search']['similarity_threshold'] = 0.0
+    config['search']['deadline_aware'] = True
+    core = hazir_core(config, KelimeEncoder(), BellekKoleksiyonu.kayitlardan(kb_kayitlari(config), KelimeEncoder()))
+    motor = core.query_engine
+    butce_olustur = motor.zaman_butcesi_olustur
+
+    motor.zaman_butcesi_olustur = suresi_dolmus_butce
+    rapor = core.cache_isit(list(SAMPLE_QUESTIONS))
+    assert rapor['bozulmus'] == len(SAMPLE_QUESTIONS)
+    assert rapor['isitilan'] == 0
+    assert len(core.cache) == 0
+    assert motor.get_butce_stats()['bozulmus_yanit'] == len(SAMPLE_QUESTIONS)
+
+    # Yeterli bütçeyle aynı sorular tam yanıtla ısıtılır
+    motor.zaman_butcesi_olustur = butce_olustur
+    config['accuracy']['target_metrics']['response_time_goal'] = 60.0
+    rapor = core.cache_isit(list(SAMPLE_QUESTIONS))
+    assert rapor['bozulmus'] == 0
+    assert rapor['isitilan'] == len(SAMPLE_QUESTIONS)
+    assert not any(sonuc.get('bozulmus') for sonuc in core.soru_yanit(SAMPLE_QUESTIONS[0]))
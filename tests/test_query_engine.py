@@ -0,0 +1,207 @@
+# test_query_engine.py - Sorgu motoru optimizasyonlarının eski yolla eşdeğerliği
+import random
+
+import numpy as np
+import pytest
+
+from config import SAMPLE_QUESTIONS
+from query_engine import SigortaQueryEngine
+from tests.yardimcilar import (
+    BellekKoleksiyonu, KelimeEncoder, SayanEncoder, eski_sonuc_isleme, eski_soru_genisletme, hazir_core,
+    kb_kayitlari, suresi_dolmus_butce, yerel_config
+)
+from vector_store import NumpyVectorStore
+from zaman_butcesi import ISTEGE_BAGLI_ASAMALAR, ZamanButcesi
+
+
+def _en_iyi_id(adaylar):
+    return max(adaylar, key=lambda x: x.get('skor', 0))['metadata']['id'] if adaylar else None
+
+
+@pytest.mark.parametrize('final_sayisi', [1, 5])
+@pytest.mark.parametrize('aday_sayisi', [25, 200])
+def test_vektorel_skorlama_eski_donguyle_ayni(aday_sayisi, final_sayisi):
+    config = yerel_config()
+    config['search']['final_results'] = final_sayisi
+    motor = SigortaQueryEngine(None, None, config)
+    kayitlar = kb_kayitlari(config)
+    # Kısa içerik min_content_length filtresini de çalıştırsın
+    kayitlar.append({'icerik': 'Kasko deprem.', 'metadata': {'kategori': 'kasko'}})
+
+    rastgele = random.Random(aday_sayisi * 10 + final_sayisi)
+    secimler = [rastgele.choice(kayitlar) for _ in range(aday_sayisi)]
+    # İki basamağa yuvarlanmış mesafeler: eşit skorlar ve eşiğin altında kalan adaylar
+    mesafeler = sorted(round(rastgele.uniform(0.05, 0.6), 2) for _ in secimler)
+    # Aynı belge aynı mesafeyle iki kez - birebir eşit skor, sıra rank'e göre kalmalı
+    secimler.insert(1, secimler[0])
+    mesafeler.insert(1, mesafeler[0])
+    arama_sonuclari = {
+        'documents': [[k['icerik'] for k in secimler]],
+        'metadatas': [[k['metadata'] for k in secimler]],
+        'distances': [mesafeler]
+    }
+    esik = config['search']['similarity_threshold']
+    assert any(1.0 - mesafe < esik for mesafe in mesafeler)
+
+    esit_skorlu = 0
+    for soru in SAMPLE_QUESTIONS:
+        temiz = motor._soru_temizle(soru)
+        kategori = motor._kategori_tespit_et(temiz)
+        eski = eski_sonuc_isleme(motor, arama_sonuclari, temiz, kategori)
+        assert motor._sonuclari_isle(arama_sonuclari, temiz, kategori) == eski, soru
+        assert all(sonuc['similarity_score'] >= esik for sonuc in eski)
+        skorlar = [sonuc['skor'] for sonuc in eski]
+        esit_skorlu += len(skorlar) - len(set(skorlar))
+    if final_sayisi > 1:
+        assert esit_skorlu > 0  # Eşitlik sıralaması gerçekten sınandı
+
+
+def test_iki_asamali_arama_tek_asamaliyla_ayni():
+    config = yerel_config()
+    config['search']['similarity_threshold'] = 0.0  # Rastgele vektörlerle de aday kalsın
+    kayitlar = kb_kayitlari(config, belge_sayisi=100, belge_uzunlugu=1000)
+    encoder = SayanEncoder(64)
+    koleksiyon = BellekKoleksiyonu.kayitlardan(kayitlar, encoder)
+    motor = SigortaQueryEngine(encoder, koleksiyon, config)
+
+    ciktilar, karakterler = {}, {}
+    for iki_asamali in (False, True):
+        config['search']['two_phase_retrieval'] = iki_asamali
+        koleksiyon.tasinan_karakter = 0
+        ciktilar[iki_asamali] = [motor.arama_yap(soru, hata_firlat=True) for soru in SAMPLE_QUESTIONS]
+        karakterler[iki_asamali] = koleksiyon.tasinan_karakter
+
+    assert any(ciktilar[True])
+    assert ciktilar[True] == ciktilar[False]
+    assert karakterler[True] < karakterler[False]
+
+
+def test_kategori_filtresi_isabetleri_kategori_icinde():
+    config = yerel_config()
+    config['search']['similarity_threshold'] = 0.0
+    config['search']['category_filter'] = True
+    encoder = SayanEncoder(64)
+    motor = SigortaQueryEngine(encoder, BellekKoleksiyonu.kayitlardan(kb_kayitlari(config, belge_sayisi=300), encoder),
+                               config)
+
+    isabet = 0
+    for soru in SAMPLE_QUESTIONS:
+        sorgu = motor.sorgu_hazirla(soru)
+        kategori = motor._filtre_kategorisi(sorgu)
+        onceki_hit = motor.arama_sayaclari.topla()['kategori_filtre_hit']
+        sonuclar = motor.arama_yap(soru, hata_firlat=True, hazir_sorgu=sorgu)
+        # Global aramaya dönüşte kategori dışı sonuç beklenir; sadece filtre isabetleri kontrol edilir
+        if motor.arama_sayaclari.topla()['kategori_filtre_hit'] > onceki_hit:
+            isabet += 1
+            assert sonuclar, soru
+            assert all(sonuc['kategori'] == kategori for sonuc in sonuclar), soru
+    assert isabet > 0
+
+
+def test_uyarlanir_k_sabit_k_ile_ayni():
+    config = yerel_config()
+    kayitlar = kb_kayitlari(config, belge_sayisi=2000)
+    # Kopyalar küçük gürültüyle ayrışır - büyük indekste yakın komşu yoğunluğu
+    vektorler = KelimeEncoder().encode([k['icerik'] for k in kayitlar])
+    vektorler /= np.linalg.norm(vektorler, axis=1, keepdims=True)
+    vektorler += np.random.default_rng(7).standard_normal(vektorler.shape).astype(np.float32) * 0.05
+    depo = NumpyVectorStore()
+    depo.add([k['id'] for k in kayitlar], vektorler, [k['icerik'] for k in kayitlar],
+             [k['metadata'] for k in kayitlar])
+
+    ciktilar = {}
+    for uyarlanir in (False, True):
+        config = yerel_config()
+        config['search']['adaptive_k'] = uyarlanir
+        config['search']['similarity_threshold'] = 0.3
+        motor = SigortaQueryEngine(KelimeEncoder(), depo, config)
+        ciktilar[uyarlanir] = [
+            [(sonuc['metadata']['id'], round(sonuc['skor'], 6)) for sonuc in motor.arama_yap(soru)]
+            for soru in SAMPLE_QUESTIONS
+        ]
+    assert motor.get_uyarlanir_k_stats()['aktif']
+    assert any(ciktilar[False])
+    assert ciktilar[True] == ciktilar[False]
+
+
+class _GarantisizDepo:
+    """🗄️ k öneki garantisi vermeyen depo (ör. search_ef'siz Chroma collection'ı)"""
+
+    def kararli_k_siniri(self):
+        return 10
+
+
+def test_uyarlanir_k_garantisiz_depoda_kapali():
+    config = yerel_config()
+    config['search']['adaptive_k'] = True
+    assert not SigortaQueryEngine(None, _GarantisizDepo(), config).get_uyarlanir_k_stats()['aktif']
+    assert not SigortaQueryEngine(None, object(), config).get_uyarlanir_k_stats()['aktif']
+
+
+def _genisletme_core(tek_gecis: bool):
+    config = yerel_config()
+    config['search']['similarity_threshold'] = 0.0
+    config['search']['multi_search'] = config['search']['question_expansion'] = tek_gecis
+    kayitlar = kb_kayitlari(config)
+    return hazir_core(config, KelimeEncoder(), BellekKoleksiyonu.kayitlardan(kayitlar, KelimeEncoder()))
+
+
+def test_tek_gecisli_genisletme_soru_basina_yolla_ayni():
+    genisletme_config = yerel_config()
+    genisletme_config['search']['multi_search'] = genisletme_config['search']['question_expansion'] = True
+    varyant_motoru = SigortaQueryEngine(None, None, genisletme_config)
+    tek_gecis = _genisletme_core(True)
+    soru_basina = _genisletme_core(False)
+
+    for soru in SAMPLE_QUESTIONS:
+        adaylar = soru_basina.soru_yanit(soru)[:1]
+        for varyant in varyant_motoru._soru_varyantlari(varyant_motoru._soru_temizle(soru)):
+            adaylar += soru_basina.soru_yanit(varyant)[:1]
+        assert _en_iyi_id(tek_gecis.soru_yanit(soru)[:1]) == _en_iyi_id(adaylar), soru
+
+
+def test_eski_genisletmeyle_farklar_sadece_kategori_kaymasindan():
+    # Tek geçiş orijinal sorunun kategorisinde kalır, eski ikinci sorgu başka kategoriye kayabilir
+    tek_gecis = _genisletme_core(True)
+    eski = _genisletme_core(False)
+    kategoriler = {k['id']: k['metadata']['kategori'] for k in kb_kayitlari(yerel_config())}
+
+    for soru in SAMPLE_QUESTIONS:
+        adaylar = eski.soru_yanit(soru)[:1]
+        genisletilmis = eski_soru_genisletme(soru)
+        if genisletilmis != soru:
+            adaylar += eski.soru_yanit(genisletilmis)[:1]
+        eski_id = _en_iyi_id(adaylar)
+        tek_id = _en_iyi_id(tek_gecis.soru_yanit(soru)[:1])
+        if eski_id != tek_id:
+            soru_kategorisi = tek_gecis.query_engine.soru_kategorisi(soru)
+            assert kategoriler[tek_id] == soru_kategorisi, soru
+            assert kategoriler[eski_id] != soru_kategorisi, soru
+
+
+def test_suresi_dolmus_butce_istege_bagli_asamalari_atlar():
+    config = yerel_config()
+    config['search']['similarity_threshold'] = 0.0
+    config['search']['multi_search'] = config['search']['question_expansion'] = True
+    config['search']['category_filter'] = True
+    motor = SigortaQueryEngine(KelimeEncoder(), BellekKoleksiyonu.kayitlardan(kb_kayitlari(config), KelimeEncoder()),
+                               config)
+    soru = "Araç sel hasarı nasıl bildirilir?"  # Varyantlı, güçlü kategori sinyalli, bonuslu
+
+    tam = motor.arama_yap(soru, hata_firlat=True, butce=ZamanButcesi(60.0))
+    assert tam and not any(sonuc.get('bozulmus') for sonuc in tam)
+
+    butce = suresi_dolmus_butce()
+    sonuclar = motor.arama_yap(soru, hata_firlat=True, butce=butce)
+    assert butce.atlanan == list(ISTEGE_BAGLI_ASAMALAR)
+    assert butce.bozulmus
+    assert butce.asan_asama == 'sorgu_hazirlama'
+    assert sonuclar
+    assert all(sonuc['bozulmus'] and sonuc['atlanan_asamalar'] == butce.atlanan for sonuc in sonuclar)
+
+    stats = motor.get_butce_stats()
+    assert stats['butceli_sorgu'] == 2
+    assert stats['bozulmus_yanit'] == 1
+    assert stats['atlanan'] == {asama: 1 for asama in ISTEGE_BAGLI_ASAMALAR}
+    assert stats['asim']['sorgu_hazirlama'] == 1
+    assert sum(stats['asim'].values()) == 1
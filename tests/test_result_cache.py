@@ -0,0 +1,218 @@
+# test_result_cache.py - Sonuç önbelleği ve paylaşılan core eşzamanlılık testleri
+import threading
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from result_cache import SemanticQueryCache, StripedCache
+
+
+class _SabitSorguMotoru:
+    """Sabit cevap veren hafif sorgu motoru - sadece core eşzamanlılığını test etmek için"""
+
+    def soru_kategorisi(self, soru: str) -> str:
+        return 'genel'
+
+    def get_embedding_lru_stats(self) -> Dict:
+        return {}
+
+    def zaman_butcesi_olustur(self, saniye: Optional[float] = None):
+        return None
+
+    def sorgu_hazirla(self, soru: str, butce=None) -> Dict:
+        # Soruya özgü sabit rastgele vektör - farklı sorular birbirine benzemez
+        rastgele = np.random.default_rng(zlib.crc32(soru.encode('utf-8')))
+        return {'temiz_soru': soru, 'kategori': 'genel', 'embedding': rastgele.standard_normal(64).astype(np.float32)}
+
+    def arama_yap(self, soru: str, hata_firlat: bool = False,
+                  hazir_sorgu: Optional[Dict] = None, butce=None) -> List[Dict]:
+        if 'bulunamaz' in soru:
+            return []
+        return [{'icerik': f"Cevap: {soru}", 'kategori': 'genel', 'skor': 0.9, 'metadata': {'kaynak': 'Test'}}]
+
+
+def _test_core():
+    from model_core import SigortaModelCore
+    core = SigortaModelCore()
+    core.query_engine = _SabitSorguMotoru()
+    core.is_ready = True
+    return core
+
+
+def _dongusel_oynat(cache: StripedCache, anahtar_sayisi: int, tur: int = 20) -> int:
+    """Çalışma kümesini döngüsel oynat (miss'te put) - hit sayısını döndür"""
+    hit = 0
+    for _ in range(tur):
+        for i in range(anahtar_sayisi):
+            anahtar = f"soru_{i}"
+            if cache.get(anahtar) is not None:
+                hit += 1
+            else:
+                cache.put(anahtar, [{'icerik': anahtar}])
+    return hit
+
+
+def _cache_bayti(deger) -> int:
+    return StripedCache(1)._bayt_olc(deger)
+
+
+def test_max_size_altindaki_calisma_kumesi_tamamen_kalir():
+    # Varsayılanlar: sonuç cache'i 100 / negatif cache 200 kayıt, 16 parça
+    for max_size, anahtar_sayisi in ((100, 80), (100, 95), (100, 100), (200, 190)):
+        cache = StripedCache(max_size, shard_sayisi=16)
+        hit = _dongusel_oynat(cache, anahtar_sayisi)
+        stats = cache.get_stats()
+        assert hit == anahtar_sayisi * 19  # İlk tur dışında hepsi hit
+        assert stats['size'] == anahtar_sayisi
+        assert stats['lru_tahliye'] == 0
+
+
+def test_global_lru_en_eski_kaydi_cikarir():
+    cache = StripedCache(3, shard_sayisi=16)
+    for anahtar in ('a', 'b', 'c'):
+        cache.put(anahtar, anahtar)
+    assert cache.get('a') == 'a'  # 'a' en yeni olur
+    cache.put('d', 'd')
+    assert cache.get('b') is None
+    assert [cache.get(anahtar) for anahtar in ('a', 'c', 'd')] == ['a', 'c', 'd']
+    assert len(cache) == 3
+    assert cache.get_stats()['lru_tahliye'] == 1
+
+
+def test_bayt_butcesi_cache_geneline_uygulanir():
+    deger = 'x' * 1000
+    cache = StripedCache(100, shard_sayisi=16, max_bytes=_cache_bayti(deger) * 5)
+    for i in range(10):
+        cache.put(f"k{i}", deger)
+    stats = cache.get_stats()
+    assert stats['size'] == 5
+    assert stats['bytes'] <= stats['max_bytes']
+    assert stats['boyut_tahliye'] == 5
+    assert all(cache.get(f"k{i}") == deger for i in range(5, 10))
+
+    cache.put('buyuk', 'x' * 10000)
+    assert cache.get('buyuk') is None
+    assert cache.get_stats()['reddedilen'] == 1
+
+
+def test_etiketle_gecersiz_kilma_ve_temizleme_toplamlari_gunceller():
+    cache = StripedCache(10)
+    cache.put('a', 1, etiketler={'kat:kasko'})
+    cache.put('b', 2, etiketler={'kat:trafik'})
+    assert cache.etiketle_gecersiz_kil({'kat:kasko'}) == 1
+    assert cache.get('a') is None and cache.get('b') == 2
+    cache.clear()
+    stats = cache.get_stats()
+    assert stats['size'] == 0 and stats['bytes'] == 0
+
+
+def test_tekrar_eden_soru_cache_hit_olur():
+    core = _test_core()
+    assert core.soru_yanit("kasko deprem hasarı") == core.soru_yanit("kasko deprem hasarı")
+    assert core.soru_yanit("bulunamaz soru") == [] and core.soru_yanit("bulunamaz soru") == []
+    stats = core.stats
+    assert stats['sorgu_sayisi'] == 4
+    assert stats['cache_hit'] == 1
+    assert stats['negatif_cache_hit'] == 1
+    assert stats['basari_sayisi'] == 1
+
+
+def test_paylasilan_core_stres_sayaclari_tutarli():
+    """Paylaşılan core'a çok thread'den soru_yanit - sayaçlar kaybolmaz, cache sınırı aşılmaz"""
+    thread_sayisi, tekrar = 8, 100
+    core = _test_core()
+    # Cache'ten büyük soru havuzu: hit, tahliye ve cevapsız soru yollarını birlikte zorlar
+    sorular = [f"bulunamaz soru {i}" for i in range(10)]
+    sorular += [f"kasko soru {i}" for i in range(core.cache_max_size * 2)]
+    hatalar = []
+
+    def calistir(thread_no: int):
+        try:
+            for i in range(tekrar):
+                soru = sorular[(thread_no * 7 + i) % len(sorular)]
+                core.soru_yanit(soru)
+                core.soru_yanit(soru)  # Hemen tekrar - cache / negatif cache hit yolu
+                if i % 25 == 0:
+                    core.get_sistem_stats()
+        except Exception as e:
+            hatalar.append(repr(e))
+
+    threadler = [threading.Thread(target=calistir, args=(n,)) for n in range(thread_sayisi)]
+    for t in threadler:
+        t.start()
+    for t in threadler:
+        t.join()
+
+    stats = core.stats
+    beklenen = thread_sayisi * tekrar * 2
+    assert hatalar == []
+    assert stats['sorgu_sayisi'] == beklenen
+    assert (
+        stats['cache_hit'] + stats['semantik_cache_hit'] + stats['basari_sayisi'] + stats['hata_sayisi']
+    ) == beklenen
+    assert stats['cache_hit'] > 0
+    assert stats['negatif_cache_hit'] > 0
+    assert stats['cache_hit'] + stats['negatif_cache_hit'] >= beklenen // 4
+    assert len(core.cache) <= core.cache_max_size
+
+
+def test_semantik_hit_tam_eslesme_kaydi_versiyon_ve_soru_kategorisiyle():
+    core = _test_core()
+    core.semantik_cache = SemanticQueryCache(500, 0.08)  # Varsayılan kapalı
+    core.query_engine.soru_kategorisi = lambda soru: 'kasko' if 'kasko' in soru else None
+    cevap = core.soru_yanit("ilk soru")
+    hazir_sorgu = core.query_engine.sorgu_hazirla("ilk soru")
+
+    # Arama sırasında indeks değişti - benzer sorunun kaydı yazılmaz
+    eski_versiyon = core.index_versiyonu
+    core.index_versiyonu += 1
+    anahtar = core._cache_key_olustur("kasko paraphrase")
+    assert core._semantik_cache_kontrol(anahtar, hazir_sorgu, "kasko paraphrase", eski_versiyon) == cevap
+    assert core.cache.get(anahtar) is None
+
+    # Güncel versiyonda kayıt sorunun kategorisiyle etiketlenir
+    assert core._semantik_cache_kontrol(anahtar, hazir_sorgu, "kasko paraphrase", core.index_versiyonu) == cevap
+    assert core.cache.get(anahtar) == cevap
+    core.cache.etiketle_gecersiz_kil({'kat:kasko'})
+    assert core.cache.get(anahtar) is None
+
+
+def test_arama_sirasinda_indeks_degisirse_cache_yazilmaz():
+    core = _test_core()
+    arama_yap = core.query_engine.arama_yap
+
+    def degistiren_arama(soru, *args, **kwargs):
+        sonuclar = arama_yap(soru, *args, **kwargs)
+        core._indeks_degisti({'genel'}, set())  # Arama bitti, yazmadan önce veri değişti
+        return sonuclar
+
+    core.query_engine.arama_yap = degistiren_arama
+    assert core.soru_yanit("eski indeks sorusu")
+    assert core.soru_yanit("bulunamaz eski indeks") == []
+    assert core.cache_isit(["isitma sorusu 1", "isitma sorusu 2"])['isitilan'] == 0
+    assert len(core.cache) == 0
+    assert core.negatif_cache.get(core._cache_key_olustur("bulunamaz eski indeks")) is None
+
+
+def test_yazma_ile_eszamanli_indeks_degisikligi_kaydi_birakmaz():
+    core = _test_core()
+    put = core.cache.put
+    degisiklik = []
+
+    def yarisan_put(*args, **kwargs):
+        # Versiyon kontrolünden sonra, yazmadan önce başka thread indeksi değiştirir
+        thread = threading.Thread(target=core._indeks_degisti, args=({'genel'}, set()))
+        thread.start()
+        thread.join(timeout=0.2)  # Kilit tutuluyorsa değişiklik yazmayı bekler
+        degisiklik.append(thread)
+        put(*args, **kwargs)
+
+    core.cache.put = yarisan_put
+    anahtar = core._cache_key_olustur("yarisan soru")
+    assert core.soru_yanit("yarisan soru")
+    for thread in degisiklik:
+        thread.join()
+    assert core.index_versiyonu == 1
+    # Kayıt eski indeksten - değişiklik onu geçersiz kılmış olmalı
+    assert core.cache.get(anahtar) is None
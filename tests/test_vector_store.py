@@ -0,0 +1,238 @@
+# test_vector_store.py - NumPy deposu kalıcılığı, kategori shard'ları ve k öneki garantisi
+import copy
+import os
+
+import numpy as np
+import pytest
+
+from config import CATEGORIES, get_config
+from vector_store import ChromaVectorStore, NumpyVectorStore, ShardedVectorStore, _chroma_collection_ac
+
+
+class _SayanDepo(NumpyVectorStore):
+    """🔢 Sorgu ve count çağrılarını sayan NumPy deposu"""
+
+    def __init__(self):
+        super().__init__()
+        self.sorgu_cagrisi = 0
+        self.count_cagrisi = 0
+
+    def query(self, *args, **kwargs):
+        self.sorgu_cagrisi += 1
+        return super().query(*args, **kwargs)
+
+    def count(self):
+        self.count_cagrisi += 1
+        return super().count()
+
+
+def _kalici_depo(dizin) -> NumpyVectorStore:
+    return NumpyVectorStore(str(dizin), 'cosine', 'test_model')
+
+
+def _doldur(depo: NumpyVectorStore, adet: int, boyut: int = 16, tohum: int = 1) -> np.ndarray:
+    vektorler = np.random.default_rng(tohum).standard_normal((adet, boyut)).astype(np.float32)
+    depo.add([f"belge_{i}" for i in range(adet)], vektorler, [f"metin {i}" for i in range(adet)],
+             [{'kategori': 'kasko' if i % 2 else 'trafik', 'no': i} for i in range(adet)])
+    return vektorler
+
+
+def _en_yakinlar(depo: NumpyVectorStore, sorgular: np.ndarray, where=None):
+    return depo.query(sorgular, n_results=5, include=['distances'], where=where)['ids']
+
+
+def test_kalici_depo_yeniden_acilinca_ayni(tmp_path):
+    depo = _kalici_depo(tmp_path)
+    vektorler = _doldur(depo, 50)
+    depo.delete(ids=['belge_3', 'belge_4'])
+    sorgular = vektorler[:10] + 0.01
+    beklenen = _en_yakinlar(depo, sorgular)
+
+    yeniden = _kalici_depo(tmp_path)
+    assert yeniden.count() == 48
+    assert _en_yakinlar(yeniden, sorgular) == beklenen
+    assert yeniden.get(ids=['belge_3', 'belge_5'])['ids'] == ['belge_5']
+    assert yeniden.get(ids=['belge_5'])['documents'] == ['metin 5']
+    assert _en_yakinlar(yeniden, sorgular, {'kategori': 'kasko'}) == _en_yakinlar(depo, sorgular, {'kategori': 'kasko'})
+
+    # Yeniden açılan depoya ekleme - satırlar kaymaz
+    yeni = np.random.default_rng(9).standard_normal((1, 16)).astype(np.float32)
+    yeniden.add(['belge_yeni'], yeni, ['yeni'], [{'kategori': 'kasko'}])
+    assert _en_yakinlar(_kalici_depo(tmp_path), yeni)[0][0] == 'belge_yeni'
+
+
+def test_yarim_gunluk_satiri_yuklemede_atilir(tmp_path):
+    depo = _kalici_depo(tmp_path)
+    _doldur(depo, 10)
+    with open(depo.gunluk_dosyasi, 'a', encoding='utf-8') as f:
+        f.write('{"op": "ekle", "id": "yari')
+    yeniden = _kalici_depo(tmp_path)
+    assert yeniden.count() == 10
+    yeniden.delete(ids=['belge_0'])
+    assert _kalici_depo(tmp_path).count() == 9
+
+
+def test_sikistirma_sonrasi_yeniden_acilinca_ayni(tmp_path):
+    depo = _kalici_depo(tmp_path)
+    vektorler = _doldur(depo, 40)
+    depo.delete(ids=[f"belge_{i}" for i in range(0, 40, 3)])
+    sorgular = vektorler[:10] + 0.01
+    beklenen = _en_yakinlar(depo, sorgular)
+
+    depo.sikistir()
+    assert depo.get_stats()['olu_satir'] == 0
+    assert _en_yakinlar(depo, sorgular) == beklenen
+    yeniden = _kalici_depo(tmp_path)
+    assert yeniden.count() == depo.count()
+    assert _en_yakinlar(yeniden, sorgular) == beklenen
+    # Sadece geçerli neslin dosyaları kalır
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        ['meta.json', os.path.basename(depo.vektor_dosyasi), os.path.basename(depo.gunluk_dosyasi)]
+    )
+
+
+def test_yarim_kalan_sikistirma_eski_nesli_bozmaz(tmp_path):
+    depo = _kalici_depo(tmp_path)
+    vektorler = _doldur(depo, 30)
+    depo.delete(ids=['belge_1', 'belge_2'])
+    sorgular = vektorler[:10] + 0.01
+    beklenen = _en_yakinlar(depo, sorgular)
+
+    # Yeni nesil yazıldı ama meta.json değişmeden çöktü
+    vektor_dosyasi, gunluk_dosyasi = depo._nesil_dosyalari(depo.nesil + 1)
+    with open(vektor_dosyasi, 'wb') as f:
+        f.write(np.asarray(vektorler[3:], dtype=np.float32).tobytes())
+    with open(gunluk_dosyasi, 'w', encoding='utf-8') as f:
+        f.write('{"op": "ekle", "id": "belge_3", "satir": 0, "belge": "", "metadata": null}\n')
+
+    yeniden = _kalici_depo(tmp_path)
+    assert yeniden.count() == 28
+    assert _en_yakinlar(yeniden, sorgular) == beklenen
+    assert not os.path.exists(vektor_dosyasi) and not os.path.exists(gunluk_dosyasi)
+
+
+def test_vektor_dosyasi_eksikse_kayitlar_yanlis_vektorle_sunulmaz(tmp_path):
+    depo = _kalici_depo(tmp_path)
+    _doldur(depo, 10)
+    os.remove(depo.vektor_dosyasi)
+
+    yeniden = _kalici_depo(tmp_path)
+    assert yeniden.count() == 0
+    vektorler = _doldur(yeniden, 3, tohum=2)
+    assert _en_yakinlar(_kalici_depo(tmp_path), vektorler[:1])[0][0] == 'belge_0'
+    assert _kalici_depo(tmp_path).count() == 3
+
+
+def test_upsert_yeniden_acilinca_yeni_surum(tmp_path):
+    depo = _kalici_depo(tmp_path)
+    vektorler = _doldur(depo, 10)
+    yeni = -vektorler[:2]
+    depo.upsert(['belge_0', 'belge_yeni'], yeni, ['guncel 0', 'yeni'], [{'kategori': 'kasko'}] * 2)
+
+    for hedef in (depo, _kalici_depo(tmp_path)):
+        assert hedef.count() == 11
+        assert hedef.get(ids=['belge_0'])['documents'] == ['guncel 0']
+        assert _en_yakinlar(hedef, yeni[:1])[0][0] == 'belge_0'
+
+
+def test_shard_sonuclari_tek_depoyla_ayni():
+    rastgele = np.random.default_rng(13)
+    kategoriler = list(CATEGORIES)
+    vektorler = rastgele.standard_normal((3000, 64)).astype(np.float32)
+    idler = [f"belge_{i}" for i in range(3000)]
+    metadatas = [{'kategori': kategoriler[i % len(kategoriler)]} for i in range(3000)]
+    tek = NumpyVectorStore()
+    depo = ShardedVectorStore({kategori: NumpyVectorStore() for kategori in kategoriler})
+    for hedef in (tek, depo):
+        hedef.add(idler, vektorler, [''] * 3000, metadatas)
+
+    sorgular = rastgele.standard_normal((20, 64)).astype(np.float32)
+    for where in (None, {'kategori': 'kasko'}):
+        beklenen = tek.query(sorgular, n_results=25, include=['metadatas', 'distances'], where=where)
+        assert depo.query(sorgular, n_results=25, include=['metadatas', 'distances'], where=where) == beklenen
+
+    silinecek = tek.get(where={'kategori': 'kasko'}, include=[])['ids']
+    tek.delete(ids=silinecek)
+    assert sorted(depo.shard_dusur('kasko')) == sorted(silinecek)
+    assert depo.count() == tek.count()
+    assert depo.query(sorgular, n_results=25, include=['distances'])['ids'] == \
+        tek.query(sorgular, n_results=25, include=['distances'])['ids']
+
+
+def test_bos_shardlar_sorgulanmaz():
+    rastgele = np.random.default_rng(3)
+    vektorler = rastgele.standard_normal((200, 32)).astype(np.float32)
+    idler = [f"belge_{i}" for i in range(200)]
+    metadatas = [{'kategori': 'kasko' if i % 2 else 'trafik'} for i in range(200)]
+    shardlar = {ad: _SayanDepo() for ad in ('kasko', 'trafik', 'mevzuat', 'genel')}
+    depo = ShardedVectorStore(shardlar)
+    tek = NumpyVectorStore()
+    for hedef in (depo, tek):
+        hedef.add(idler, vektorler, [''] * 200, metadatas)
+
+    sorgular = rastgele.standard_normal((5, 32)).astype(np.float32)
+    beklenen = tek.query(sorgular, n_results=10, include=['distances'])
+    sonuc = depo.query(sorgular, n_results=10, include=['distances'])
+
+    assert sonuc['ids'] == beklenen['ids']
+    assert shardlar['mevzuat'].sorgu_cagrisi == 0
+    assert shardlar['genel'].sorgu_cagrisi == 0
+    assert shardlar['kasko'].sorgu_cagrisi == 1
+
+    # Filtreli sorgu boş shard'a düşerse sorgu yapılmadan boş sonuç döner
+    bos = depo.query(sorgular, n_results=10, include=['metadatas'], where={'kategori': 'mevzuat'})
+    assert bos['ids'] == [[] for _ in range(5)]
+    assert bos['metadatas'] == [[] for _ in range(5)]
+    assert bos['distances'] is None
+    assert shardlar['mevzuat'].sorgu_cagrisi == 0
+
+
+def test_shard_boyutlari_yazmalarda_izlenir_sorguda_count_cagrilmaz():
+    rastgele = np.random.default_rng(4)
+    shardlar = {ad: _SayanDepo() for ad in ('kasko', 'trafik', 'genel')}
+    depo = ShardedVectorStore(shardlar)
+    vektorler = rastgele.standard_normal((20, 16)).astype(np.float32)
+    depo.add([f"belge_{i}" for i in range(20)], vektorler, [''] * 20,
+             [{'kategori': 'kasko' if i % 2 else 'trafik'} for i in range(20)])
+    for shard in shardlar.values():
+        shard.count_cagrisi = 0
+
+    # Uyarlanır k genişletme turları gibi art arda sorgular
+    sorgu = rastgele.standard_normal((1, 16)).astype(np.float32)
+    for k in (4, 8, 16, 25):
+        depo.query(sorgu, n_results=k, include=['distances'])
+        depo.query(sorgu, n_results=k, include=['distances'], where={'kategori': 'kasko'})
+    assert all(shard.count_cagrisi == 0 for shard in shardlar.values())
+    assert shardlar['genel'].sorgu_cagrisi == 0
+
+    # Boyutlar ekleme (mevcut id atlanır), silme, kategori değişikliği ve shard düşürmede güncel kalır
+    depo.add(['belge_0', 'belge_yeni'], vektorler[:2], ['', ''], [{'kategori': 'trafik'}, {'kategori': 'genel'}])
+    assert depo.shard_boyutlari() == {'kasko': 10, 'trafik': 10, 'genel': 1}
+    depo.upsert(['belge_1'], vektorler[1:2], [''], [{'kategori': 'genel'}])
+    assert depo.shard_boyutlari() == {'kasko': 9, 'trafik': 10, 'genel': 2}
+    depo.delete(ids=['belge_2', 'yok'])
+    depo.shard_dusur('kasko')
+    assert depo.shard_boyutlari() == {'kasko': 0, 'trafik': 9, 'genel': 2}
+    assert depo.count() == 11
+    assert {ad: shard.count() for ad, shard in shardlar.items()} == depo.shard_boyutlari()
+    assert depo.query(sorgu, n_results=5, include=['distances'], where={'kategori': 'kasko'})['ids'] == [[]]
+    assert shardlar['kasko'].sorgu_cagrisi == 8  # Düşürülen shard artık sorgulanmaz
+
+
+def test_chroma_kucuk_k_buyuk_k_oneki():
+    chromadb = pytest.importorskip('chromadb')
+    config = copy.deepcopy(get_config())
+    max_k = config['search']['max_search_results']
+    depo = ChromaVectorStore(_chroma_collection_ac(chromadb.EphemeralClient(), config, 'test_uyarlanir_k'))
+    assert depo.kararli_k_siniri() >= max_k
+
+    rastgele = np.random.default_rng(5)
+    vektorler = rastgele.standard_normal((3000, 32)).astype(np.float32)
+    for bas in range(0, 3000, 1000):
+        depo.add([f"belge_{i}" for i in range(bas, bas + 1000)], vektorler[bas:bas + 1000],
+                 [''] * 1000, [{'kategori': 'kasko'}] * 1000)
+    sorgular = rastgele.standard_normal((50, 32)).astype(np.float32)
+    tam = depo.query(sorgular, n_results=max_k, include=['distances'])['ids']
+    for k in (4, 8, 16):
+        kucuk = depo.query(sorgular, n_results=k, include=['distances'])['ids']
+        assert kucuk == [idler[:k] for idler in tam]
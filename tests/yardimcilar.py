@@ -0,0 +1,235 @@
+# yardimcilar.py - Testler ve ölçümler için sahte bileşenler ve eski davranışın referans uygulamaları
+"""
+🧪 Test Yardımcıları
+Model/ChromaDB gerektirmeyen sahte encoder ve koleksiyon, bilgi bankası senaryoları ve
+optimizasyonların karşılaştırıldığı eski (referans) davranışlar. benchmarks.py de bunları kullanır.
+"""
+import copy
+import json
+import os
+import re
+import time
+import zlib
+from typing import Dict, List, Optional
+import numpy as np
+
+KB_DOSYASI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sigorta_bilgi_bankasi.json')
+
+def yerel_config() -> Dict:
+    """📋 Testin/ölçümün değiştirebileceği bağımsız konfigürasyon kopyası"""
+    from config import get_config
+    return copy.deepcopy(get_config())
+
+def kb_kayitlari(config: Dict, json_file: str = KB_DOSYASI, belge_sayisi: Optional[int] = None,
+                 belge_uzunlugu: Optional[int] = None) -> List[Dict]:
+    """📚 Bilgi bankasından hazırlanmış kayıtlar
+
+    `belge_sayisi`: kayıtlar numaralı id'lerle çoğaltılır. `belge_uzunlugu`: içerikler tekrarlanarak uzatılır.
+    """
+    from data_processor import SigortaDataProcessor
+
+    isleyici = SigortaDataProcessor(config)
+    with open(json_file, 'r', encoding='utf-8') as f:
+        kaynak = json.load(f)
+    if belge_sayisi is None:
+        return [isleyici._veri_hazirla(item) for item in kaynak]
+
+    kayitlar = []
+    for i in range(belge_sayisi):
+        item = dict(kaynak[i % len(kaynak)])
+        item['id'] = f"{item['id']}_{i}"
+        if belge_uzunlugu:
+            tekrar_sayisi = belge_uzunlugu // max(1, len(item['icerik'])) + 1
+            item['icerik'] = ' '.join([item['icerik']] * tekrar_sayisi)[:belge_uzunlugu]
+        kayitlar.append(isleyici._veri_hazirla(item))
+    return kayitlar
+
+class SayanEncoder:
+    """🔢 Çağrı sayan sahte encoder - gerçek model yüklemeden encode maliyetini sayar"""
+
+    def __init__(self, boyut: int = 384):
+        self.boyut = boyut
+        self.encode_sayisi = 0
+        self.encode_cagrisi = 0
+
+    def encode(self, metinler, **kwargs):
+        self.encode_sayisi += len(metinler)
+        self.encode_cagrisi += 1
+        return np.vstack([
+            np.random.default_rng(zlib.crc32(m.encode('utf-8'))).standard_normal(self.boyut)
+            for m in metinler
+        ]).astype(np.float32)
+
+class KelimeEncoder(SayanEncoder):
+    """🔤 Kelime torbası sahte encoder - ortak kelimeli metinler benzer vektör alır
+
+    `gecikme`: encode çağrısı başına bekleme (gerçek modelin ileri geçiş maliyeti yerine).
+    """
+
+    def __init__(self, boyut: int = 256, gecikme: float = 0.0):
+        super().__init__(boyut)
+        self.gecikme = gecikme
+
+    def encode(self, metinler, **kwargs):
+        from text_normalizer import turkce_kucuk_harf
+        self.encode_sayisi += len(metinler)
+        self.encode_cagrisi += 1
+        if self.gecikme:
+            time.sleep(self.gecikme)
+        vektorler = np.zeros((len(metinler), self.boyut), dtype=np.float32)
+        for i, metin in enumerate(metinler):
+            for kelime in re.findall(r'\w+', turkce_kucuk_harf(metin)):
+                vektorler[i] += np.random.default_rng(zlib.crc32(kelime.encode('utf-8'))).standard_normal(self.boyut)
+        return vektorler
+
+class BellekKoleksiyonu:
+    """🗄️ ChromaDB query/get arayüzünü taklit eden küçük bellek içi koleksiyon
+
+    Döndürülen belge karakterlerini sayar - aşamalar arası taşınan yükü ölçmek için.
+    """
+
+    def __init__(self, idler: List[str], embeddings: np.ndarray, belgeler: List[str], metadatas: List[Dict]):
+        self.idler = idler
+        self.embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        self.belgeler = belgeler
+        self.metadatas = metadatas
+        self.tasinan_karakter = 0
+        self.sorgu_cagrisi = 0
+        self.get_cagrisi = 0
+
+    @classmethod
+    def kayitlardan(cls, kayitlar: List[Dict], encoder: SayanEncoder) -> 'BellekKoleksiyonu':
+        """📥 Hazırlanmış kayıtları verilen encoder'ın vektörleriyle yükle"""
+        belgeler = [k['icerik'] for k in kayitlar]
+        return cls([k['id'] for k in kayitlar], encoder.encode(belgeler), belgeler, [k['metadata'] for k in kayitlar])
+
+    def kararli_k_siniri(self) -> float:
+        return float('inf')  # Tam arama
+
+    def query(self, query_embeddings, n_results: int, include: List[str], where: Optional[Dict] = None) -> Dict:
+        from vector_store import where_eslesir
+        self.sorgu_cagrisi += 1
+        sonuc = {'ids': [], 'distances': [], 'metadatas': [], 'documents': []}
+        for sorgu in np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)):
+            mesafeler = 1.0 - self.embeddings @ (sorgu / np.linalg.norm(sorgu))
+            sira = [i for i in np.argsort(mesafeler, kind='stable')
+                    if where_eslesir(self.metadatas[i], where)][:n_results]
+            sonuc['ids'].append([self.idler[i] for i in sira])
+            sonuc['distances'].append([float(mesafeler[i]) for i in sira])
+            sonuc['metadatas'].append([dict(self.metadatas[i]) for i in sira])
+            sonuc['documents'].append([self.belgeler[i] for i in sira])
+            if 'documents' in include:
+                self.tasinan_karakter += sum(len(self.belgeler[i]) for i in sira)
+        for alan in ('metadatas', 'documents'):
+            if alan not in include:
+                sonuc[alan] = None
+        return sonuc
+
+    def get(self, ids: List[str], include: List[str]) -> Dict:
+        self.get_cagrisi += 1
+        indeks = {veri_id: i for i, veri_id in enumerate(self.idler)}
+        secilen = [indeks[veri_id] for veri_id in ids if veri_id in indeks]
+        belgeler = [self.belgeler[i] for i in secilen]
+        self.tasinan_karakter += sum(len(b) for b in belgeler)
+        return {'ids': [self.idler[i] for i in secilen], 'documents': belgeler}
+
+def hazir_core(config: Dict, encoder, koleksiyon):
+    """🧠 Model yüklemeden sahte encoder ve koleksiyonla çalışan hazır core"""
+    from model_core import SigortaModelCore
+    from query_engine import SigortaQueryEngine
+
+    core = SigortaModelCore()
+    core.config = config
+    core.query_engine = SigortaQueryEngine(encoder, koleksiyon, config)
+    core.is_ready = True
+    return core
+
+def suresi_dolmus_butce(saniye: Optional[float] = None):
+    """⌛ Bitişi geçmiş zaman bütçesi - tüm isteğe bağlı aşamalar atlanır (`zaman_butcesi_olustur` yerine geçer)"""
+    from zaman_butcesi import ZamanButcesi
+    butce = ZamanButcesi(1.0)
+    butce.bitis = time.perf_counter() - 1.0
+    return butce
+
+# 🐢 Referans uygulamalar: optimizasyon öncesi davranış, eşdeğerlik karşılaştırmaları için
+
+def dogrusal_kategori_tespiti(soru: str, categories: Dict, exact_matches: Dict):
+    """🐢 Referans: desen başına `in` taraması (otomat öncesi davranış)"""
+    for tam_eslestirme, kategori in exact_matches.items():
+        if tam_eslestirme in soru:
+            return kategori
+    skorlar = {}
+    for kategori, config in categories.items():
+        skor = 0
+        for keyword in config.get('keywords', []):
+            if keyword.lower() in soru:
+                skor += config.get('weight', 1.0)
+                skor += config.get('accuracy_boost', 0)
+        for neg_keyword in config.get('negative_keywords', []):
+            if neg_keyword.lower() in soru:
+                skor -= 0.5
+        if config.get('priority') == 'high':
+            skor *= 1.2
+        elif config.get('priority') == 'medium':
+            skor *= 1.1
+        skorlar[kategori] = skor
+    en_iyi = max(skorlar.items(), key=lambda x: x[1])
+    return en_iyi[0] if en_iyi[1] > 0.5 else None
+
+def metin_taramasi_bonusu(soru: str, doc: str, kategori, categories: Dict, bonus_max: float) -> float:
+    """🐢 Referans: aday başına tam metin taramasıyla anahtar kelime bonusu (imza öncesi davranış)"""
+    if not kategori:
+        return 0
+    soru_lower = soru.lower()
+    doc_lower = doc.lower()
+    bonus = 0
+    for keyword in categories.get(kategori, {}).get('keywords', [])[:10]:
+        if keyword.lower() in soru_lower and keyword.lower() in doc_lower:
+            bonus += 0.05
+    return min(bonus, bonus_max)
+
+def eski_sonuc_isleme(motor, arama_sonuclari, soru: str, kategori) -> List[Dict]:
+    """🐢 Referans: aday başına dict + sıralama + filtre (vektörel skorlama öncesi davranış)"""
+    config = motor.search_config
+    sonuclar = []
+    for i, (doc, metadata, distance) in enumerate(zip(
+            arama_sonuclari['documents'][0], arama_sonuclari['metadatas'][0],
+            arama_sonuclari['distances'][0])):
+        similarity_score = 1.0 - distance
+        if similarity_score < config['similarity_threshold']:
+            continue
+        final_score = similarity_score
+        doc_kategori = metadata.get('kategori', 'genel')
+        if kategori and doc_kategori == kategori:
+            final_score += config['category_bonus']
+        final_score += metin_taramasi_bonusu(
+            soru, doc, kategori, motor.categories, config['keyword_bonus_max']
+        )
+        sonuclar.append({
+            'icerik': doc,
+            'kategori': doc_kategori,
+            'skor': min(final_score, 1.0),
+            'metadata': metadata,
+            'orijinal_distance': distance,
+            'similarity_score': similarity_score,
+            'rank': i + 1
+        })
+    sonuclar.sort(key=lambda x: x['skor'], reverse=True)
+    filtrelenmis = [s for s in sonuclar if len(s['icerik']) >= config['min_content_length']]
+    return filtrelenmis[:config['final_results']]
+
+def eski_soru_genisletme(soru: str) -> str:
+    """🐢 Referans: ui_main'deki eski ikinci sorgu - anahtar kelimelerin sıralı metin değişimi"""
+    expansions = {
+        'hasar': 'hasar tazminat karşılama ödeme',
+        'sigorta': 'sigorta poliçe teminat kapsam',
+        'öder': 'öder karşılar tazmin eder ödeme yapar',
+        'geçerli': 'geçerli kapsam dahili teminat altında',
+        'nasıl': 'nasıl hangi şekilde prosedür adım',
+        'yapmalı': 'yapmak gerekli prosedür adımlar izlemek'
+    }
+    expanded = soru.lower()
+    for key, value in expansions.items():
+        if key in expanded:
+            expanded = expanded.replace(key, value)
+    return expanded
@@ -0,0 +1,67 @@
+# text_normalizer.py - Türkçe Metin Normalizasyonu
+"""
+🔤 Türkçe Metin Normalizasyonu
+Cache anahtarı, kategori tespiti ve encode için tek normalizasyon hattı
+"""
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+# Derlenmiş desenler - her çağrıda yeniden derlenmez
+_NOKTALAMA = re.compile(r'[^\w\s]|_')
+_BOSLUK = re.compile(r'\s+')
+_BIRLESIK_NOKTA = re.compile('(?<=i)\u0307')   # "i\u0307" - str.lower() kalıntısı
+
+# Türkçe büyük/küçük harf: str.lower() "İ" -> "i̇", "I" -> "i" yapar
+_TURKCE_BUYUK = str.maketrans({'İ': 'i', 'I': 'ı'})
+
+# Şapkalı harfler (kâr, hâlâ, rüçhan/rüçhân) her zaman katlanır
+_SAPKA_KATLA = str.maketrans({'â': 'a', 'î': 'i', 'û': 'u'})
+
+# Tam diakritik katlama - Türkçe klavyesiz yazılmış sorular için (ş -> s, ı -> i ...)
+_DIAKRITIK_KATLA = str.maketrans({
+    'ç': 'c', 'ğ': 'g', 'ı': 'i', 'ö': 'o', 'ş': 's', 'ü': 'u'
+})
+
+# Anlamı değiştirmeyen soru ekleri ve dolgu kelimeleri - sadece cache anahtarında atılır
+CACHE_STOPWORDS = frozenset({
+    'mi', 'mı', 'mu', 'mü', 'mis', 'mısınız', 'misiniz', 'musunuz', 'müsünüz',
+    'acaba', 'lütfen', 'peki', 'şey', 'da', 'de', 'ki', 've', 'ile'
+})
+
+def turkce_kucuk_harf(metin: str) -> str:
+    """🔡 Türkçe kurallarıyla küçük harf (İ -> i, I -> ı)"""
+    kucuk = unicodedata.normalize('NFC', metin).translate(_TURKCE_BUYUK).lower()
+    # Önceden str.lower() ile bozulmuş metinlerdeki birleşik noktayı at
+    return _BIRLESIK_NOKTA.sub('', kucuk)
+
+def diakritik_katla(metin: str) -> str:
+    """🔤 Türkçe harfleri ASCII karşılıklarına katla"""
+    return metin.translate(_DIAKRITIK_KATLA)
+
+def soru_normalize(soru: str) -> str:
+    """🧹 Arama ve kategori tespiti için normalize soru
+
+    NFKC (genişlik/ligatür varyantları), Türkçe küçük harf, şapka katlama,
+    noktalama -> boşluk, tek boşluk.
+    """
+    temiz = unicodedata.normalize('NFKC', soru)
+    temiz = turkce_kucuk_harf(temiz).translate(_SAPKA_KATLA)
+    temiz = _NOKTALAMA.sub(' ', temiz)
+    return _BOSLUK.sub(' ', temiz).strip()
+
+def cache_anahtari_metni(soru: str, diakritik: bool = False,
+                         stopwords: Optional[Iterable[str]] = CACHE_STOPWORDS) -> str:
+    """🔑 Cache anahtarı için kanonik metin
+
+    Aynı soruyu farklı yazımlarda tek anahtara indirger. Kelime sırası korunur;
+    stopword'ler diakritik katlamadan önce atılır ("mı" ve "mi" birlikte gider).
+    """
+    kelimeler = soru_normalize(soru).split()
+    if stopwords:
+        stopword_kumesi = stopwords if isinstance(stopwords, (set, frozenset)) else set(stopwords)
+        secilen = [k for k in kelimeler if k not in stopword_kumesi]
+        # Sadece stopword'den oluşan soru boş anahtara düşmesin
+        kelimeler = secilen or kelimeler
+    metin = ' '.join(kelimeler)
+    return diakritik_katla(metin) if diakritik else metin
@@ -9,7 +9,7 @@ import random
 import time
 import plotly.express as px
 from config import get_config
-from model_core import SigortaModelCore
+from model_core import SigortaModelCore, get_shared_model_core
 import re
 
 class SigortaUserInterface:
@@ -20,6 +20,35 @@ class SigortaUserInterface:
         self.model_core = None
         # Analytics kaldırıldı - daha stabil çalışma için
     
+    def _sistem_al(self) -> Optional[SigortaModelCore]:
+        """🌐 Paylaşılan sistem çekirdeği - gerekirse süreç içinde bir kez başlatılır"""
+        if self.model_core is None:
+            self.model_core = get_shared_model_core()
+            st.session_state.sistem_hazir = bool(self.model_core and self.model_core.is_ready)
+        return self.model_core
+    
+    def _hazir_sistem(self) -> Optional[SigortaModelCore]:
+        """✅ Hazır sistem çekirdeği - başlatma tetiklemez (bkz. `sistemi_baslat`)"""
+        if self.model_core is None or not self.model_core.is_ready:
+            return None
+        return self.model_core
+    
+    def sistemi_baslat(self):
+        """🚀 Sistem başlatma - tüm oturumlar aynı çekirdeği paylaşır; sidebar'dan önce çağrılır"""
+        if self.model_core is not None:
+            return
+        with st.spinner("🚀 Akıllı Sigorta Sistemi başlatılıyor..."):
+            try:
+                self._sistem_al()
+            except Exception as e:
+                st.session_state.sistem_hazir = False
+                st.error(f"⚠️ Sistem başlatma hatası: {str(e)}")
+    
+    def _paylasilan_cache_temizle(self, sistem: SigortaModelCore):
+        """🗑️ Paylaşılan cache'i temizle ve onay kutusunu sıfırla (buton callback'i)"""
+        sistem.cache_temizle()
+        st.session_state.cache_temizle_onay = False
+    
     def setup_page(self):
         """📱 Sayfa ayarları"""
         st.set_page_config(
@@ -221,9 +250,10 @@ class SigortaUserInterface:
             # Sistem durumu
             st.markdown("### ⚙️ Sistem Durumu")
 
-            if hasattr(st.session_state, 'sigorta_sistem') and st.session_state.sigorta_sistem:
+            sistem = self._hazir_sistem()
+            if sistem:
                 try:
-                    stats = st.session_state.sigorta_sistem.get_sistem_stats()
+                    stats = sistem.get_sistem_stats()
                     st.success("✅ Sistem Aktif")
                     st.info(f"📊 {stats.get('dokuman_sayisi', 0)} belge")
                     
@@ -232,10 +262,12 @@ class SigortaUserInterface:
                     st.metric("📈 Cache Hit", f"{cache_stats.get('hit_rate', 0)}%")
                     st.metric("⚡ Cache Boyut", f"{cache_stats.get('size', 0)}/{cache_stats.get('max_size', 100)}")
 
-                    # Cache temizleme butonu
-                    if st.button("🗑️ Cache Temizle", use_container_width=True):
-                        st.session_state.sigorta_sistem.cache_temizle()
-                        st.rerun()
+                    # Cache temizleme - core paylaşımlı, tüm kullanıcıların cache'i silinir
+                    onay = st.checkbox("Tüm kullanıcılar için temizlemeyi onayla", key="cache_temizle_onay")
+                    st.button(
+                        "🗑️ Paylaşılan Cache'i Temizle", use_container_width=True, disabled=not onay,
+                        on_click=self._paylasilan_cache_temizle, args=(sistem,)
+                    )
 
                 except Exception as e:
                     st.warning(f"⚠️ Stats hatası: {str(e)}")
@@ -260,16 +292,7 @@ class SigortaUserInterface:
 
     def render_main_interface(self):
         """💬 Ana arayüz - layout optimize edilmiş"""
-        # Sistem başlatma
-        if 'sigorta_sistem' not in st.session_state:
-            with st.spinner("🚀 Akıllı Sigorta Sistemi başlatılıyor..."):
-                try:
-                    from model_core import SigortaModelCore
-                    st.session_state.sigorta_sistem = SigortaModelCore()
-                    st.session_state.sistem_hazir = st.session_state.sigorta_sistem.sistem_baslat()
-                except Exception as e:
-                    st.session_state.sistem_hazir = False
-                    st.error(f"⚠️ Sistem başlatma hatası: {str(e)}")
+        self.sistemi_baslat()
 
         # Sistem hazırlık kontrolü
         if not st.session_state.get('sistem_hazir', False):
@@ -378,69 +401,33 @@ class SigortaUserInterface:
 
     def _process_question_with_accuracy_boost(self, soru):
         """🎯 Doğruluk artırımlı soru işleme"""
-        if 'sigorta_sistem' not in st.session_state:
+        if self.model_core is None:
             with st.spinner("🚀 Sigorta uzmanı yükleniyor..."):
-                st.session_state.sigorta_sistem = SigortaModelCore()
-                st.session_state.sistem_hazir = st.session_state.sigorta_sistem.sistem_baslat()
+                self._sistem_al()
         
-        if not st.session_state.get('sistem_hazir', False):
+        sistem = self._hazir_sistem()
+        if not sistem:
             st.error("⚠️ Sistem başlatılamadı!")
             return
         
         with st.spinner("🤔 Sorunuz çoklu algoritma ile analiz ediliyor..."):
-            # Ana arama - mevcut soru_yanit metodunu kullan
-            results = []
-            result1 = st.session_state.sigorta_sistem.soru_yanit(soru)
+            # Soru genişletme ve çoklu arama sorgu motorunda: varyantlar tek sorguda aranır
+            sonuclar = sistem.soru_yanit(soru)
             
-            if result1 and len(result1) > 0:
-                formatted_result = {
+            if sonuclar:
+                best_result = {
                     'success': True,
-                    'answer': result1[0].get('icerik', ''),
-                    'category': result1[0].get('kategori', ''),
-                    'confidence': result1[0].get('skor', 0),
-                    'sources': [result1[0].get('metadata', {}).get('kaynak', 'Sigorta Rehberi')]
+                    'answer': sonuclar[0].get('icerik', ''),
+                    'category': sonuclar[0].get('kategori', ''),
+                    'confidence': sonuclar[0].get('skor', 0),
+                    'sources': [sonuclar[0].get('metadata', {}).get('kaynak', 'Sigorta Rehberi')]
                 }
-                results.append(formatted_result)
-            
-            # Genişletilmiş soru
-            expanded_query = self._expand_question_keywords(soru)
-            if expanded_query != soru:
-                result2 = st.session_state.sigorta_sistem.soru_yanit(expanded_query)
-                if result2 and len(result2) > 0:
-                    formatted_result2 = {
-                        'success': True,
-                        'answer': result2[0].get('icerik', ''),
-                        'category': result2[0].get('kategori', ''),
-                        'confidence': result2[0].get('skor', 0),
-                        'sources': [result2[0].get('metadata', {}).get('kaynak', 'Sigorta Rehberi')]
-                    }
-                    results.append(formatted_result2)
-            
-            # En iyi sonucu seç
-            if results:
-                best_result = max(results, key=lambda x: x.get('confidence', 0))
                 self._display_enhanced_result_with_confidence(best_result, soru)
+                if sonuclar[0].get('bozulmus'):
+                    st.caption("⏱️ Hızlı yanıt: süre hedefi için bazı arama adımları atlandı.")
             else:
                 self._display_no_result_with_suggestions(soru)
 
-    def _expand_question_keywords(self, soru):
-        """🔍 Soru anahtar kelime genişletme"""
-        expansions = {
-            'hasar': 'hasar tazminat karşılama ödeme',
-            'sigorta': 'sigorta poliçe teminat kapsam',
-            'öder': 'öder karşılar tazmin eder ödeme yapar',
-            'geçerli': 'geçerli kapsam dahili teminat altında',
-            'nasıl': 'nasıl hangi şekilde prosedür adım',
-            'yapmalı': 'yapmak gerekli prosedür adımlar izlemek'
-        }
-        
-        expanded = soru.lower()
-        for key, value in expansions.items():
-            if key in expanded:
-                expanded = expanded.replace(key, value)
-        
-        return expanded
-
     def _display_enhanced_result_with_confidence(self, result, original_question):
         """📋 Güzel ve doğal sonuç gösterimi"""
         st.markdown("### 🎯 Uzman Cevabı")
@@ -582,11 +569,12 @@ class SigortaUserInterface:
 
     def _render_performance_metrics(self):
         """📊 Performans metrikleri"""
-        if not hasattr(st.session_state, 'sigorta_sistem') or not st.session_state.sigorta_sistem:
+        sistem = self._hazir_sistem()
+        if not sistem:
             return
 
         try:
-            stats = st.session_state.sigorta_sistem.get_sistem_stats()
+            stats = sistem.get_sistem_stats()
 
             col1, col2, col3, col4, col5 = st.columns(5)
 
@@ -632,12 +620,13 @@ class SigortaUserInterface:
 
     def _show_detailed_stats(self):
         """📊 Detaylı istatistikler"""
-        if not hasattr(st.session_state, 'sigorta_sistem') or not st.session_state.sigorta_sistem:
+        sistem = self._hazir_sistem()
+        if not sistem:
             st.error("⚠️ Sistem henüz başlatılmadı")
             return
 
         try:
-            stats = st.session_state.sigorta_sistem.get_sistem_stats()
+            stats = sistem.get_sistem_stats()
 
             st.markdown("### 📊 Sistem İstatistikleri")
 
@@ -656,6 +645,7 @@ class SigortaUserInterface:
                 cache = stats.get('cache_stats', {})
                 st.write(f"• **Cache Boyutu:** {cache.get('size', 0)}/{cache.get('max_size', 100)}")
                 st.write(f"• **Hit Rate:** %{cache.get('hit_rate', 0)}")
+                st.write(f"• **Benzer Soru Hit:** {cache.get('semantik_hit', 0)}")
                 st.write(f"• **Ortalama Yanıt:** {perf.get('ortalama_yanit_suresi', 0):.2f}s")
 
         except Exception as e:
@@ -769,6 +759,9 @@ def main():
     # Header
     ui.render_header()
     
+    # Sistem başlatma - sidebar'daki sistem durumu ilk çalıştırmada da güncel olsun
+    ui.sistemi_baslat()
+    
     # Sidebar
     ui.render_sidebar()
     
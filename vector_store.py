@@ -0,0 +1,839 @@
+# vector_store.py - Vektör Deposu Backend'leri
+"""
+🗄️ Takılabilir Vektör Deposu
+ChromaDB adaptörü, süreç içi NumPy tam arama motoru ve kategori shard'ları - ortak arayüz:
+add / query / get / delete / count (ChromaDB sonuç biçimiyle)
+"""
+import os
+import json
+import math
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import streamlit as st
+
+TUM_ALANLAR = ['metadatas', 'documents']
+
+def _liste(degerler) -> List:
+    """🔢 ndarray / liste girdisini düz listeye çevir"""
+    return degerler.tolist() if hasattr(degerler, 'tolist') else list(degerler)
+
+def where_eslesir(metadata: Optional[Dict], where: Optional[Dict]) -> bool:
+    """🔎 ChromaDB `where` filtresinin eşitlik alt kümesi: {alan: değer}, {alan: {'$eq': değer}}, {'$and': [...]}"""
+    if not where:
+        return True
+    metadata = metadata or {}
+    for alan, kosul in where.items():
+        if alan == '$and':
+            if not all(where_eslesir(metadata, alt) for alt in kosul):
+                return False
+        elif isinstance(kosul, dict):
+            if '$eq' not in kosul:
+                raise ValueError(f"Desteklenmeyen where operatörü: {list(kosul)}")
+            if metadata.get(alan) != kosul['$eq']:
+                return False
+        elif metadata.get(alan) != kosul:
+            return False
+    return True
+
+class VectorStore:
+    """🗄️ Vektör deposu arayüzü
+
+    Sonuçlar ChromaDB biçimindedir: `query` iç içe listeler (sorgu başına bir liste),
+    `get` düz listeler döndürür; istenmeyen alanlar None olur.
+    """
+
+    def add(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        raise NotImplementedError
+
+    def query(self, query_embeddings, n_results: int = 10,
+              include: Optional[List[str]] = None, where: Optional[Dict] = None) -> Dict:
+        raise NotImplementedError
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None,
+            include: Optional[List[str]] = None) -> Dict:
+        raise NotImplementedError
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None):
+        raise NotImplementedError
+
+    def upsert(self, ids: List[str], embeddings, documents: List[str], metadatas: List[Dict]):
+        """🔁 Mevcut id'leri yeni sürümle değiştir, olmayanları ekle"""
+        self.delete(ids=list(ids))
+        self.add(ids, embeddings, documents, metadatas)
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def dusur(self):
+        """🗑️ Tüm kayıtları at - backend destekliyorsa depolamayı toptan siler"""
+        idler = self.get(include=[])['ids']
+        if idler:
+            self.delete(ids=idler)
+
+    def kararli_k_siniri(self) -> float:
+        """📏 n_results bu değere kadarken sonuçlar daha büyük k'nin öneki mi (0: garanti yok)
+
+        Tam aramada sınırsızdır; HNSW aday havuzu max(search_ef, k) olduğundan
+        k <= search_ef iken k'yi küçültmek komşu kümesini değiştirmez.
+        """
+        return 0
+
+    def get_stats(self) -> Dict:
+        return {'backend': self.__class__.__name__, 'kayit_sayisi': self.count()}
+
+class ChromaVectorStore(VectorStore):
+    """🗄️ ChromaDB collection adaptörü"""
+
+    def __init__(self, collection, client=None):
+        self.collection = collection
+        self.client = client    # Verilirse dusur() collection'ı silip yeniden oluşturur
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.collection.add(
+            ids=list(ids),
+            embeddings=_liste(embeddings),
+            documents=list(documents),
+            metadatas=list(metadatas)
+        )
+
+    def query(self, query_embeddings, n_results=10, include=None, where=None):
+        parametreler = {
+            'query_embeddings': _liste(query_embeddings),
+            'n_results': n_results,
+            'include': include or ['metadatas', 'documents', 'distances']
+        }
+        if where:
+            parametreler['where'] = where
+        return self.collection.query(**parametreler)
+
+    def get(self, ids=None, where=None, include=None):
+        parametreler = {'include': TUM_ALANLAR if include is None else include}
+        if ids is not None:
+            parametreler['ids'] = list(ids)
+        if where:
+            parametreler['where'] = where
+        return self.collection.get(**parametreler)
+
+    def delete(self, ids=None, where=None):
+        if ids is not None and not ids:
+            return
+        parametreler = {}
+        if ids is not None:
+            parametreler['ids'] = list(ids)
+        if where:
+            parametreler['where'] = where
+        self.collection.delete(**parametreler)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.collection.upsert(
+            ids=list(ids),
+            embeddings=_liste(embeddings),
+            documents=list(documents),
+            metadatas=list(metadatas)
+        )
+
+    def count(self):
+        return self.collection.count()
+
+    def dusur(self):
+        if self.client is None:
+            return super().dusur()
+        ad, metadata = self.collection.name, self.collection.metadata
+        self.client.delete_collection(ad)
+        self.collection = self.client.create_collection(name=ad, metadata=metadata)
+
+    def kararli_k_siniri(self):
+        # search_ef'siz (eski) collection'larda Chroma varsayılanına güvenilmez
+        return int((self.collection.metadata or {}).get('hnsw:search_ef', 0))
+
+    def get_stats(self):
+        return {'backend': 'chroma', 'kayit_sayisi': self.count()}
+
+class NumpyVectorStore(VectorStore):
+    """🧮 Süreç içi tam (brute-force) arama - normalize float32 matris, tek matris-vektör çarpımı
+
+    Kalıcı modda dizin yapısı (N: nesil, ilk nesilde ek yok):
+        vectors[.N].f32  - satır başına `boyut` adet float32 (sadece sona eklenir, memory-mapped okunur)
+        kayitlar[.N].jsonl - ekle/sil işlem günlüğü (id, satır, belge, metadata)
+        meta.json    - boyut, mesafe metriği, embedding modeli, geçerli nesil
+
+    Silinen satırlar mezar taşıyla işaretlenir; ölü satırlar çoğalınca dosyalar yeni
+    nesle sıkıştırılır ve tek atomik meta.json değişimiyle o nesle geçilir.
+    Depoya tek süreç yazar (Streamlit sürecindeki paylaşılan core).
+    """
+
+    SIKISTIRMA_MIN_OLU = 1000
+
+    def __init__(self, dizin: Optional[str] = None, distance_metric: str = 'cosine',
+                 embedding_model: Optional[str] = None):
+        if distance_metric not in ('cosine', 'ip', 'l2'):
+            raise ValueError(f"Desteklenmeyen mesafe metriği: {distance_metric}")
+        self.dizin = dizin
+        self.distance_metric = distance_metric
+        self.embedding_model = embedding_model
+        self._lock = threading.RLock()
+        self._durumu_sifirla()
+
+        if self.dizin:
+            os.makedirs(self.dizin, exist_ok=True)
+            self.meta_dosyasi = os.path.join(self.dizin, 'meta.json')
+            self._nesli_sec(0)
+            self._diskten_yukle()
+
+    def _nesil_dosyalari(self, nesil: int) -> Tuple[str, str]:
+        """📁 Neslin vektör ve günlük dosyaları"""
+        ek = f'.{nesil}' if nesil else ''
+        return (os.path.join(self.dizin, f'vectors{ek}.f32'),
+                os.path.join(self.dizin, f'kayitlar{ek}.jsonl'))
+
+    def _nesli_sec(self, nesil: int):
+        self.nesil = nesil
+        self.vektor_dosyasi, self.gunluk_dosyasi = self._nesil_dosyalari(nesil)
+
+    def _eski_nesilleri_sil(self):
+        """🧹 Geçerli nesil dışındaki dosyalar - yarım kalmış veya tamamlanmış sıkıştırma artıkları"""
+        gecerli = {self.vektor_dosyasi, self.gunluk_dosyasi, self.meta_dosyasi}
+        for ad in os.listdir(self.dizin):
+            yol = os.path.join(self.dizin, ad)
+            artik = ad.endswith('.tmp') or (
+                (ad.startswith('vectors') and ad.endswith('.f32'))
+                or (ad.startswith('kayitlar') and ad.endswith('.jsonl'))
+            )
+            if artik and yol not in gecerli:
+                try:
+                    os.remove(yol)
+                except OSError:
+                    pass  # Hâlâ memory-mapped (Windows) - sonraki yüklemede silinir
+
+    def _durumu_sifirla(self):
+        """🆕 Boş bellek içi durum"""
+        self.boyut = None
+        self._matris = np.zeros((0, 0), dtype=np.float32)
+        self._tampon = None     # Bellek modunda büyüyen matris tamponu (_matris onun ilk satırları)
+        self._normlar = np.zeros(0, dtype=np.float32)   # l2 için satır norm kareleri
+        self._aktif = np.zeros(0, dtype=bool)
+        self._idler: List[Optional[str]] = []
+        self._belgeler: List[Optional[str]] = []
+        self._metadatalar: List[Optional[Dict]] = []
+        self._satirlar: Dict[str, int] = {}
+        self._where_maskeleri: Dict[str, np.ndarray] = {}   # where filtresi -> satır maskesi
+
+    # --- Kalıcılık ---
+
+    def _diskten_yukle(self):
+        """📂 Meta, işlem günlüğü ve vektör dosyasını yükle"""
+        if os.path.exists(self.meta_dosyasi):
+            with open(self.meta_dosyasi, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if (meta.get('distance_metric') != self.distance_metric
+                    or (self.embedding_model and meta.get('embedding_model') != self.embedding_model)):
+                # Farklı model/metrikle yazılmış vektörler karışmasın
+                self._dosyalari_sil()
+                return
+            self.boyut = meta.get('boyut')
+            self._nesli_sec(meta.get('nesil', 0))
+        self._eski_nesilleri_sil()
+
+        if not self.boyut or not os.path.exists(self.gunluk_dosyasi):
+            return
+
+        gecerli_bayt = 0
+        with open(self.gunluk_dosyasi, 'rb') as f:
+            for satir in f:
+                try:
+                    if not satir.endswith(b'\n'):
+                        raise ValueError
+                    islem = json.loads(satir.decode('utf-8'))
+                except ValueError:
+                    break  # Yarım yazılmış son satır
+                gecerli_bayt += len(satir)
+                if islem['op'] == 'ekle':
+                    self._kayit_ekle_bellek(islem['id'], islem['satir'], islem['belge'], islem['metadata'])
+                elif islem['op'] == 'sil':
+                    self._kayit_sil_bellek(islem['id'])
+        # Yarım satırı kes - sonraki eklemeler geçerli satırın arkasına yazılsın
+        os.truncate(self.gunluk_dosyasi, gecerli_bayt)
+
+        # Vektörler günlükten önce yazılır; vektörü olmayan kayıt ancak dosya kaybı veya
+        # bozulmasıyla oluşur - yanlış/sıfır vektörle sunulmaz, silindi olarak işaretlenir
+        if not os.path.exists(self.vektor_dosyasi):
+            open(self.vektor_dosyasi, 'ab').close()
+        vektor_satiri = os.path.getsize(self.vektor_dosyasi) // (4 * self.boyut)
+        kayipler = [veri_id for veri_id, satir in self._satirlar.items() if satir >= vektor_satiri]
+        for veri_id in kayipler:
+            self._kayit_sil_bellek(veri_id)
+        self._gunluge_yaz([{'op': 'sil', 'id': veri_id} for veri_id in kayipler])
+
+        self._aktif = self._aktif_maskesi()
+        
+        # Günlükte olmayan (yarım kalmış) vektör satırlarını kes; kayıp satırlar ölü kalır
+        satir_sayisi = len(self._idler)
+        os.truncate(self.vektor_dosyasi, satir_sayisi * 4 * self.boyut)
+        self._matrisi_esle(satir_sayisi)
+
+    def _matrisi_esle(self, satir_sayisi: int):
+        """🗺️ Vektör dosyasını memory-map et"""
+        if satir_sayisi == 0:
+            self._matris = np.zeros((0, self.boyut), dtype=np.float32)
+        else:
+            self._matris = np.memmap(self.vektor_dosyasi, dtype=np.float32, mode='r',
+                                     shape=(satir_sayisi, self.boyut))
+        if self.distance_metric == 'l2':
+            self._normlar = np.einsum('ij,ij->i', self._matris, self._matris)
+
+    def _dosyalari_sil(self):
+        if os.path.exists(self.meta_dosyasi):
+            os.remove(self.meta_dosyasi)
+        self._nesli_sec(0)
+        for dosya in (self.vektor_dosyasi, self.gunluk_dosyasi):
+            if os.path.exists(dosya):
+                os.remove(dosya)
+        self._eski_nesilleri_sil()
+
+    def _meta_yaz(self):
+        """📋 Meta dosyası - geçici dosyaya yazılıp atomik olarak değiştirilir (nesil geçişi)"""
+        with open(self.meta_dosyasi + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({
+                'boyut': self.boyut,
+                'distance_metric': self.distance_metric,
+                'embedding_model': self.embedding_model,
+                'nesil': self.nesil
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.meta_dosyasi + '.tmp', self.meta_dosyasi)
+
+    def _gunluge_yaz(self, islemler: List[Dict]):
+        if not self.dizin or not islemler:
+            return
+        with open(self.gunluk_dosyasi, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(islem, ensure_ascii=False) + '\n' for islem in islemler))
+
+    # --- Bellek içi durum ---
+
+    # Satır listeleri sadece sona eklenir veya sıkıştırmada bütünüyle değiştirilir;
+    # kilit dışında okuyan sorgular eski referanslarla tutarlı kalır. `_aktif`
+    # hiç yerinde değiştirilmez, her değişiklikte yeni dizi atanır.
+
+    def _kayit_ekle_bellek(self, veri_id: str, satir: int, belge: str, metadata: Optional[Dict]):
+        while len(self._idler) <= satir:
+            self._idler.append(None)
+            self._belgeler.append(None)
+            self._metadatalar.append(None)
+        self._idler[satir] = veri_id
+        self._belgeler[satir] = belge
+        self._metadatalar[satir] = metadata
+        self._satirlar[veri_id] = satir
+
+    def _kayit_sil_bellek(self, veri_id: str) -> Optional[int]:
+        """Satır mezar taşı olur; belge/metadata sıkıştırmaya kadar yerinde kalır"""
+        return self._satirlar.pop(veri_id, None)
+
+    def _aktif_maskesi(self) -> np.ndarray:
+        return np.fromiter(
+            (self._satirlar.get(veri_id) == i for i, veri_id in enumerate(self._idler)),
+            dtype=bool, count=len(self._idler)
+        )
+
+    def _where_maskesi(self, where: Dict, aktif: np.ndarray, metadatalar: List) -> np.ndarray:
+        """🔎 where filtresinin satır maskesi - depo değişene kadar cache'lenir"""
+        anahtar = json.dumps(where, sort_keys=True, ensure_ascii=False)
+        with self._lock:
+            maske = self._where_maskeleri.get(anahtar)
+            if maske is not None and maske.size == aktif.size:
+                return maske & aktif
+        maske = np.fromiter(
+            (where_eslesir(metadatalar[i], where) for i in range(aktif.size)),
+            dtype=bool, count=aktif.size
+        )
+        with self._lock:
+            if aktif is self._aktif:
+                self._where_maskeleri[anahtar] = maske
+        return maske & aktif
+
+    def _hazirla(self, embeddings) -> np.ndarray:
+        """📐 Metriğe göre saklanacak vektörler (cosine: birim uzunluk)"""
+        vektorler = np.ascontiguousarray(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        if self.distance_metric == 'cosine':
+            normlar = np.linalg.norm(vektorler, axis=1, keepdims=True)
+            vektorler = vektorler / np.where(normlar > 0, normlar, 1.0)
+        return vektorler.astype(np.float32, copy=False)
+
+    # --- Arayüz ---
+
+    def add(self, ids, embeddings, documents, metadatas):
+        vektorler = self._hazirla(embeddings)
+        with self._lock:
+            if self.boyut is None:
+                self.boyut = int(vektorler.shape[1])
+                if self.dizin:
+                    self._meta_yaz()
+            elif vektorler.shape[1] != self.boyut:
+                raise ValueError(f"Embedding boyutu {vektorler.shape[1]}, depo boyutu {self.boyut}")
+
+            # ChromaDB gibi: mevcut id'ler ve aynı çağrıdaki tekrarlar eklenmez
+            secilen = []
+            gorulen = set()
+            for i, veri_id in enumerate(ids):
+                if veri_id not in self._satirlar and veri_id not in gorulen:
+                    secilen.append(i)
+                    gorulen.add(veri_id)
+            if not secilen:
+                return
+
+            ilk_satir = len(self._idler)
+            yeni = vektorler[secilen]
+            islemler = []
+            for sira, i in enumerate(secilen):
+                metadata = dict(metadatas[i]) if metadatas and metadatas[i] else None
+                islemler.append({
+                    'op': 'ekle', 'id': ids[i], 'satir': ilk_satir + sira,
+                    'belge': documents[i] if documents else None, 'metadata': metadata
+                })
+
+            # Önce vektörler, sonra günlük - günlükte olmayan satırlar yüklemede kesilir
+            if self.dizin:
+                with open(self.vektor_dosyasi, 'ab') as f:
+                    f.write(yeni.tobytes())
+                self._gunluge_yaz(islemler)
+                self._matrisi_esle(ilk_satir + len(secilen))
+            else:
+                self._bellege_ekle(yeni)
+
+            for islem in islemler:
+                self._kayit_ekle_bellek(islem['id'], islem['satir'], islem['belge'], islem['metadata'])
+            self._aktif = np.concatenate([self._aktif, np.ones(len(islemler), dtype=bool)])
+            self._where_maskeleri = {}
+
+    def _bellege_ekle(self, yeni: np.ndarray):
+        """📈 Bellek modunda kapasiteyi ikiye katlayarak büyü - ekleme başına tüm matris kopyalanmaz"""
+        n = self._matris.shape[0]
+        kapasite = self._tampon.shape[0] if self._tampon is not None else 0
+        if n + len(yeni) > kapasite:
+            tampon = np.empty((max(n + len(yeni), 2 * kapasite, 64), self.boyut), dtype=np.float32)
+            if n:
+                tampon[:n] = self._matris
+            self._tampon = tampon
+        self._tampon[n:n + len(yeni)] = yeni
+        self._matris = self._tampon[:n + len(yeni)]
+        if self.distance_metric == 'l2':
+            self._normlar = np.einsum('ij,ij->i', self._matris, self._matris)
+
+    def query(self, query_embeddings, n_results=10, include=None, where=None):
+        include = include or ['metadatas', 'documents', 'distances']
+        sorgular = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+
+        with self._lock:
+            matris, aktif, normlar = self._matris, self._aktif, self._normlar
+            idler, belgeler, metadatalar = self._idler, self._belgeler, self._metadatalar
+        maske = self._where_maskesi(where, aktif, metadatalar) if where else aktif
+
+        sonuc = {'ids': [], 'distances': [], 'metadatas': [], 'documents': []}
+        gecerli = np.flatnonzero(maske)
+        for sorgu in sorgular:
+            if gecerli.size == 0 or matris.shape[0] == 0:
+                secilen, mesafeler = np.zeros(0, dtype=np.int64), np.zeros(0)
+            else:
+                mesafeler = self._mesafeler(matris, normlar, sorgu)
+                mesafeler = np.where(maske, mesafeler, np.inf)
+                k = min(n_results, gecerli.size)
+                if k < mesafeler.size:
+                    aday = np.argpartition(mesafeler, k - 1)[:k]
+                else:
+                    aday = np.arange(mesafeler.size)
+                secilen = aday[np.lexsort((aday, mesafeler[aday]))][:k]
+            sonuc['ids'].append([idler[i] for i in secilen])
+            sonuc['distances'].append([float(mesafeler[i]) for i in secilen])
+            sonuc['metadatas'].append([dict(metadatalar[i] or {}) for i in secilen])
+            sonuc['documents'].append([belgeler[i] for i in secilen])
+
+        for alan in ('distances', 'metadatas', 'documents'):
+            if alan not in include:
+                sonuc[alan] = None
+        return sonuc
+
+    def _mesafeler(self, matris: np.ndarray, normlar: np.ndarray, sorgu: np.ndarray) -> np.ndarray:
+        """📏 ChromaDB ile aynı mesafe tanımları"""
+        if self.distance_metric == 'cosine':
+            norm = float(np.linalg.norm(sorgu))
+            return 1.0 - matris @ (sorgu / norm if norm > 0 else sorgu)
+        if self.distance_metric == 'ip':
+            return 1.0 - matris @ sorgu
+        return normlar - 2.0 * (matris @ sorgu) + float(sorgu @ sorgu)
+
+    def get(self, ids=None, where=None, include=None):
+        include = TUM_ALANLAR if include is None else include
+        with self._lock:
+            if ids is not None:
+                satirlar = [self._satirlar[veri_id] for veri_id in ids if veri_id in self._satirlar]
+            else:
+                satirlar = sorted(self._satirlar.values())
+            if where:
+                satirlar = [s for s in satirlar if where_eslesir(self._metadatalar[s], where)]
+            sonuc = {
+                'ids': [self._idler[s] for s in satirlar],
+                'metadatas': [dict(self._metadatalar[s] or {}) for s in satirlar],
+                'documents': [self._belgeler[s] for s in satirlar]
+            }
+        for alan in TUM_ALANLAR:
+            if alan not in include:
+                sonuc[alan] = None
+        return sonuc
+
+    def delete(self, ids=None, where=None):
+        with self._lock:
+            if ids is None:
+                ids = list(self._satirlar)
+            if where:
+                ids = [v for v in ids if v in self._satirlar and where_eslesir(self._metadatalar[self._satirlar[v]], where)]
+            silinen = {}
+            for veri_id in ids:
+                satir = self._kayit_sil_bellek(veri_id)
+                if satir is not None:
+                    silinen[veri_id] = satir
+            if not silinen:
+                return
+            aktif = self._aktif.copy()
+            aktif[list(silinen.values())] = False
+            self._aktif = aktif
+            self._gunluge_yaz([{'op': 'sil', 'id': veri_id} for veri_id in silinen])
+
+            olu = len(self._idler) - len(self._satirlar)
+            if olu >= self.SIKISTIRMA_MIN_OLU and olu > len(self._satirlar):
+                self.sikistir()
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        """🔁 Sil + ekle tek kilit altında - sorgular kaydı ya eski ya yeni sürümüyle görür"""
+        vektorler = self._hazirla(embeddings)
+        with self._lock:
+            if self.boyut is not None and vektorler.shape[1] != self.boyut:
+                raise ValueError(f"Embedding boyutu {vektorler.shape[1]}, depo boyutu {self.boyut}")
+            super().upsert(ids, vektorler, documents, metadatas)
+
+    def count(self):
+        with self._lock:
+            return len(self._satirlar)
+
+    def dusur(self):
+        """🗑️ Dosyaları sil, boş depoyla devam et - kilit dışındaki sorgular eski referansları okur"""
+        with self._lock:
+            self._durumu_sifirla()
+            if self.dizin:
+                self._dosyalari_sil()
+
+    def sikistir(self):
+        """🧹 Ölü satırları at, dosyaları yeniden yaz"""
+        with self._lock:
+            satirlar = sorted(self._satirlar.values())
+            matris = np.array(self._matris[satirlar], dtype=np.float32).reshape(-1, self.boyut or 0)
+            kayitlar = [(self._idler[s], self._belgeler[s], self._metadatalar[s]) for s in satirlar]
+
+            self._idler, self._belgeler, self._metadatalar = [], [], []
+            self._satirlar = {}
+            for yeni_satir, (veri_id, belge, metadata) in enumerate(kayitlar):
+                self._kayit_ekle_bellek(veri_id, yeni_satir, belge, metadata)
+            self._aktif = np.ones(len(kayitlar), dtype=bool)
+            self._where_maskeleri = {}
+
+            if not self.dizin:
+                self._tampon = matris
+                self._matris = matris
+                if self.distance_metric == 'l2':
+                    self._normlar = np.einsum('ij,ij->i', matris, matris)
+                return
+
+            # Yeni nesil dosyalarını yaz, meta.json değişimiyle tek adımda geç - arada
+            # çökerse eski nesil geçerli kalır, yeni dosyalar yüklemede silinir
+            vektor_dosyasi, gunluk_dosyasi = self._nesil_dosyalari(self.nesil + 1)
+            with open(vektor_dosyasi, 'wb') as f:
+                f.write(matris.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(gunluk_dosyasi, 'w', encoding='utf-8') as f:
+                for yeni_satir, (veri_id, belge, metadata) in enumerate(kayitlar):
+                    f.write(json.dumps({'op': 'ekle', 'id': veri_id, 'satir': yeni_satir,
+                                        'belge': belge, 'metadata': metadata}, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._nesli_sec(self.nesil + 1)
+            self._meta_yaz()
+            self._matrisi_esle(len(kayitlar))
+            self._eski_nesilleri_sil()
+
+    def kararli_k_siniri(self):
+        return math.inf
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'backend': 'numpy',
+                'kayit_sayisi': len(self._satirlar),
+                'olu_satir': len(self._idler) - len(self._satirlar),
+                'boyut': self.boyut,
+                'kalici': bool(self.dizin)
+            }
+
+class ShardedVectorStore(VectorStore):
+    """🧩 Kategori başına ayrı shard
+
+    Belgeler metadata'daki `kategori` alanına göre yönlendirilir. Sorgu `where={'kategori': k}`
+    ise sadece o shard'a, değilse boş olmayan tüm shard'lara thread havuzunda paralel gider;
+    shard başına top-k mesafeye göre birleştirilir (eşitlikte shard sırası, sonra shard içi sıra).
+    Bir kategori `shard_dusur` ile diğerlerine dokunmadan toptan silinir. Shard boyutları
+    yazma işlemlerinde güncellenir; sorgu yolunda `count()` çağrılmaz.
+    """
+
+    def __init__(self, shardlar: Dict[str, VectorStore], varsayilan_shard: str = 'genel',
+                 max_workers: Optional[int] = None):
+        if not shardlar:
+            raise ValueError("En az bir shard gerekli")
+        self.shardlar = dict(shardlar)
+        self.varsayilan_shard = varsayilan_shard if varsayilan_shard in self.shardlar else next(iter(self.shardlar))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(self.shardlar),
+            thread_name_prefix='vektor_shard'
+        )
+        # Shard başına kayıt sayısı - yazmalardan sonra yenilenir (kalıcı shard'lar dolu açılabilir)
+        self._boyutlar: Dict[str, int] = {}
+        self._boyutlari_yenile(self.shardlar)
+
+    def _boyutlari_yenile(self, adlar: Iterable[str]):
+        """🔢 Yazılan shard'ların boyutu - eklemede mevcut id'ler atlanabildiği için depodan okunur"""
+        for ad in adlar:
+            self._boyutlar[ad] = self.shardlar[ad].count()
+
+    def _shard_adi(self, metadata: Optional[Dict]) -> str:
+        kategori = (metadata or {}).get('kategori')
+        return kategori if kategori in self.shardlar else self.varsayilan_shard
+
+    def _hedef_shardlar(self, where: Optional[Dict]) -> Tuple[List[str], Optional[Dict]]:
+        """🎯 where kategoriye eşitlikse tek shard ve kalan filtre; değilse tüm shard'lar"""
+        kategori = where.get('kategori') if where else None
+        if isinstance(kategori, dict):
+            kategori = kategori.get('$eq') if list(kategori) == ['$eq'] else None
+        if isinstance(kategori, str) and kategori in self.shardlar:
+            kalan = {alan: kosul for alan, kosul in where.items() if alan != 'kategori'}
+            return [kategori], kalan or None
+        return list(self.shardlar), where
+
+    def _shardlara_dagit(self, yontem: str, ids, embeddings, documents, metadatas) -> Dict[str, List[int]]:
+        """📤 Kayıtları kategori shard'larına grupla, her grubu shard'ın `yontem` metoduyla yaz"""
+        gruplar: Dict[str, List[int]] = {}
+        for i in range(len(ids)):
+            gruplar.setdefault(self._shard_adi(metadatas[i] if metadatas else None), []).append(i)
+        vektorler = np.asarray(embeddings, dtype=np.float32)
+        try:
+            for ad, indeksler in gruplar.items():
+                getattr(self.shardlar[ad], yontem)(
+                    [ids[i] for i in indeksler],
+                    vektorler[indeksler],
+                    [documents[i] for i in indeksler] if documents else None,
+                    [metadatas[i] for i in indeksler] if metadatas else None
+                )
+        finally:
+            self._boyutlari_yenile(gruplar)
+        return gruplar
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self._shardlara_dagit('add', ids, embeddings, documents, metadatas)
+
+    def query(self, query_embeddings, n_results=10, include=None, where=None):
+        include = include or ['metadatas', 'documents', 'distances']
+        hedefler, where = self._hedef_shardlar(where)
+        # Boş shard'lar (örn. henüz verisi olmayan kategori) sonuca katkı vermez, sorgulanmaz
+        hedefler = [ad for ad in hedefler if self._boyutlar[ad] > 0]
+        if not hedefler:
+            sorgu_sayisi = len(np.atleast_2d(np.asarray(query_embeddings)))
+            return {
+                alan: [[] for _ in range(sorgu_sayisi)] if alan == 'ids' or alan in include else None
+                for alan in ('ids', 'distances', 'metadatas', 'documents')
+            }
+        # Birleştirme için mesafeler her zaman istenir
+        shard_include = list(include) if 'distances' in include else list(include) + ['distances']
+
+        if len(hedefler) == 1:
+            sonuclar = [self.shardlar[hedefler[0]].query(query_embeddings, n_results, shard_include, where)]
+        else:
+            gorevler = [
+                self._executor.submit(self.shardlar[ad].query, query_embeddings, n_results, shard_include, where)
+                for ad in hedefler
+            ]
+            sonuclar = [gorev.result() for gorev in gorevler]
+
+        birlesik = {'ids': [], 'distances': [], 'metadatas': [], 'documents': []}
+        for q in range(len(sonuclar[0]['ids'])):
+            adaylar = sorted(
+                (mesafe, s, r)
+                for s, sonuc in enumerate(sonuclar)
+                for r, mesafe in enumerate(sonuc['distances'][q])
+            )[:n_results]
+            for alan in birlesik:
+                if alan == 'ids' or alan in include:
+                    birlesik[alan].append([sonuclar[s][alan][q][r] for _, s, r in adaylar])
+
+        for alan in ('distances', 'metadatas', 'documents'):
+            if alan not in include:
+                birlesik[alan] = None
+        return birlesik
+
+    def get(self, ids=None, where=None, include=None):
+        include = TUM_ALANLAR if include is None else include
+        hedefler, where = self._hedef_shardlar(where)
+        sonuc = {'ids': [], 'metadatas': [], 'documents': []}
+        for ad in hedefler:
+            parca = self.shardlar[ad].get(ids=ids, where=where, include=include)
+            sonuc['ids'].extend(parca['ids'])
+            for alan in TUM_ALANLAR:
+                if alan in include:
+                    sonuc[alan].extend(parca[alan] or [])
+        for alan in TUM_ALANLAR:
+            if alan not in include:
+                sonuc[alan] = None
+        return sonuc
+
+    def delete(self, ids=None, where=None):
+        hedefler, where = self._hedef_shardlar(where)
+        hedefler = [ad for ad in hedefler if self._boyutlar[ad] > 0]  # Boş shard'da silinecek kayıt yok
+        try:
+            for ad in hedefler:
+                if ids is None and where is None:
+                    self.shardlar[ad].dusur()
+                else:
+                    self.shardlar[ad].delete(ids=ids, where=where)
+        finally:
+            self._boyutlari_yenile(hedefler)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        # Önce yeni shard'a yaz, sonra kategorisi değişen kaydın eski shard'daki sürümünü sil
+        gruplar = self._shardlara_dagit('upsert', ids, embeddings, documents, metadatas)
+        for ad, shard in self.shardlar.items():
+            diger_idler = [ids[i] for hedef, indeksler in gruplar.items() if hedef != ad for i in indeksler]
+            if diger_idler and self._boyutlar[ad]:
+                shard.delete(ids=diger_idler)
+                self._boyutlari_yenile([ad])
+
+    def count(self):
+        return sum(self._boyutlar.values())
+
+    def dusur(self):
+        try:
+            for shard in self.shardlar.values():
+                shard.dusur()
+        finally:
+            self._boyutlari_yenile(self.shardlar)
+
+    def shard_dusur(self, kategori: str) -> List[str]:
+        """🗑️ Bir kategorinin shard'ını toptan sil; cache geçersiz kılma için silinen id'leri döndür"""
+        shard = self.shardlar.get(kategori)
+        if shard is None:
+            return []
+        idler = shard.get(include=[])['ids']
+        try:
+            shard.dusur()
+        finally:
+            self._boyutlari_yenile([kategori])
+        return idler
+
+    def kararli_k_siniri(self):
+        return min(shard.kararli_k_siniri() for shard in self.shardlar.values())
+
+    def shard_boyutlari(self) -> Dict[str, int]:
+        return dict(self._boyutlar)
+
+    def get_stats(self):
+        boyutlar = self.shard_boyutlari()
+        return {
+            'backend': 'sharded',
+            'shard_backend': self.shardlar[self.varsayilan_shard].get_stats().get('backend'),
+            'kayit_sayisi': sum(boyutlar.values()),
+            'shardlar': boyutlar
+        }
+
+def _chroma_client_olustur(config):
+    """🔌 ChromaDB client - kalıcı mod yeniden başlatmada mevcut vektörleri kullanır"""
+    import chromadb
+    from chromadb.config import Settings
+
+    settings = Settings(
+        anonymized_telemetry=False,
+        allow_reset=True
+    )
+
+    if config['model'].get('persistent_storage', False):
+        storage_dir = config['data']['vector_store_dir']
+        os.makedirs(storage_dir, exist_ok=True)
+        return chromadb.PersistentClient(path=storage_dir, settings=settings)
+    return chromadb.Client(settings)
+
+def _chroma_collection_ac(client, config, collection_name: str, bildirim=None):
+    """🗄️ ChromaDB collection al veya oluştur - collection embedding modeline bağlı"""
+    model_name = config['model']['model_name']
+    try:
+        collection = client.get_collection(collection_name)
+        collection_model = (collection.metadata or {}).get('embedding_model')
+        if collection_model != model_name:
+            # Farklı modelle oluşturulmuş vektörler karışmasın - yeniden oluştur
+            (bildirim or (lambda _, mesaj: st.warning(mesaj)))(
+                'warning', f"⚠️ Embedding modeli değişmiş, '{collection_name}' yeniden oluşturuluyor"
+            )
+            client.delete_collection(collection_name)
+            collection = None
+    except Exception:
+        collection = None
+
+    if collection is None:
+        collection = client.create_collection(
+            name=collection_name,
+            metadata={
+                "hnsw:space": config['model'].get('distance_metric', 'cosine'),
+                # Uyarlanır k'nin küçük n_results'la aynı komşuları bulması için (bkz. kararli_k_siniri)
+                "hnsw:search_ef": max(
+                    config['model'].get('hnsw_search_ef', 100), config['search']['max_search_results']
+                ),
+                "embedding_model": model_name
+            }
+        )
+    return collection
+
+def collection_adi_olustur(config) -> str:
+    """🏷️ Embedding modeline özgü collection adı"""
+    model_name = config['model']['model_name']
+    model_hash = hashlib.md5(model_name.encode()).hexdigest()[:8]
+    return f"{config['model']['collection_name']}_{model_hash}"
+
+def create_vector_store(config, bildirim=None) -> VectorStore:
+    """🏭 Konfigürasyona göre vektör deposu backend'i oluştur
+
+    MODEL_CONFIG['vector_store_sharding'] açıksa CATEGORIES'teki her kategori ayrı shard olur.
+    `bildirim(seviye, mesaj)` verilirse uyarılar Streamlit yerine ona iletilir.
+    """
+    backend = config['model'].get('vector_store_backend', 'chroma')
+    collection_name = collection_adi_olustur(config)
+
+    if backend == 'numpy':
+        def depo_olustur(ad: str) -> VectorStore:
+            dizin = None
+            if config['model'].get('persistent_storage', False):
+                dizin = os.path.join(config['data']['numpy_store_dir'], ad)
+            return NumpyVectorStore(
+                dizin,
+                config['model'].get('distance_metric', 'cosine'),
+                config['model']['model_name']
+            )
+    elif backend == 'chroma':
+        client = _chroma_client_olustur(config)
+
+        def depo_olustur(ad: str) -> VectorStore:
+            return ChromaVectorStore(_chroma_collection_ac(client, config, ad, bildirim), client)
+    else:
+        raise ValueError(f"Bilinmeyen vektör deposu backend'i: {backend}")
+
+    if config['model'].get('vector_store_sharding', False):
+        return ShardedVectorStore({
+            kategori: depo_olustur(f"{collection_name}_{kategori}")
+            for kategori in config['categories']
+        })
+    return depo_olustur(collection_name)
@@ -0,0 +1,63 @@
+# zaman_butcesi.py - İstek Başına Zaman Bütçesi
+"""
+⏱️ Süre Hedefli Arama
+İstek başına bitiş zamanı; isteğe bağlı aşamalar süre azalınca atlanır,
+yanıt "bozulmuş" (degraded) olarak işaretlenir
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Süre azalınca atlanabilen aşamalar - pipeline sırasıyla
+ISTEGE_BAGLI_ASAMALAR = ('soru_genisletme', 'kategori_filtresi', 'keyword_bonusu')
+
+# Her zaman çalışan aşamalar - süreyi ilk aşan aşama sayılır
+ZORUNLU_ASAMALAR = ('sorgu_hazirlama', 'vektor_sorgusu', 'skorlama', 'belge_getirme')
+
+class ZamanButcesi:
+    """⏱️ Tek isteğin zaman bütçesi
+
+    `izin_ver(asama, oran)`: kalan süre toplam bütçenin `oran` katından azsa
+    aşama atlanır ve kaydedilir. `olc(asama)`: zorunlu aşamayı sarar; bitişi
+    ilk geçen aşama `asan_asama` olur. Bir isteğin tek thread'inde kullanılır.
+    """
+
+    def __init__(self, saniye: float):
+        self.saniye = float(saniye)
+        self.bitis = time.perf_counter() + self.saniye
+        self.atlanan: List[str] = []
+        self.asan_asama: Optional[str] = None
+
+    def kalan(self) -> float:
+        """⏳ Bitişe kalan süre (saniye, negatif olabilir)"""
+        return self.bitis - time.perf_counter()
+
+    def izin_ver(self, asama: str, min_kalan_orani: float) -> bool:
+        """✅ İsteğe bağlı aşama çalışabilir mi"""
+        if self.kalan() >= self.saniye * min_kalan_orani:
+            return True
+        if asama not in self.atlanan:
+            self.atlanan.append(asama)
+        return False
+
+    @contextmanager
+    def olc(self, asama: str):
+        """📏 Zorunlu aşama - bütçeyi ilk aşan aşamayı kaydet"""
+        try:
+            yield
+        finally:
+            if self.asan_asama is None and self.kalan() < 0:
+                self.asan_asama = asama
+
+    @property
+    def bozulmus(self) -> bool:
+        """⚠️ En az bir isteğe bağlı aşama atlandı"""
+        return bool(self.atlanan)
+
+def zaman_butcesi_olustur(config: Dict, saniye: Optional[float] = None) -> Optional[ZamanButcesi]:
+    """🏭 Açık süre verilirse o bütçe; yoksa SEARCH_CONFIG['deadline_aware'] açıkken ACCURACY_METRICS hedefi"""
+    if saniye is None:
+        if not config['search'].get('deadline_aware', False):
+            return None
+        saniye = config['accuracy']['target_metrics']['response_time_goal']
+    return ZamanButcesi(saniye)